@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import mimetypes
 import time
@@ -12,19 +13,34 @@ from datetime import datetime, time as dt_time, timedelta
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Any
 from urllib.parse import parse_qs, urlparse
 
-from ssq_predictor import build_report
-from ssq_predictor.db import get_latest_draw
+from ssq_predictor import build_report, data_source
+from ssq_predictor.analysis import parse_report_sections
+from ssq_predictor.db import close_thread_connections, configure_pragmas, get_latest_draw
 from ssq_predictor.service import (
     configure_runtime,
+    DRAW_NIGHT_POLL_BACKOFF,
+    DRAW_NIGHT_POLL_INTERVAL_SECONDS,
+    DRAW_NIGHT_POLL_START,
+    DRAW_PAGE_DEFAULT_LIMIT,
+    export_snapshot,
+    get_backfill_status,
+    get_draw_history_page,
+    get_next_regular_sync_at,
+    get_report_version,
+    get_runtime_options,
     get_schedule_description,
+    import_snapshot,
+    probe_official_latest_issue,
     RETRY_HOUR,
     RETRY_MINUTE,
-    SCHEDULE_HOUR,
-    SCHEDULE_MINUTE,
-    SCHEDULE_WEEKDAYS,
+    request_backfill,
+    run_backfill_batch,
     sync_history,
+    update_auto_sync_status,
+    wait_for_backfill_request,
 )
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -38,6 +54,7 @@ PAGE_ROUTES = {
     "/history",
     "/notes",
 }
+BACKFILL_IDLE_SECONDS = 300
 
 
 class AutoSyncWorker(threading.Thread):
@@ -46,30 +63,119 @@ class AutoSyncWorker(threading.Thread):
         self._stop_event = threading.Event()
         self._pending_retry: dict[str, str] | None = None
 
-    def _next_regular_sync_dt(self, now: datetime) -> datetime:
-        for offset in range(0, 8):
-            candidate_date = now.date() + timedelta(days=offset)
-            if candidate_date.weekday() not in SCHEDULE_WEEKDAYS:
-                continue
-            candidate_dt = datetime.combine(
-                candidate_date,
-                dt_time(hour=SCHEDULE_HOUR, minute=SCHEDULE_MINUTE),
-            )
-            if candidate_dt > now:
-                return candidate_dt
-        raise RuntimeError("无法计算下一次定时同步时间。")
-
     def _next_event(self) -> tuple[str, datetime]:
         now = datetime.now()
-        next_regular = self._next_regular_sync_dt(now)
+        next_regular = datetime.fromisoformat(get_next_regular_sync_at(now))
         if self._pending_retry:
             retry_dt = datetime.fromisoformat(self._pending_retry["run_at"])
             if retry_dt <= now:
                 return "scheduled_retry", retry_dt
             if retry_dt < next_regular:
                 return "scheduled_retry", retry_dt
+        if get_runtime_options()["draw_night_polling"]["enabled"]:
+            return "draw_night_poll", next_regular
         return "scheduled_draw", next_regular
 
+    def _poll_draw_night(self, event_dt: datetime) -> bool:
+        """Probe for the new issue with backoff; sync once it appears.
+
+        Returns False when the window closes at the next-day retry time first.
+        """
+        polling = get_runtime_options()["draw_night_polling"]
+        deadline = datetime.combine(
+            event_dt.date() + timedelta(days=1),
+            dt_time(hour=RETRY_HOUR, minute=RETRY_MINUTE),
+        )
+        latest_draw = get_latest_draw()
+        base_issue = latest_draw["issue"] if latest_draw else ""
+        interval = float(polling["interval_seconds"])
+        probe_count = 0
+        update_auto_sync_status(
+            state="polling",
+            poll_started_at=datetime.now().isoformat(timespec="seconds"),
+            poll_deadline_at=deadline.isoformat(timespec="seconds"),
+            base_issue=base_issue,
+            probe_count=0,
+            last_probe_at=None,
+            last_probe_issue=None,
+            last_probe_error="",
+            new_issue_detected_at=None,
+        )
+        while not self._stop_event.is_set() and datetime.now() < deadline:
+            latest_draw = get_latest_draw()
+            current_issue = latest_draw["issue"] if latest_draw else ""
+            if current_issue != base_issue:
+                print(f"[AUTO_SYNC] 期号已由其他同步更新为 {current_issue}，停止轮询")
+                update_auto_sync_status(
+                    state="idle",
+                    last_outcome=f"期号已由其他同步更新为 {current_issue}。",
+                )
+                return True
+
+            probe_error = ""
+            breaker_open = False
+            try:
+                probe_issue = probe_official_latest_issue()
+            except data_source.CircuitOpenError as exc:
+                # The official source is skipped while its breaker is open; a
+                # regular sync then checks the fallback source instead.
+                probe_issue = None
+                probe_error = str(exc)
+                breaker_open = True
+            except Exception as exc:
+                probe_issue = None
+                probe_error = str(exc)
+            probe_count += 1
+            probe_at = datetime.now()
+            update_auto_sync_status(
+                probe_count=probe_count,
+                last_probe_at=probe_at.isoformat(timespec="seconds"),
+                last_probe_issue=probe_issue,
+                last_probe_error=probe_error,
+            )
+
+            if breaker_open or (probe_issue and probe_issue != current_issue):
+                update_auto_sync_status(
+                    state="syncing",
+                    new_issue_detected_at=(
+                        None if breaker_open else probe_at.isoformat(timespec="seconds")
+                    ),
+                    next_probe_at=None,
+                )
+                result = sync_history(trigger_type="draw_night_poll")
+                print(
+                    "[AUTO_SYNC] "
+                    f"type=draw_night_poll probes={probe_count} status={result['status']} "
+                    f"latest_issue={result.get('latest_issue') or '--'} "
+                    f"inserted={result.get('inserted_count', 0)}"
+                )
+                if result["status"] == "synced" and result.get("has_new_issue", False):
+                    update_auto_sync_status(
+                        state="idle",
+                        last_outcome=(
+                            f"第 {probe_count} 次探测发现新一期 "
+                            f"{result.get('latest_issue') or probe_issue}，已同步并更新预测。"
+                        ),
+                    )
+                    return True
+
+            next_probe = min(probe_at + timedelta(seconds=interval), deadline)
+            update_auto_sync_status(
+                state="polling",
+                poll_interval_seconds=round(interval),
+                next_probe_at=next_probe.isoformat(timespec="seconds"),
+            )
+            if self._stop_event.wait(max(0.0, (next_probe - datetime.now()).total_seconds())):
+                break
+            interval = min(interval * DRAW_NIGHT_POLL_BACKOFF, polling["max_interval_seconds"])
+
+        update_auto_sync_status(
+            state="idle",
+            next_probe_at=None,
+            last_outcome=f"轮询 {probe_count} 次未发现新一期，转入补拉。",
+        )
+        return False
+
     def _schedule_retry(self, event_dt: datetime, latest_issue: str | None) -> None:
         retry_dt = datetime.combine(
             event_dt.date() + timedelta(days=1),
@@ -86,6 +192,12 @@ class AutoSyncWorker(threading.Thread):
         )
 
     def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            close_thread_connections()
+
+    def _run(self) -> None:
         while not self._stop_event.is_set():
             event_type, event_dt = self._next_event()
             wait_seconds = max(0.0, (event_dt - datetime.now()).total_seconds())
@@ -93,10 +205,26 @@ class AutoSyncWorker(threading.Thread):
                 "[AUTO_SYNC] 下次任务: "
                 f"type={event_type} at={event_dt.isoformat(timespec='seconds')}"
             )
+            update_auto_sync_status(
+                state="waiting",
+                next_event_type=event_type,
+                next_event_at=event_dt.isoformat(timespec="seconds"),
+            )
             if self._stop_event.wait(wait_seconds):
                 break
 
             try:
+                if event_type == "draw_night_poll":
+                    if self._poll_draw_night(event_dt):
+                        self._pending_retry = None
+                    else:
+                        latest_draw = get_latest_draw()
+                        self._schedule_retry(
+                            event_dt,
+                            latest_draw["issue"] if latest_draw else None,
+                        )
+                    continue
+
                 if event_type == "scheduled_retry" and self._pending_retry:
                     current_latest = get_latest_draw()
                     current_issue = current_latest["issue"] if current_latest else ""
@@ -127,7 +255,8 @@ class AutoSyncWorker(threading.Thread):
                     self._pending_retry = None
             except Exception as exc:
                 print(f"[AUTO_SYNC] type={event_type} failed: {exc}")
-                if event_type == "scheduled_draw":
+                update_auto_sync_status(state="idle", last_outcome=f"自动同步失败: {exc}")
+                if event_type in ("scheduled_draw", "draw_night_poll"):
                     latest_draw = get_latest_draw()
                     latest_issue = latest_draw["issue"] if latest_draw else None
                     self._schedule_retry(event_dt, latest_issue)
@@ -138,6 +267,104 @@ class AutoSyncWorker(threading.Thread):
         self._stop_event.set()
 
 
+class BackfillWorker(threading.Thread):
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            close_thread_connections()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            completed = True
+            try:
+                result = run_backfill_batch()
+                completed = result["completed"]
+                if result.get("processed_missing_count"):
+                    status = get_backfill_status()
+                    print(
+                        "[BACKFILL] "
+                        f"snapshots={status['snapshot_done']}/{status['expected_snapshot_total']} "
+                        f"evaluations={status['evaluation_done']}/{status['expected_evaluation_total']} "
+                        f"throughput={status['throughput_per_second']}/s "
+                        f"eta={status['eta_seconds'] if status['eta_seconds'] is not None else '--'}s"
+                    )
+            except Exception as exc:
+                print(f"[BACKFILL] batch failed: {exc}")
+
+            if completed:
+                wait_for_backfill_request(BACKFILL_IDLE_SECONDS)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        request_backfill()
+
+
+class ReportCache:
+    """Holds encoded reports per section set for the data version they were built from."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self._version: tuple[object, ...] | None = None
+        self._entries: dict[tuple[str, ...], tuple[str, bytes]] = {}
+
+    def get(
+        self,
+        version: tuple[object, ...],
+        sections: tuple[str, ...],
+    ) -> tuple[str, bytes] | None:
+        with self._lock:
+            if self._version != version:
+                return None
+            return self._entries.get(sections)
+
+    def put(
+        self,
+        version: tuple[object, ...],
+        sections: tuple[str, ...],
+        body: bytes,
+    ) -> str:
+        etag = _make_etag(body)
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._entries = {}
+            self._entries[sections] = (etag, body)
+        return etag
+
+
+def _make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(header_value: str | None, etag: str) -> bool:
+    if not header_value:
+        return False
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+REPORT_CACHE = ReportCache()
+
+
+class SsqHTTPServer(ThreadingHTTPServer):
+    """Closes each request thread's pooled database connections when it ends."""
+
+    def process_request_thread(self, request: Any, client_address: Any) -> None:
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            close_thread_connections()
+
+
 class SsqRequestHandler(BaseHTTPRequestHandler):
     server_version = "SSQPredictor/1.0"
 
@@ -149,10 +376,31 @@ class SsqRequestHandler(BaseHTTPRequestHandler):
         if parsed.path == "/api/health":
             self._serve_health()
             return
-        if parsed.path == "/api/report":
-            query = parse_qs(parsed.query)
+        if parsed.path == "/api/backfill/status":
+            self._serve_json(get_backfill_status())
+            return
+        if parsed.path == "/api/draws":
+            self._serve_draws(parse_qs(parsed.query))
+            return
+        if parsed.path == "/api/report" or parsed.path.startswith("/api/report/"):
+            query = parse_qs(parsed.query, keep_blank_values=True)
             force_refresh = query.get("refresh", ["0"])[0] == "1"
-            self._serve_report(force_refresh)
+            single_section = parsed.path.startswith("/api/report/")
+            section_value = (
+                parsed.path.removeprefix("/api/report/")
+                if single_section
+                else query.get("sections", [None])[0]
+            )
+            try:
+                sections = parse_report_sections(section_value)
+            except ValueError as exc:
+                status = HTTPStatus.NOT_FOUND if single_section else HTTPStatus.BAD_REQUEST
+                self._serve_json({"error": str(exc)}, status=status)
+                return
+            if single_section and len(sections) != 1:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            self._serve_report(force_refresh, sections)
             return
         if parsed.path.startswith("/static/"):
             relative = parsed.path.removeprefix("/static/")
@@ -178,15 +426,19 @@ class SsqRequestHandler(BaseHTTPRequestHandler):
         body: bytes,
         content_type: str,
         cache_control: str | None = None,
+        etag: str | None = None,
     ) -> None:
         try:
             self.send_response(status)
             self.send_header("Content-Type", content_type)
             if cache_control:
                 self.send_header("Cache-Control", cache_control)
+            if etag:
+                self.send_header("ETag", etag)
             self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(body)
+            if body:
+                self.wfile.write(body)
         except (BrokenPipeError, ConnectionResetError):
             sys.stdout.write(
                 "[HTTP] client disconnected before response body was fully sent\n"
@@ -200,26 +452,54 @@ class SsqRequestHandler(BaseHTTPRequestHandler):
             content_type=content_type,
         )
 
-    def _serve_health(self) -> None:
-        body = json.dumps(
-            {
-                "status": "ok",
-                "server_time": datetime.now().isoformat(timespec="seconds"),
-            },
-            ensure_ascii=False,
-        ).encode("utf-8")
+    def _serve_json(
+        self,
+        payload: dict[str, object],
+        status: HTTPStatus = HTTPStatus.OK,
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
         self._send_bytes_response(
-            status=HTTPStatus.OK,
+            status=status,
             body=body,
             content_type="application/json; charset=utf-8",
             cache_control="no-store",
         )
 
-    def _serve_report(self, force_refresh: bool) -> None:
+    def _serve_health(self) -> None:
+        self._serve_json(
+            {
+                "status": "ok",
+                "server_time": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+
+    def _serve_draws(self, query: dict[str, list[str]]) -> None:
+        try:
+            limit_value = query.get("limit", [str(DRAW_PAGE_DEFAULT_LIMIT)])[0]
+            if not limit_value.isdigit():
+                raise ValueError(f"无效的 limit: {limit_value}")
+            payload = get_draw_history_page(
+                before=query.get("before", [None])[0],
+                limit=int(limit_value),
+                columns=query.get("columns", [None])[0],
+                keyword=query.get("q", [""])[0],
+            )
+        except ValueError as exc:
+            self._serve_json({"error": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+            return
+        self._serve_json(payload)
+
+    def _serve_report(self, force_refresh: bool, sections: tuple[str, ...]) -> None:
         started = time.perf_counter()
+        etag = None
+        cache_hit = False
         try:
-            report = build_report(force_refresh=force_refresh)
-            body = json.dumps(report, ensure_ascii=False).encode("utf-8")
+            if force_refresh:
+                report = build_report(force_refresh=True, sections=sections)
+                body = json.dumps(report, ensure_ascii=False).encode("utf-8")
+                etag = _make_etag(body)
+            else:
+                body, etag, cache_hit = self._cached_report_body(sections)
             status = HTTPStatus.OK
         except Exception as exc:
             duration = time.perf_counter() - started
@@ -239,16 +519,48 @@ class SsqRequestHandler(BaseHTTPRequestHandler):
         else:
             duration = time.perf_counter() - started
             sys.stdout.write(
-                f"[REPORT] build succeeded after {duration:.2f}s\n"
+                f"[REPORT] {'cache hit' if cache_hit else 'build succeeded'} "
+                f"after {duration:.2f}s\n"
+            )
+
+        if status == HTTPStatus.OK and etag and _etag_matches(
+            self.headers.get("If-None-Match"), etag
+        ):
+            self._send_bytes_response(
+                status=HTTPStatus.NOT_MODIFIED,
+                body=b"",
+                content_type="application/json; charset=utf-8",
+                cache_control="no-cache",
+                etag=etag,
             )
+            return
 
         self._send_bytes_response(
             status=status,
             body=body,
             content_type="application/json; charset=utf-8",
-            cache_control="no-store",
+            cache_control="no-cache" if etag else "no-store",
+            etag=etag,
         )
 
+    def _cached_report_body(self, sections: tuple[str, ...]) -> tuple[bytes, str, bool]:
+        # The version is read before building so that a write racing with the
+        # build can only cause an extra rebuild, never a stale cache entry.
+        version = get_report_version()
+        cached = REPORT_CACHE.get(version, sections)
+        if cached is not None:
+            etag, body = cached
+            return body, etag, True
+        with REPORT_CACHE.build_lock:
+            version = get_report_version()
+            cached = REPORT_CACHE.get(version, sections)
+            if cached is not None:
+                etag, body = cached
+                return body, etag, True
+            report = build_report(force_refresh=False, sections=sections)
+            body = json.dumps(report, ensure_ascii=False).encode("utf-8")
+            return body, REPORT_CACHE.put(version, sections, body), False
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="双色球历史分析与预测工具")
@@ -264,6 +576,68 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="执行一次同步和预测后退出，可用于任务计划程序",
     )
+    parser.add_argument(
+        "--export-snapshot",
+        metavar="PATH",
+        help="把数据库中的开奖数据导出为压缩 NDJSON 快照后退出",
+    )
+    parser.add_argument(
+        "--import-snapshot",
+        metavar="PATH",
+        help="从快照（压缩 NDJSON 或 ssq_history.json）导入开奖数据后退出",
+    )
+    parser.add_argument(
+        "--no-draw-night-polling",
+        action="store_true",
+        help="关闭开奖夜自适应轮询，改为固定 21:50 同步一次",
+    )
+    parser.add_argument(
+        "--poll-start",
+        default=DRAW_NIGHT_POLL_START,
+        metavar="HH:MM",
+        help=f"开奖日开始探测最新期号的时间，默认 {DRAW_NIGHT_POLL_START}",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=int,
+        default=DRAW_NIGHT_POLL_INTERVAL_SECONDS,
+        help=f"开奖夜探测的初始间隔秒数，之后逐次退避，默认 {DRAW_NIGHT_POLL_INTERVAL_SECONDS}",
+    )
+    parser.add_argument(
+        "--backfill-workers",
+        type=int,
+        default=1,
+        help="回补历史预测快照时使用的进程数，1 表示在服务进程内串行计算",
+    )
+    parser.add_argument(
+        "--sqlite-pragma",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="覆盖 SQLite 连接参数，可重复使用，支持 synchronous、cache_size、mmap_size、busy_timeout",
+    )
+    parser.add_argument(
+        "--official-concurrency",
+        type=int,
+        default=None,
+        help=f"全量同步时同时请求官方接口的页数，默认 {data_source.DEFAULT_OFFICIAL_CONCURRENCY}",
+    )
+    parser.add_argument(
+        "--official-rps",
+        type=float,
+        default=None,
+        help=f"请求官方接口的每秒上限，默认 {data_source.DEFAULT_OFFICIAL_REQUESTS_PER_SECOND:g}",
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=(
+            "官方接口超过该秒数未返回时并行请求备用数据源，取先返回者，"
+            f"0 表示仅在官方失败后切换，默认 {data_source.DEFAULT_HEDGE_AFTER_SECONDS:g}"
+        ),
+    )
     parser.add_argument(
         "--no-browser",
         action="store_true",
@@ -274,8 +648,59 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
+    pragmas = {}
+    for item in args.sqlite_pragma:
+        name, separator, value = item.partition("=")
+        if not separator:
+            raise SystemExit(f"--sqlite-pragma 需要 NAME=VALUE 格式: {item}")
+        pragmas[name.strip()] = value.strip()
+    try:
+        configure_pragmas(**pragmas)
+    except ValueError as exc:
+        raise SystemExit(f"--sqlite-pragma 无效: {exc}") from exc
+    try:
+        data_source.configure_official_fetch(
+            concurrency=args.official_concurrency,
+            requests_per_second=args.official_rps,
+            hedge_after_seconds=args.hedge_after,
+        )
+    except ValueError as exc:
+        raise SystemExit(f"官方接口抓取参数无效: {exc}") from exc
     auto_sync_enabled = not args.disable_auto_sync and not args.sync_once
-    configure_runtime(auto_sync_enabled=auto_sync_enabled)
+    try:
+        configure_runtime(
+            auto_sync_enabled=auto_sync_enabled,
+            backfill_workers=args.backfill_workers,
+            background_backfill=not args.sync_once,
+            draw_night_polling=not args.no_draw_night_polling,
+            poll_start=args.poll_start,
+            poll_interval_seconds=args.poll_interval,
+        )
+    except ValueError as exc:
+        raise SystemExit(f"自动同步参数无效: {exc}") from exc
+
+    if args.import_snapshot:
+        try:
+            result = import_snapshot(Path(args.import_snapshot))
+        except (OSError, ValueError, KeyError) as exc:
+            raise SystemExit(f"快照导入失败: {exc}") from exc
+        print(
+            "快照导入完成: "
+            f"latest_issue={result['latest_issue'] or '--'} "
+            f"inserted={result['inserted_count']} "
+            f"updated={result['updated_count']}"
+        )
+        return
+
+    if args.export_snapshot:
+        header = export_snapshot(Path(args.export_snapshot))
+        print(
+            "快照导出完成: "
+            f"path={args.export_snapshot} "
+            f"draws={header['draw_count']} "
+            f"latest_issue={header['latest_issue'] or '--'}"
+        )
+        return
 
     if args.sync_once:
         result = sync_history(trigger_type="sync_once")
@@ -290,9 +715,11 @@ def main() -> None:
             print(result["warning"])
         return
 
-    server = ThreadingHTTPServer((args.host, args.port), SsqRequestHandler)
+    server = SsqHTTPServer((args.host, args.port), SsqRequestHandler)
     url = f"http://{args.host}:{args.port}"
     auto_sync_worker = None
+    backfill_worker = BackfillWorker()
+    backfill_worker.start()
 
     if auto_sync_enabled:
         auto_sync_worker = AutoSyncWorker()
@@ -315,6 +742,7 @@ def main() -> None:
     finally:
         if auto_sync_worker is not None:
             auto_sync_worker.stop()
+        backfill_worker.stop()
         server.server_close()
 
 
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from ssq_predictor import data_source
+from ssq_predictor.analysis import MIN_BACKTEST_DRAWS, encode_draw, iter_prediction_artifacts
+from ssq_predictor.db import (
+    DRAW_PAGE_COLUMNS,
+    bulk_load_draws,
+    get_connection,
+    get_prediction_performance_summary,
+    get_snapshots_ready_for_evaluation,
+    initialize_database,
+    iter_draws,
+    save_prediction_evaluation,
+    save_prediction_snapshots_bulk,
+    upsert_draws,
+)
+from ssq_predictor.draw_store import DRAW_RECORD_FIELDS, DrawRecord
+from ssq_predictor.service import (
+    PRIZE_LOOKUP,
+    _build_prediction_snapshot,
+    _determine_prize_level,
+    _evaluate_pending_predictions,
+    _evaluate_prediction_snapshot,
+)
+
+
+def _load_history(limit: int | None) -> list[dict[str, Any]]:
+    payload = data_source.load_cache()
+    if not payload or not payload.get("draws"):
+        raise SystemExit("找不到 data/ssq_history.json，无法运行基准测试。")
+    draws = sorted(payload["draws"], key=lambda draw: draw["issue"])
+    return draws[-limit:] if limit else draws
+
+
+def _timed(callback: Callable[[], Any], repeat: int = 1) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = callback()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _measured(callback: Callable[[], Any], repeat: int) -> tuple[float, int, Any]:
+    seconds, result = _timed(callback, repeat=repeat)
+    del result
+    tracemalloc.start()
+    try:
+        result = callback()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+def _synthetic_history(draws: list[dict[str, Any]], count: int) -> list[dict[str, Any]]:
+    # Real rows, including their content text, relabelled with unique
+    # ascending issues so the table can grow past the real history.
+    return [
+        {**draws[index % len(draws)], "issue": f"{1000 + index // 150:04d}{index % 150 + 1:03d}"}
+        for index in range(count)
+    ]
+
+
+def _load_all_columns(db_path: Path) -> list[dict[str, Any]]:
+    # The previous analysis loader: every column, fetchall, one dict per row.
+    with get_connection(db_path) as connection:
+        rows = connection.execute(
+            f"SELECT {', '.join(DRAW_PAGE_COLUMNS.values())} FROM draws ORDER BY issue ASC"
+        ).fetchall()
+    draws = []
+    for row in rows:
+        draw = {column: row[name] for column, name in DRAW_PAGE_COLUMNS.items()}
+        draw["red_numbers"] = draw["red_numbers"].split(",")
+        draws.append(draw)
+    return draws
+
+
+def _load_records(db_path: Path) -> list[DrawRecord]:
+    return [DrawRecord(*row) for row in iter_draws(columns=DRAW_RECORD_FIELDS, db_path=db_path)]
+
+
+def _analysis_fields(draw: Any) -> tuple[Any, ...]:
+    return tuple(
+        tuple(draw[field]) if field == "red_numbers" else draw[field]
+        for field in DRAW_RECORD_FIELDS
+    )
+
+
+def _count_streamed(db_path: Path) -> int:
+    return sum(1 for _ in iter_draws(db_path=db_path))
+
+
+def benchmark_loader(args: argparse.Namespace) -> None:
+    history = _load_history(None)
+    for count in args.rows:
+        draws = _synthetic_history(history, count)
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = Path(directory) / "benchmark.db"
+            initialize_database(db_path)
+            bulk_load_draws(draws, db_path=db_path)
+
+            full_seconds, full_peak, full_draws = _measured(
+                lambda: _load_all_columns(db_path), args.repeat
+            )
+            slim_seconds, slim_peak, records = _measured(
+                lambda: _load_records(db_path), args.repeat
+            )
+            stream_seconds, stream_peak, streamed = _measured(
+                lambda: _count_streamed(db_path), args.repeat
+            )
+            if list(map(_analysis_fields, full_draws)) != list(
+                map(_analysis_fields, records)
+            ) or streamed != count:
+                raise SystemExit("投影加载的结果与全字段加载不一致。")
+            del full_draws, records
+            print(
+                f"{count} 期：全字段 {full_seconds * 1000:.1f}ms / 峰值 {full_peak / 1024 / 1024:.1f}MB，"
+                f"投影记录 {slim_seconds * 1000:.1f}ms / {slim_peak / 1024 / 1024:.1f}MB，"
+                f"流式遍历 {stream_seconds * 1000:.1f}ms / {stream_peak / 1024:.0f}KB"
+            )
+
+
+def _seed_snapshots(draws: list[dict[str, Any]], db_path: Path) -> int:
+    initialize_database(db_path)
+    upsert_draws(draws, db_path=db_path)
+    snapshots = [
+        _build_prediction_snapshot(artifacts, index + 1)
+        for index, artifacts in iter_prediction_artifacts(
+            draws,
+            range(MIN_BACKTEST_DRAWS - 1, len(draws) - 1),
+        )
+    ]
+    save_prediction_snapshots_bulk(snapshots, db_path=db_path)
+    return len(snapshots)
+
+
+def _clear_evaluations(db_path: Path) -> None:
+    with get_connection(db_path) as connection:
+        connection.execute("DELETE FROM ticket_results")
+        connection.execute("DELETE FROM prediction_evaluations")
+        connection.execute("DELETE FROM prediction_performance_rollup")
+        connection.commit()
+
+
+def _evaluate_one_by_one(db_path: Path) -> int:
+    # The previous path: one evaluation, one connection borrow and one commit per snapshot.
+    ready = get_snapshots_ready_for_evaluation(db_path=db_path)
+    for snapshot in ready:
+        target_draw = {
+            "issue": snapshot["target_issue"],
+            "date": snapshot["target_date"],
+            "red_numbers": snapshot["target_red_numbers"],
+            "blue_number": snapshot["target_blue_number"],
+        }
+        save_prediction_evaluation(
+            _evaluate_prediction_snapshot(snapshot, target_draw),
+            db_path=db_path,
+        )
+    return len(ready)
+
+
+def _match_pairs(db_path: Path) -> list[tuple[int, int]]:
+    pairs = []
+    for snapshot in get_snapshots_ready_for_evaluation(db_path=db_path):
+        target_mask, target_blue = encode_draw(
+            {
+                "red_numbers": snapshot["target_red_numbers"],
+                "blue_number": snapshot["target_blue_number"],
+            }
+        )
+        for ticket in snapshot["tickets"]:
+            ticket_mask, ticket_blue = encode_draw(ticket)
+            pairs.append(
+                ((ticket_mask & target_mask).bit_count(), 1 if ticket_blue == target_blue else 0)
+            )
+    return pairs
+
+
+def _comparable_summary(db_path: Path) -> dict[str, Any]:
+    summary = get_prediction_performance_summary(db_path=db_path)
+    for evaluation in summary["recent_evaluations"]:
+        # Row ids and timestamps differ between runs; the evaluated content must not.
+        evaluation.pop("id")
+        evaluation.pop("evaluated_at")
+    return summary
+
+
+def benchmark_evaluation(args: argparse.Namespace) -> None:
+    draws = _load_history(args.draws)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "benchmark.db"
+        snapshot_count = _seed_snapshots(draws, db_path)
+        print(f"开奖记录 {len(draws)} 期，待验票快照 {snapshot_count} 条")
+
+        pairs = _match_pairs(db_path)
+        branch_seconds, branch_levels = _timed(
+            lambda: [_determine_prize_level(red, blue) for red, blue in pairs],
+            repeat=args.repeat,
+        )
+        lookup_seconds, lookup_levels = _timed(
+            lambda: [PRIZE_LOOKUP[red * 2 + blue] for red, blue in pairs],
+            repeat=args.repeat,
+        )
+        if branch_levels != lookup_levels:
+            raise SystemExit("奖级查表结果与分支判断不一致。")
+        print(
+            f"奖级判定 {len(pairs)} 张票：分支 {branch_seconds * 1000:.2f}ms，"
+            f"查表 {lookup_seconds * 1000:.2f}ms，"
+            f"提速 {branch_seconds / lookup_seconds:.1f}x"
+        )
+
+        single_seconds, _ = _timed(lambda: _evaluate_one_by_one(db_path))
+        single_summary = _comparable_summary(db_path)
+        _clear_evaluations(db_path)
+        batch_seconds, _ = _timed(lambda: _evaluate_pending_predictions(db_path=db_path))
+        batch_summary = _comparable_summary(db_path)
+        if single_summary != batch_summary:
+            raise SystemExit("批量验票结果与逐条验票不一致。")
+        print(
+            f"验票并写库 {snapshot_count} 条：逐条 {single_seconds:.3f}s，"
+            f"批量 {batch_seconds:.3f}s，提速 {single_seconds / batch_seconds:.1f}x"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="双色球分析工具的性能基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    evaluation = subparsers.add_parser("evaluation", help="对比逐条验票与批量验票")
+    evaluation.add_argument(
+        "--draws",
+        type=int,
+        default=None,
+        help="只使用最近 N 期开奖记录，默认使用全部缓存数据",
+    )
+    evaluation.add_argument("--repeat", type=int, default=5, help="奖级判定重复次数，取最快一次")
+    evaluation.set_defaults(handler=benchmark_evaluation)
+
+    loader = subparsers.add_parser("loader", help="对比全字段加载与投影流式加载开奖记录")
+    loader.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[3000, 30000],
+        help="合成的开奖记录条数，可给多个，默认 3000 和 30000",
+    )
+    loader.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    loader.set_defaults(handler=benchmark_loader)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import heapq
 import itertools
 import math
-from collections import Counter, defaultdict
-from typing import Any, Iterable
+import threading
+from collections import Counter, defaultdict, deque
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure Python engine is always available.
+    np = None
 
 RED_NUMBERS = [f"{value:02d}" for value in range(1, 34)]
 BLUE_NUMBERS = [f"{value:02d}" for value in range(1, 17)]
@@ -11,6 +18,60 @@ RECENT_WINDOWS = (30, 60, 120)
 MIN_BACKTEST_DRAWS = max(RECENT_WINDOWS)
 RED_BASELINE_RATE = 6 / 33
 BLUE_BASELINE_RATE = 1 / 16
+STATS_ENGINE = "numpy" if np is not None else "python"
+RED_POOL_SIZE = 15
+REPORT_SECTIONS = (
+    "summary",
+    "latest_issue_analysis",
+    "hot_cold",
+    "duplicates",
+    "prediction",
+    "stats",
+    "draws",
+)
+REPORT_NOTES = (
+    "严格数学上，每一注双色球组合的开奖概率相同，历史频率不会改变随机开奖本质。",
+    "页面中的预测分数是基于历史频率、近30/60期趋势和当前遗漏值的经验排序，只适合做数据参考。",
+    "当前给出的5注预测号码全部由历史数据模型确定性计算生成，没有使用随机数。",
+    "历史开奖数据现在会写入本地 SQLite 数据库，页面分析直接从数据库读取。",
+    "后台自动同步会轮询福彩官网，一旦发现新期开奖数据就会自动入库并重算下一期预测。",
+    "开奖后的中奖判定按双色球奖金对照表执行，用于统计预测票是否命中及对应奖级。",
+)
+RED_ODD_MASK = sum(1 << (value - 1) for value in range(1, 34, 2))
+RED_ZONE_MASKS = (
+    sum(1 << (value - 1) for value in range(1, 12)),
+    sum(1 << (value - 1) for value in range(12, 23)),
+    sum(1 << (value - 1) for value in range(23, 34)),
+)
+_ZONE_WIDTH = 11
+_ZONE_BIT_SUMS = tuple(
+    sum(bit + 1 for bit in range(_ZONE_WIDTH) if chunk >> bit & 1)
+    for chunk in range(1 << _ZONE_WIDTH)
+)
+
+
+def red_mask(numbers: Iterable[str | int]) -> int:
+    """Encode red numbers as a 33-bit mask, bit ``n - 1`` standing for number ``n``."""
+    mask = 0
+    for number in numbers:
+        mask |= 1 << (int(number) - 1)
+    return mask
+
+
+def red_numbers_from_mask(mask: int) -> list[str]:
+    return [RED_NUMBERS[bit] for bit in range(len(RED_NUMBERS)) if mask >> bit & 1]
+
+
+def encode_draw(draw: dict[str, Any]) -> tuple[int, int]:
+    return red_mask(draw["red_numbers"]), int(draw["blue_number"])
+
+
+def red_mask_sum(mask: int) -> int:
+    total = 0
+    for zone_index in range(len(RED_ZONE_MASKS)):
+        chunk = mask >> (zone_index * _ZONE_WIDTH) & ((1 << _ZONE_WIDTH) - 1)
+        total += _ZONE_BIT_SUMS[chunk] + zone_index * _ZONE_WIDTH * chunk.bit_count()
+    return total
 
 
 def _z_scores(values: dict[str, float]) -> dict[str, float]:
@@ -62,6 +123,10 @@ def _recent_counter(
     return counter
 
 
+def _draw_hits(draw: dict[str, Any], is_red: bool) -> list[str]:
+    return draw["red_numbers"] if is_red else [draw["blue_number"]]
+
+
 def _build_number_stats(
     draws: list[dict[str, Any]],
     numbers: list[str],
@@ -69,12 +134,11 @@ def _build_number_stats(
     is_red: bool,
 ) -> list[dict[str, Any]]:
     total_draws = len(draws)
-    baseline = RED_BASELINE_RATE if is_red else BLUE_BASELINE_RATE
     total_counter = Counter({number: 0 for number in numbers})
     last_seen = {number: None for number in numbers}
 
     for draw_index, draw in enumerate(draws):
-        hits = draw["red_numbers"] if is_red else [draw["blue_number"]]
+        hits = _draw_hits(draw, is_red)
         total_counter.update(hits)
         for hit in hits:
             last_seen[hit] = draw_index
@@ -89,7 +153,25 @@ def _build_number_stats(
         else total_draws
         for number in numbers
     }
+    return _stats_from_counts(
+        numbers,
+        total_draws=total_draws,
+        total_counter=total_counter,
+        recent_counters=recent_counters,
+        omissions=omissions,
+        is_red=is_red,
+    )
 
+
+def _stats_from_counts(
+    numbers: list[str],
+    *,
+    total_draws: int,
+    total_counter: Counter[str],
+    recent_counters: dict[int, Counter[str]],
+    omissions: dict[str, int],
+    is_red: bool,
+) -> list[dict[str, Any]]:
     total_z = _z_scores({number: float(total_counter[number]) for number in numbers})
     recent_30_z = _z_scores(
         {number: float(recent_counters[30][number]) for number in numbers}
@@ -108,23 +190,46 @@ def _build_number_stats(
             + 0.10 * omission_z[number]
         )
     prediction_index = _scale_scores(raw_prediction_scores)
+    return _stats_rows(
+        numbers,
+        total_draws=total_draws,
+        total_hits=total_counter,
+        recent_hits=recent_counters,
+        omissions=omissions,
+        raw_prediction_scores=raw_prediction_scores,
+        prediction_index=prediction_index,
+        is_red=is_red,
+    )
 
+
+def _stats_rows(
+    numbers: list[str],
+    *,
+    total_draws: int,
+    total_hits: Mapping[str, int],
+    recent_hits: Mapping[int, Mapping[str, int]],
+    omissions: Mapping[str, int],
+    raw_prediction_scores: Mapping[str, float],
+    prediction_index: Mapping[str, float],
+    is_red: bool,
+) -> list[dict[str, Any]]:
+    baseline = RED_BASELINE_RATE if is_red else BLUE_BASELINE_RATE
     stats = []
     for number in numbers:
-        total_hits = total_counter[number]
-        historical_rate = total_hits / total_draws if total_draws else 0.0
+        number_hits = total_hits[number]
+        historical_rate = number_hits / total_draws if total_draws else 0.0
         expected_hits = total_draws * baseline
         stats.append(
             {
                 "number": number,
-                "total_hits": total_hits,
+                "total_hits": number_hits,
                 "historical_rate": historical_rate,
                 "historical_rate_percent": round(historical_rate * 100, 2),
                 "expected_hits": round(expected_hits, 2),
-                "deviation_from_expected": round(total_hits - expected_hits, 2),
-                "recent_30_hits": recent_counters[30][number],
-                "recent_60_hits": recent_counters[60][number],
-                "recent_120_hits": recent_counters[120][number],
+                "deviation_from_expected": round(number_hits - expected_hits, 2),
+                "recent_30_hits": recent_hits[30][number],
+                "recent_60_hits": recent_hits[60][number],
+                "recent_120_hits": recent_hits[120][number],
                 "omission": omissions[number],
                 "raw_prediction_score": round(raw_prediction_scores[number], 6),
                 "prediction_index": prediction_index[number],
@@ -136,6 +241,160 @@ def _build_number_stats(
     return stats
 
 
+class RollingNumberStats:
+    """Forward-only accumulator that yields ``_build_number_stats`` for every prefix.
+
+    Each ``push`` costs O(hits + windows) instead of rescanning the whole history,
+    so walking an entire draw list produces per-prefix statistics in one pass.
+    Only the hits of the widest window are kept, so a copy of the accumulator
+    is a small, picklable seed for continuing the walk elsewhere.
+    """
+
+    def __init__(self, numbers: list[str], *, is_red: bool) -> None:
+        self.numbers = numbers
+        self.is_red = is_red
+        self.total_draws = 0
+        self._total_counter: Counter[str] = Counter({number: 0 for number in numbers})
+        self._recent_counters = {
+            window: Counter({number: 0 for number in numbers})
+            for window in RECENT_WINDOWS
+        }
+        self._last_seen: dict[str, int | None] = {number: None for number in numbers}
+        self._hit_history: deque[list[str]] = deque(maxlen=max(RECENT_WINDOWS) + 1)
+
+    def push(self, draw: dict[str, Any]) -> None:
+        hits = _draw_hits(draw, self.is_red)
+        draw_index = self.total_draws
+        self._hit_history.append(hits)
+        self.total_draws += 1
+        self._total_counter.update(hits)
+        for hit in hits:
+            self._last_seen[hit] = draw_index
+        for window, counter in self._recent_counters.items():
+            counter.update(hits)
+            if len(self._hit_history) > window:
+                counter.subtract(self._hit_history[-window - 1])
+
+    def build_stats(self) -> list[dict[str, Any]]:
+        total_draws = self.total_draws
+        omissions = {
+            number: total_draws - 1 - self._last_seen[number]
+            if self._last_seen[number] is not None
+            else total_draws
+            for number in self.numbers
+        }
+        return _stats_from_counts(
+            self.numbers,
+            total_draws=total_draws,
+            total_counter=self._total_counter,
+            recent_counters=self._recent_counters,
+            omissions=omissions,
+            is_red=self.is_red,
+        )
+
+
+class DrawMatrix:
+    """One-hot view of the draw history: ``red`` is (n x 33), ``blue`` is (n x 16)."""
+
+    def __init__(self, draws: list[dict[str, Any]]) -> None:
+        if np is None:
+            raise RuntimeError("向量化统计需要安装 NumPy。")
+        draw_count = len(draws)
+        red_rows = np.repeat(
+            np.arange(draw_count),
+            [len(draw["red_numbers"]) for draw in draws],
+        )
+        red_columns = np.fromiter(
+            (int(number) - 1 for draw in draws for number in draw["red_numbers"]),
+            dtype=np.intp,
+            count=len(red_rows),
+        )
+        blue_columns = np.fromiter(
+            (int(draw["blue_number"]) - 1 for draw in draws),
+            dtype=np.intp,
+            count=draw_count,
+        )
+        self.red = np.zeros((draw_count, len(RED_NUMBERS)), dtype=np.int32)
+        self.red[red_rows, red_columns] = 1
+        self.blue = np.zeros((draw_count, len(BLUE_NUMBERS)), dtype=np.int32)
+        self.blue[np.arange(draw_count), blue_columns] = 1
+
+    def __len__(self) -> int:
+        return int(self.red.shape[0])
+
+
+def _z_scores_array(values: Any) -> Any:
+    # Reductions go through the builtin ``sum`` so the floats match ``_z_scores``
+    # bit for bit; everything else is elementwise.
+    sample = values.tolist()
+    mean_value = sum(sample) / len(sample)
+    variance = sum(((values - mean_value) ** 2).tolist()) / len(sample)
+    std_value = variance**0.5 or 1.0
+    return (values - mean_value) / std_value
+
+
+def _build_number_stats_vectorized(
+    hit_matrix: Any,
+    numbers: list[str],
+    *,
+    is_red: bool,
+) -> list[dict[str, Any]]:
+    total_draws = int(hit_matrix.shape[0])
+    totals = hit_matrix.sum(axis=0)
+    recent = {window: hit_matrix[-window:].sum(axis=0) for window in RECENT_WINDOWS}
+    reversed_hits = hit_matrix[::-1]
+    omissions = np.where(
+        reversed_hits.any(axis=0),
+        reversed_hits.argmax(axis=0),
+        total_draws,
+    )
+
+    raw_scores = (
+        0.45 * _z_scores_array(totals.astype(np.float64))
+        + 0.25 * _z_scores_array(recent[30].astype(np.float64))
+        + 0.20 * _z_scores_array(recent[60].astype(np.float64))
+        + 0.10 * _z_scores_array(omissions.astype(np.float64))
+    )
+    minimum = float(raw_scores.min())
+    maximum = float(raw_scores.max())
+    if math.isclose(minimum, maximum):
+        index_values = [50.0] * len(numbers)
+    else:
+        index_values = [
+            round(value, 2)
+            for value in ((raw_scores - minimum) / (maximum - minimum) * 100).tolist()
+        ]
+
+    return _stats_rows(
+        numbers,
+        total_draws=total_draws,
+        total_hits=dict(zip(numbers, totals.tolist())),
+        recent_hits={
+            window: dict(zip(numbers, counts.tolist()))
+            for window, counts in recent.items()
+        },
+        omissions=dict(zip(numbers, omissions.tolist())),
+        raw_prediction_scores=dict(zip(numbers, raw_scores.tolist())),
+        prediction_index=dict(zip(numbers, index_values)),
+        is_red=is_red,
+    )
+
+
+def _build_red_blue_stats(
+    draws: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    if STATS_ENGINE == "numpy":
+        matrix = DrawMatrix(draws)
+        return (
+            _build_number_stats_vectorized(matrix.red, RED_NUMBERS, is_red=True),
+            _build_number_stats_vectorized(matrix.blue, BLUE_NUMBERS, is_red=False),
+        )
+    return (
+        _build_number_stats(draws, RED_NUMBERS, is_red=True),
+        _build_number_stats(draws, BLUE_NUMBERS, is_red=False),
+    )
+
+
 def _ranked(stats: list[dict[str, Any]], key: str, reverse: bool = True) -> list[dict[str, Any]]:
     return sorted(stats, key=lambda item: item[key], reverse=reverse)
 
@@ -151,20 +410,21 @@ def _draw_score(
 
 
 def _build_duplicates(draws: list[dict[str, Any]]) -> dict[str, Any]:
-    exact_map: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
-    red_only_map: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    exact_map: dict[tuple[int, int], list[dict[str, Any]]] = defaultdict(list)
+    red_only_map: dict[int, list[dict[str, Any]]] = defaultdict(list)
 
     for draw in draws:
-        exact_map[(draw["red_display"], draw["blue_display"])].append(draw)
-        red_only_map[draw["red_display"]].append(draw)
+        mask, blue = encode_draw(draw)
+        exact_map[(mask, blue)].append(draw)
+        red_only_map[mask].append(draw)
 
     exact_duplicates = []
-    for (red, blue), items in exact_map.items():
+    for items in exact_map.values():
         if len(items) > 1:
             exact_duplicates.append(
                 {
-                    "red": red,
-                    "blue": blue,
+                    "red": items[0]["red_display"],
+                    "blue": items[0]["blue_display"],
                     "count": len(items),
                     "issues": [
                         {
@@ -177,11 +437,11 @@ def _build_duplicates(draws: list[dict[str, Any]]) -> dict[str, Any]:
             )
 
     red_only_duplicates = []
-    for red, items in red_only_map.items():
+    for items in red_only_map.values():
         if len(items) > 1:
             red_only_duplicates.append(
                 {
-                    "red": red,
+                    "red": items[0]["red_display"],
                     "count": len(items),
                     "issues": [
                         {
@@ -202,117 +462,195 @@ def _build_duplicates(draws: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
-def _odd_even_balance(numbers: list[int]) -> int:
-    return sum(number % 2 for number in numbers)
+def _odd_even_balance(mask: int) -> int:
+    return (mask & RED_ODD_MASK).bit_count()
 
 
-def _zone_counts(numbers: list[int]) -> list[int]:
-    return [
-        sum(1 for number in numbers if 1 <= number <= 11),
-        sum(1 for number in numbers if 12 <= number <= 22),
-        sum(1 for number in numbers if 23 <= number <= 33),
-    ]
+def _zone_counts(mask: int) -> list[int]:
+    return [(mask & zone_mask).bit_count() for zone_mask in RED_ZONE_MASKS]
+
+
+def ticket_summary(mask: int) -> str:
+    odd_count = _odd_even_balance(mask)
+    zone_a, zone_b, zone_c = _zone_counts(mask)
+    return f"奇偶比 {odd_count}:{6 - odd_count}，三区比 {zone_a}:{zone_b}:{zone_c}。"
 
 
-def _is_balanced_combo(numbers: list[str]) -> bool:
-    values = sorted(int(number) for number in numbers)
-    odd_count = _odd_even_balance(values)
+def _is_balanced_mask(mask: int) -> bool:
+    odd_count = _odd_even_balance(mask)
     if odd_count not in (2, 3, 4):
         return False
 
-    zones = _zone_counts(values)
+    zones = _zone_counts(mask)
     if 0 in zones or max(zones) > 3:
         return False
 
-    total_sum = sum(values)
+    total_sum = red_mask_sum(mask)
     if total_sum < 70 or total_sum > 155:
         return False
 
-    consecutive_pairs = sum(
-        1 for index in range(1, len(values)) if values[index] == values[index - 1] + 1
-    )
+    consecutive_pairs = (mask & (mask >> 1)).bit_count()
     return consecutive_pairs <= 2
 
 
+def _iter_ranked_red_combos(
+    pool: list[tuple[int, int]],
+    *,
+    balanced: bool,
+) -> Iterator[tuple[int, int]]:
+    """Yield ``(red_mask, score_cents)`` for 6-number combinations of ``pool``, best first.
+
+    ``pool`` holds ``(number, score_cents)`` pairs sorted by number. Ties keep the
+    ``itertools.combinations`` order, so the sequence equals a stable descending sort
+    of every combination. Branch-and-bound over include/exclude decisions means only
+    the prefix that is actually consumed gets explored. With ``balanced`` the search
+    prunes branches that can no longer meet the odd/even, zone, sum and consecutive
+    rules and yields combinations accepted by ``_is_balanced_mask``; otherwise it
+    yields the remaining, unbalanced ones.
+    """
+    size = len(pool)
+    numbers = [number for number, _ in pool]
+    scores = [score for _, score in pool]
+    pick = 6
+    # best_tail[i][r]: the highest total of r scores that pool[i:] can still add.
+    best_tail = [[0] * (pick + 1) for _ in range(size + 1)]
+    for index in range(size - 1, -1, -1):
+        for remaining in range(1, min(pick, size - index) + 1):
+            skip = best_tail[index + 1][remaining] if size - index - 1 >= remaining else None
+            take = scores[index] + best_tail[index + 1][remaining - 1]
+            best_tail[index][remaining] = take if skip is None else max(skip, take)
+    zones_left = [0] * (size + 1)
+    for index in range(size - 1, -1, -1):
+        zone_bits = 0
+        for zone_index, zone_mask in enumerate(RED_ZONE_MASKS):
+            if zone_mask >> (numbers[index] - 1) & 1:
+                zone_bits = 1 << zone_index
+        zones_left[index] = zones_left[index + 1] | zone_bits
+
+    def can_still_balance(mask: int, number_sum: int, index: int, remaining: int) -> bool:
+        count = pick - remaining
+        odd_count = _odd_even_balance(mask)
+        even_count = count - odd_count
+        if odd_count > 4 or even_count > 4:
+            return False
+        if odd_count + remaining < 2 or even_count + remaining < 2:
+            return False
+        empty_zones = 0
+        for zone_index, zone_count in enumerate(_zone_counts(mask)):
+            if zone_count > 3:
+                return False
+            if zone_count == 0:
+                if not zones_left[index] >> zone_index & 1:
+                    return False
+                empty_zones += 1
+        if empty_zones > remaining:
+            return False
+        if number_sum + sum(numbers[index : index + remaining]) > 155:
+            return False
+        if number_sum + sum(numbers[size - remaining :]) < 70:
+            return False
+        return (mask & (mask >> 1)).bit_count() <= 2
+
+    # Partial states sort ahead of complete ones with the same bound, so a
+    # combination is only yielded once nothing left can beat or tie it earlier.
+    heap: list[tuple[int, int, tuple[int, ...], int, int, int, int]] = []
+    if size >= pick:
+        heap.append((-best_tail[0][pick], 0, (), 0, 0, 0, 0))
+    while heap:
+        _, complete, chosen, index, mask, score, number_sum = heapq.heappop(heap)
+        if complete:
+            yield mask, score
+            continue
+        for include in (True, False):
+            if include:
+                next_chosen = chosen + (index,)
+                next_mask = mask | 1 << (numbers[index] - 1)
+                next_score = score + scores[index]
+                next_sum = number_sum + numbers[index]
+            else:
+                next_chosen, next_mask, next_score, next_sum = chosen, mask, score, number_sum
+            next_index = index + 1
+            remaining = pick - len(next_chosen)
+            if remaining == 0:
+                if _is_balanced_mask(next_mask) == balanced:
+                    heapq.heappush(
+                        heap,
+                        (-next_score, 1, next_chosen, next_index, next_mask, next_score, next_sum),
+                    )
+                continue
+            if size - next_index < remaining:
+                continue
+            if balanced and not can_still_balance(next_mask, next_sum, next_index, remaining):
+                continue
+            heapq.heappush(
+                heap,
+                (
+                    -(next_score + best_tail[next_index][remaining]),
+                    0,
+                    next_chosen,
+                    next_index,
+                    next_mask,
+                    next_score,
+                    next_sum,
+                ),
+            )
+
+
 def _build_candidate_tickets(
     red_stats: list[dict[str, Any]],
     blue_stats: list[dict[str, Any]],
+    *,
+    red_pool_size: int = RED_POOL_SIZE,
 ) -> dict[str, Any]:
     ranked_red = _ranked(red_stats, "prediction_index")
     ranked_blue = _ranked(blue_stats, "prediction_index")
-    red_pool = ranked_red[:15]
+    red_pool = ranked_red[:red_pool_size]
     blue_pool = ranked_blue[:6]
-    red_score_map = {item["number"]: item["prediction_index"] for item in red_pool}
-    sorted_red_pool_numbers = sorted(
-        [item["number"] for item in red_pool],
-        key=lambda value: int(value),
+    # Scores are kept in integer hundredths so sums compare exactly; dividing
+    # by 100 gives the same value as rounding the float sum to 2 decimals.
+    sorted_red_pool = sorted(
+        (int(item["number"]), round(item["prediction_index"] * 100))
+        for item in red_pool
     )
 
-    balanced_candidates = []
-    fallback_candidates = []
-    for combo in itertools.combinations(sorted_red_pool_numbers, 6):
-        sorted_combo = sorted(combo, key=lambda value: int(value))
-        combo_score = round(sum(red_score_map[number] for number in combo), 2)
-        candidate = {
-            "red_numbers": sorted_combo,
-            "red_score": combo_score,
-        }
-        if _is_balanced_combo(list(combo)):
-            balanced_candidates.append(candidate)
-        else:
-            fallback_candidates.append(candidate)
-
-    balanced_candidates.sort(key=lambda item: item["red_score"], reverse=True)
-    fallback_candidates.sort(key=lambda item: item["red_score"], reverse=True)
-
     selected_red_sets = []
-    selected_signatures = set()
-    for candidate in balanced_candidates:
-        overlap_too_high = False
-        for picked in selected_red_sets:
-            overlap = len(set(candidate["red_numbers"]) & set(picked["red_numbers"]))
-            if overlap >= 5:
-                overlap_too_high = True
-                break
-        if overlap_too_high:
+    selected_masks = set()
+    for mask, score in _iter_ranked_red_combos(sorted_red_pool, balanced=True):
+        if any(
+            (mask & picked["red_mask"]).bit_count() >= 5
+            for picked in selected_red_sets
+        ):
             continue
-        selected_red_sets.append(candidate)
-        selected_signatures.add(tuple(candidate["red_numbers"]))
+        selected_red_sets.append({"red_mask": mask, "red_score": score / 100})
+        selected_masks.add(mask)
         if len(selected_red_sets) >= 5:
             break
 
     if len(selected_red_sets) < 5:
-        for candidate in balanced_candidates + fallback_candidates:
-            signature = tuple(candidate["red_numbers"])
-            if signature in selected_signatures:
+        for mask, score in itertools.chain(
+            _iter_ranked_red_combos(sorted_red_pool, balanced=True),
+            _iter_ranked_red_combos(sorted_red_pool, balanced=False),
+        ):
+            if mask in selected_masks:
                 continue
-            selected_red_sets.append(candidate)
-            selected_signatures.add(signature)
+            selected_red_sets.append({"red_mask": mask, "red_score": score / 100})
+            selected_masks.add(mask)
             if len(selected_red_sets) >= 5:
                 break
 
     ticket_list = []
     for index, red_candidate in enumerate(selected_red_sets[:5]):
         blue_candidate = blue_pool[index % len(blue_pool)]
-        sorted_red_numbers = sorted(
-            red_candidate["red_numbers"],
-            key=lambda value: int(value),
-        )
-        values = [int(number) for number in sorted_red_numbers]
-        odd_count = _odd_even_balance(values)
-        zone_a, zone_b, zone_c = _zone_counts(values)
+        mask = red_candidate["red_mask"]
         ticket_list.append(
             {
                 "rank": index + 1,
-                "red_numbers": sorted_red_numbers,
+                "red_numbers": red_numbers_from_mask(mask),
                 "blue_number": blue_candidate["number"],
                 "score": round(
                     red_candidate["red_score"] + blue_candidate["prediction_index"], 2
                 ),
-                "summary": (
-                    f"奇偶比 {odd_count}:{6 - odd_count}，"
-                    f"三区比 {zone_a}:{zone_b}:{zone_c}。"
-                ),
+                "summary": ticket_summary(mask),
             }
         )
 
@@ -344,23 +682,118 @@ def _build_candidate_tickets(
     }
 
 
+class DrawScoreIndex:
+    """Number positions of a draw list, for scoring any prefix of it.
+
+    Scores are accumulated one drawn number at a time in draw order, exactly as
+    ``_draw_score`` adds them, so the sums are bit-identical to it. With NumPy a
+    prefix is scored by a few array gathers; without it by a Python loop.
+    """
+
+    # Scores further than this from the latest one cannot round to the same
+    # six decimals, so only the few inside it go through ``round``.
+    _ROUNDING_BAND = 2e-6
+
+    def __init__(self, draws: list[dict[str, Any]]) -> None:
+        red = [[int(number) - 1 for number in draw["red_numbers"]] for draw in draws]
+        blue = [int(draw["blue_number"]) - 1 for draw in draws]
+        self.vectorized = STATS_ENGINE == "numpy"
+        if self.vectorized:
+            self.red = np.array(red, dtype=np.intp).reshape(len(draws), -1)
+            self.blue = np.array(blue, dtype=np.intp)
+        else:
+            self.red = red
+            self.blue = blue
+
+    def head(self, end: int) -> DrawScoreIndex:
+        """The index of the first ``end`` draws, e.g. to ship a prefix to a worker."""
+        index = object.__new__(DrawScoreIndex)
+        index.vectorized = self.vectorized
+        index.red = self.red[:end]
+        index.blue = self.blue[:end]
+        return index
+
+    def score_percentile(
+        self,
+        end: int,
+        red_stats: list[dict[str, Any]],
+        blue_stats: list[dict[str, Any]],
+    ) -> tuple[float, float]:
+        """``(score of draw end - 1, percentile of it among draws[:end])``."""
+        red_scores = [item["raw_prediction_score"] for item in red_stats]
+        blue_scores = [item["raw_prediction_score"] for item in blue_stats]
+        if self.vectorized:
+            return self._score_percentile_array(end, red_scores, blue_scores)
+
+        draw_scores = [
+            round(
+                sum(red_scores[position] for position in self.red[index])
+                + blue_scores[self.blue[index]],
+                6,
+            )
+            for index in range(end)
+        ]
+        latest_score = draw_scores[-1]
+        return latest_score, sum(1 for score in draw_scores if score <= latest_score) / end * 100
+
+    def _score_percentile_array(
+        self,
+        end: int,
+        red_scores: list[float],
+        blue_scores: list[float],
+    ) -> tuple[float, float]:
+        red_values = np.array(red_scores)
+        scores = np.zeros(end)
+        for column in range(self.red.shape[1]):
+            scores += red_values[self.red[:end, column]]
+        scores += np.array(blue_scores)[self.blue[:end]]
+
+        latest_score = round(float(scores[-1]), 6)
+        at_or_below = int(np.count_nonzero(scores <= latest_score - self._ROUNDING_BAND))
+        near = scores[np.abs(scores - latest_score) < self._ROUNDING_BAND]
+        at_or_below += sum(1 for score in near.tolist() if round(score, 6) <= latest_score)
+        return latest_score, at_or_below / end * 100
+
+
+def _score_percentile(
+    draws: list[dict[str, Any]],
+    end: int,
+    red_by_number: dict[str, dict[str, Any]],
+    blue_by_number: dict[str, dict[str, Any]],
+) -> tuple[float, float]:
+    draw_scores = [
+        _draw_score(draws[index], red_by_number, blue_by_number) for index in range(end)
+    ]
+    latest_score = draw_scores[-1]
+    return latest_score, sum(1 for score in draw_scores if score <= latest_score) / end * 100
+
+
 def _latest_issue_report(
     draws: list[dict[str, Any]],
     red_stats: list[dict[str, Any]],
     blue_stats: list[dict[str, Any]],
+    *,
+    end: int | None = None,
+    score_end: int | None = None,
+    score_index: DrawScoreIndex | None = None,
 ) -> dict[str, Any]:
-    latest = draws[-1]
+    """Report on ``draws[end - 1]`` as the latest issue of ``draws[:end]``.
+
+    ``score_end`` is the same prefix's end in the history ``score_index`` was
+    built from, when ``draws`` is only its tail.
+    """
+    end = len(draws) if end is None else end
+    latest = draws[end - 1]
     red_by_number = {item["number"]: item for item in red_stats}
     blue_by_number = {item["number"]: item for item in blue_stats}
-    draw_scores = []
-    for draw in draws:
-        draw_scores.append(_draw_score(draw, red_by_number, blue_by_number))
-    latest_score = draw_scores[-1]
-    percentile = (
-        sum(1 for score in draw_scores if score <= latest_score) / len(draw_scores) * 100
-        if draw_scores
-        else 0.0
-    )
+    if score_index is not None:
+        latest_score, percentile = score_index.score_percentile(
+            end if score_end is None else score_end, red_stats, blue_stats
+        )
+    else:
+        latest_score, percentile = _score_percentile(
+            draws, end, red_by_number, blue_by_number
+        )
 
     latest_red = [red_by_number[number] for number in latest["red_numbers"]]
     latest_blue = blue_by_number[latest["blue_number"]]
@@ -385,13 +818,23 @@ def _latest_issue_report(
     }
 
 
-def build_prediction_artifacts(draws: list[dict[str, Any]]) -> dict[str, Any]:
-    if not draws:
-        raise RuntimeError("没有可分析的双色球历史数据。")
-
-    red_stats = _build_number_stats(draws, RED_NUMBERS, is_red=True)
-    blue_stats = _build_number_stats(draws, BLUE_NUMBERS, is_red=False)
-    latest_issue = _latest_issue_report(draws, red_stats, blue_stats)
+def _prediction_artifacts_from_stats(
+    draws: list[dict[str, Any]],
+    red_stats: list[dict[str, Any]],
+    blue_stats: list[dict[str, Any]],
+    *,
+    end: int | None = None,
+    score_end: int | None = None,
+    score_index: DrawScoreIndex | None = None,
+) -> dict[str, Any]:
+    latest_issue = _latest_issue_report(
+        draws,
+        red_stats,
+        blue_stats,
+        end=end,
+        score_end=score_end,
+        score_index=score_index,
+    )
     prediction = _build_candidate_tickets(red_stats, blue_stats)
     return {
         "red_stats": red_stats,
@@ -401,6 +844,167 @@ def build_prediction_artifacts(draws: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+def build_prediction_artifacts(draws: list[dict[str, Any]]) -> dict[str, Any]:
+    if not draws:
+        raise RuntimeError("没有可分析的双色球历史数据。")
+
+    red_stats, blue_stats = _build_red_blue_stats(draws)
+    return _prediction_artifacts_from_stats(draws, red_stats, blue_stats)
+
+
+def iter_prediction_artifacts(
+    draws: list[dict[str, Any]],
+    base_indexes: Iterable[int],
+    *,
+    first_index: int = 0,
+    rolling: tuple[RollingNumberStats, RollingNumberStats] | None = None,
+    score_index: DrawScoreIndex | None = None,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(base_index, build_prediction_artifacts(history[: base_index + 1]))``.
+
+    The number statistics come from rolling counters, so they cost O(1) per
+    draw. The historical score percentile still rescores the whole prefix for
+    every emitted base index: with NumPy that O(n) term is a handful of array
+    gathers through a DrawScoreIndex, without it a Python loop.
+
+    To continue a walk elsewhere, pass only ``history[first_index:]`` as
+    ``draws`` together with the red/blue accumulators that have seen the
+    ``first_index`` draws before it and a ``score_index`` built from the full
+    history; ``base_indexes`` stay positions in the full history.
+    """
+    wanted = sorted(set(base_indexes))
+    if not wanted:
+        return
+    if wanted[0] < first_index or wanted[-1] >= first_index + len(draws):
+        raise IndexError("预测快照的基准期超出历史数据范围。")
+    if first_index and (rolling is None or score_index is None):
+        raise ValueError("从中途开始时需要提供滚动统计和评分索引。")
+
+    if score_index is None:
+        score_index = DrawScoreIndex(draws)
+    red_rolling, blue_rolling = rolling or (
+        RollingNumberStats(RED_NUMBERS, is_red=True),
+        RollingNumberStats(BLUE_NUMBERS, is_red=False),
+    )
+    if red_rolling.total_draws != first_index or blue_rolling.total_draws != first_index:
+        raise ValueError("滚动统计的期数与起始位置不一致。")
+    next_position = 0
+    for draw_index in range(first_index, wanted[-1] + 1):
+        draw = draws[draw_index - first_index]
+        red_rolling.push(draw)
+        blue_rolling.push(draw)
+        if draw_index != wanted[next_position]:
+            continue
+        next_position += 1
+        yield draw_index, _prediction_artifacts_from_stats(
+            draws,
+            red_rolling.build_stats(),
+            blue_rolling.build_stats(),
+            end=draw_index + 1 - first_index,
+            score_end=draw_index + 1,
+            score_index=score_index,
+        )
+
+
+class ReportSections:
+    """Computes report sections from one draw list on demand, memoizing each part."""
+
+    def __init__(
+        self,
+        draws: list[dict[str, Any]],
+        *,
+        load_rows: Callable[[], list[dict[str, Any]]] | None = None,
+    ) -> None:
+        if not draws:
+            raise RuntimeError("没有可分析的双色球历史数据。")
+        self.draws = draws
+        # Full rows (content, details_link, ...) are only needed by the draws section.
+        self._load_rows = load_rows
+        self._lock = threading.RLock()
+        self._memo: dict[str, Any] = {}
+
+    def _cached(self, key: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = factory()
+            return self._memo[key]
+
+    def _number_stats(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        return self._cached("number_stats", lambda: _build_red_blue_stats(self.draws))
+
+    def _duplicates(self) -> dict[str, Any]:
+        return self._cached("duplicates", lambda: _build_duplicates(self.draws))
+
+    def _section_summary(self) -> dict[str, Any]:
+        red_stats, blue_stats = self._number_stats()
+        red_ranked_hits = _ranked(red_stats, "total_hits")
+        blue_ranked_hits = _ranked(blue_stats, "total_hits")
+        duplicates = self._duplicates()
+        return {
+            "summary": {
+                "draw_count": len(self.draws),
+                "latest_issue": self.draws[-1]["issue"],
+                "latest_date": self.draws[-1]["date"],
+                "exact_duplicate_count": len(duplicates["exact_duplicates"]),
+                "red_only_duplicate_count": len(duplicates["red_only_duplicates"]),
+                "most_frequent_red": red_ranked_hits[0],
+                "least_frequent_red": red_ranked_hits[-1],
+                "most_frequent_blue": blue_ranked_hits[0],
+                "least_frequent_blue": blue_ranked_hits[-1],
+            }
+        }
+
+    def _section_latest_issue_analysis(self) -> dict[str, Any]:
+        red_stats, blue_stats = self._number_stats()
+        return {
+            "latest_issue_analysis": _latest_issue_report(self.draws, red_stats, blue_stats)
+        }
+
+    def _section_hot_cold(self) -> dict[str, Any]:
+        red_stats, blue_stats = self._number_stats()
+        red_ranked_score = _ranked(red_stats, "prediction_index")
+        blue_ranked_score = _ranked(blue_stats, "prediction_index")
+        return {
+            "hot_cold": {
+                "red_hot": red_ranked_score[:10],
+                "red_cold": red_ranked_score[-10:],
+                "blue_hot": blue_ranked_score[:6],
+                "blue_cold": blue_ranked_score[-6:],
+            }
+        }
+
+    def _section_duplicates(self) -> dict[str, Any]:
+        return {"duplicates": self._duplicates()}
+
+    def _section_prediction(self) -> dict[str, Any]:
+        red_stats, blue_stats = self._number_stats()
+        return {"prediction": _build_candidate_tickets(red_stats, blue_stats)}
+
+    def _section_stats(self) -> dict[str, Any]:
+        red_stats, blue_stats = self._number_stats()
+        return {"red_stats": red_stats, "blue_stats": blue_stats}
+
+    def _section_draws(self) -> dict[str, Any]:
+        rows = self._load_rows() if self._load_rows else self.draws
+        return {"draws": list(reversed(rows))}
+
+    def section(self, name: str) -> dict[str, Any]:
+        if name not in REPORT_SECTIONS:
+            raise ValueError(f"未知的报告分区: {name}")
+        return self._cached(f"section:{name}", getattr(self, f"_section_{name}"))
+
+
+def parse_report_sections(value: str | None) -> tuple[str, ...]:
+    """Parse a comma separated ``sections`` value; ``None`` selects every section."""
+    if value is None:
+        return REPORT_SECTIONS
+    names = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [name for name in names if name not in REPORT_SECTIONS]
+    if unknown:
+        raise ValueError(f"未知的报告分区: {', '.join(unknown)}")
+    return tuple(name for name in REPORT_SECTIONS if name in names)
+
+
 def build_report_from_draws(
     draws: list[dict[str, Any]],
     *,
@@ -411,24 +1015,14 @@ def build_report_from_draws(
     database: dict[str, Any],
     automation: dict[str, Any],
     latest_prediction_snapshot: dict[str, Any] | None,
+    sections: Iterable[str] = REPORT_SECTIONS,
+    report_sections: ReportSections | None = None,
 ) -> dict[str, Any]:
     if not draws:
         raise RuntimeError("没有可分析的双色球历史数据。")
 
-    prediction_artifacts = build_prediction_artifacts(draws)
-    red_stats = prediction_artifacts["red_stats"]
-    blue_stats = prediction_artifacts["blue_stats"]
-
-    red_ranked_hits = _ranked(red_stats, "total_hits")
-    blue_ranked_hits = _ranked(blue_stats, "total_hits")
-    red_ranked_score = _ranked(red_stats, "prediction_index")
-    blue_ranked_score = _ranked(blue_stats, "prediction_index")
-
-    duplicates = _build_duplicates(draws)
-    latest_issue = prediction_artifacts["latest_issue_analysis"]
-    candidates = prediction_artifacts["prediction"]
-
-    return {
+    report_sections = report_sections or ReportSections(draws)
+    report = {
         "generated_at": generated_at,
         "cache_status": data_status,
         "cache_warning": data_warning,
@@ -438,41 +1032,18 @@ def build_report_from_draws(
             **automation,
             "latest_prediction": latest_prediction_snapshot or automation.get("latest_prediction"),
         },
-        "summary": {
-            "draw_count": len(draws),
-            "latest_issue": draws[-1]["issue"],
-            "latest_date": draws[-1]["date"],
-            "exact_duplicate_count": len(duplicates["exact_duplicates"]),
-            "red_only_duplicate_count": len(duplicates["red_only_duplicates"]),
-            "most_frequent_red": red_ranked_hits[0],
-            "least_frequent_red": red_ranked_hits[-1],
-            "most_frequent_blue": blue_ranked_hits[0],
-            "least_frequent_blue": blue_ranked_hits[-1],
-        },
-        "latest_issue_analysis": latest_issue,
-        "hot_cold": {
-            "red_hot": red_ranked_score[:10],
-            "red_cold": red_ranked_score[-10:],
-            "blue_hot": blue_ranked_score[:6],
-            "blue_cold": blue_ranked_score[-6:],
-        },
-        "duplicates": duplicates,
-        "prediction": candidates,
-        "red_stats": red_stats,
-        "blue_stats": blue_stats,
-        "draws": list(reversed(draws)),
-        "notes": [
-            "严格数学上，每一注双色球组合的开奖概率相同，历史频率不会改变随机开奖本质。",
-            "页面中的预测分数是基于历史频率、近30/60期趋势和当前遗漏值的经验排序，只适合做数据参考。",
-            "当前给出的5注预测号码全部由历史数据模型确定性计算生成，没有使用随机数。",
-            "历史开奖数据现在会写入本地 SQLite 数据库，页面分析直接从数据库读取。",
-            "后台自动同步会轮询福彩官网，一旦发现新期开奖数据就会自动入库并重算下一期预测。",
-            "开奖后的中奖判定按双色球奖金对照表执行，用于统计预测票是否命中及对应奖级。",
-        ],
+        "sections": list(sections),
     }
+    for name in sections:
+        report.update(report_sections.section(name))
+    report["notes"] = list(REPORT_NOTES)
+    return report
 
 
-def build_report(force_refresh: bool = False) -> dict[str, Any]:
+def build_report(
+    force_refresh: bool = False,
+    sections: Iterable[str] = REPORT_SECTIONS,
+) -> dict[str, Any]:
     from .service import build_report_data
 
-    return build_report_data(force_refresh=force_refresh)
+    return build_report_data(force_refresh=force_refresh, sections=sections)
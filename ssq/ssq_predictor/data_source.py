@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import gzip
 import json
+import os
 import re
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
 OFFICIAL_PAGE_URL = "https://www.cwl.gov.cn/ygkj/wqkjgg/ssq/"
 OFFICIAL_API_URL = (
@@ -17,11 +22,41 @@ OFFICIAL_API_URL = (
 FALLBACK_SOURCE_PAGE_URL = "https://api.huiniao.top/"
 FALLBACK_API_URL = "https://api.huiniao.top/interface/home/lotteryHistory"
 DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "ssq_history.json"
+CACHE_FORMAT = "ssq-history-cache"
+CACHE_VERSION = 2
+CACHE_HEADER_BYTES = 512
+CACHE_HEADER_FIELDS = (
+    "fetched_at",
+    "source_name",
+    "source_page_url",
+    "source_api_url",
+    "official_total",
+)
+SNAPSHOT_FORMAT = "ssq-draws-ndjson"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DRAW_FIELDS = (
+    "issue",
+    "date",
+    "weekday",
+    "red_numbers",
+    "blue_number",
+    "red_display",
+    "blue_display",
+    "sales",
+    "poolmoney",
+    "content",
+    "details_link",
+)
 DEFAULT_PAGE_SIZE = 30
 FALLBACK_PAGE_SIZE = 500
 DEFAULT_CACHE_MAX_AGE_HOURS = 12
 REQUEST_TIMEOUT = 20
 MAX_RETRIES = 5
+DEFAULT_OFFICIAL_CONCURRENCY = 4
+DEFAULT_OFFICIAL_REQUESTS_PER_SECOND = 8.0
+DEFAULT_HEDGE_AFTER_SECONDS = 8.0
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_OPEN_SECONDS = 600
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36"
@@ -37,6 +72,225 @@ class FetchError(RuntimeError):
     pass
 
 
+class FetchCancelled(FetchError):
+    pass
+
+
+class CircuitOpenError(FetchError):
+    pass
+
+
+def _check_cancelled(cancel_event: threading.Event | None) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise FetchCancelled("抓取已取消")
+
+
+def _backoff(seconds: float, cancel_event: threading.Event | None) -> None:
+    if cancel_event is None:
+        time.sleep(seconds)
+        return
+    cancel_event.wait(seconds)
+    _check_cancelled(cancel_event)
+
+
+class TokenBucket:
+    """Blocking token bucket shared by every thread that talks to one site."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("每秒请求数必须大于 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+_OFFICIAL_FETCH_LOCK = threading.Lock()
+_OFFICIAL_FETCH_SETTINGS: dict[str, int | float] = {
+    "concurrency": DEFAULT_OFFICIAL_CONCURRENCY,
+    "requests_per_second": DEFAULT_OFFICIAL_REQUESTS_PER_SECOND,
+    "hedge_after_seconds": DEFAULT_HEDGE_AFTER_SECONDS,
+}
+_OFFICIAL_RATE_LIMITER = TokenBucket(
+    DEFAULT_OFFICIAL_REQUESTS_PER_SECOND,
+    capacity=DEFAULT_OFFICIAL_CONCURRENCY,
+)
+
+
+def configure_official_fetch(
+    *,
+    concurrency: int | None = None,
+    requests_per_second: float | None = None,
+    hedge_after_seconds: float | None = None,
+) -> dict[str, int | float]:
+    """Tune official page concurrency, rate and when to hedge with the fallback.
+
+    A hedge threshold of 0 disables hedging: the fallback then only runs after
+    the official source has failed.
+    """
+    global _OFFICIAL_RATE_LIMITER
+    with _OFFICIAL_FETCH_LOCK:
+        settings = dict(_OFFICIAL_FETCH_SETTINGS)
+        if concurrency is not None:
+            if int(concurrency) < 1:
+                raise ValueError("并发数必须大于等于 1")
+            settings["concurrency"] = int(concurrency)
+        if requests_per_second is not None:
+            if float(requests_per_second) <= 0:
+                raise ValueError("每秒请求数必须大于 0")
+            settings["requests_per_second"] = float(requests_per_second)
+        if hedge_after_seconds is not None:
+            if float(hedge_after_seconds) < 0:
+                raise ValueError("对冲等待时间不能小于 0")
+            settings["hedge_after_seconds"] = float(hedge_after_seconds)
+        _OFFICIAL_RATE_LIMITER = TokenBucket(
+            settings["requests_per_second"],
+            capacity=settings["concurrency"],
+        )
+        _OFFICIAL_FETCH_SETTINGS.update(settings)
+        return dict(settings)
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around one upstream source.
+
+    State changes are handed to ``persist`` together with the transition, so
+    the owner can store them and restore the breaker after a restart.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._probe_in_flight = False
+        self._persist: Callable[[dict[str, Any], dict[str, Any] | None], None] | None = None
+        self._state = self._closed_state()
+
+    def _closed_state(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": "closed",
+            "failure_count": 0,
+            "opened_at": None,
+            "next_probe_at": None,
+            "last_error": "",
+            "updated_at": None,
+        }
+
+    def bind(
+        self,
+        stored: dict[str, Any] | None,
+        persist: Callable[[dict[str, Any], dict[str, Any] | None], None] | None,
+    ) -> None:
+        with self._lock:
+            self._state = self._closed_state()
+            if stored:
+                self._state.update(
+                    {key: stored[key] for key in self._state if key in stored}
+                )
+            self._probe_in_flight = False
+            self._persist = persist
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
+
+    def before_request(self) -> str:
+        """Return "closed" or "half_open"; raise CircuitOpenError when the source must be skipped."""
+        with self._lock:
+            state = self._state["state"]
+            if state == "closed":
+                return state
+            if state == "open":
+                next_probe_at = self._state["next_probe_at"]
+                if next_probe_at and datetime.fromisoformat(next_probe_at) > datetime.now():
+                    raise CircuitOpenError(
+                        f"官方接口熔断中，{next_probe_at.replace('T', ' ')} 后再探测"
+                    )
+                self._transition("half_open", "冷却结束，放行一次探测")
+            if self._probe_in_flight:
+                raise CircuitOpenError("官方接口熔断探测进行中")
+            self._probe_in_flight = True
+            return "half_open"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+            if self._state["state"] != "closed":
+                self._state["failure_count"] = 0
+                self._state["opened_at"] = None
+                self._state["next_probe_at"] = None
+                self._transition("closed", "官方接口恢复")
+            elif self._state["failure_count"]:
+                self._state["failure_count"] = 0
+                self._save(None)
+
+    def record_failure(self, reason: str) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+            self._state["failure_count"] += 1
+            self._state["last_error"] = reason
+            if self._state["state"] == "half_open" or (
+                self._state["state"] == "closed"
+                and self._state["failure_count"] >= self.failure_threshold
+            ):
+                now = datetime.now()
+                self._state["opened_at"] = now.isoformat(timespec="seconds")
+                self._state["next_probe_at"] = (
+                    now + timedelta(seconds=self.open_seconds)
+                ).isoformat(timespec="seconds")
+                self._transition("open", reason)
+            else:
+                self._save(None)
+
+    def _transition(self, to_state: str, reason: str) -> None:
+        transition = {
+            "name": self.name,
+            "from_state": self._state["state"],
+            "to_state": to_state,
+            "reason": reason,
+            "occurred_at": _now_iso(),
+        }
+        self._state["state"] = to_state
+        self._save(transition)
+
+    def _save(self, transition: dict[str, Any] | None) -> None:
+        self._state["updated_at"] = _now_iso()
+        if self._persist is not None:
+            self._persist(dict(self._state), transition)
+
+
+OFFICIAL_BREAKER = CircuitBreaker("official")
+
+
+def _official_fetch_settings() -> tuple[int, TokenBucket]:
+    with _OFFICIAL_FETCH_LOCK:
+        return int(_OFFICIAL_FETCH_SETTINGS["concurrency"]), _OFFICIAL_RATE_LIMITER
+
+
 WEEKDAY_LABELS = ("一", "二", "三", "四", "五", "六", "日")
 
 
@@ -134,12 +388,23 @@ def _headers(
     return headers
 
 
-def _create_session() -> requests.Session:
-    return requests.Session()
+def _create_session(pool_size: int | None = None) -> requests.Session:
+    session = requests.Session()
+    if pool_size:
+        # One keep-alive connection per worker so concurrent pages reuse sockets.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
 
 
-def _warm_up_official_page(session: requests.Session) -> None:
+def _warm_up_official_page(
+    session: requests.Session,
+    rate_limiter: TokenBucket | None = None,
+) -> None:
     try:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
         session.get(
             OFFICIAL_PAGE_URL,
             headers=_headers(expect_json=False),
@@ -154,6 +419,8 @@ def _fetch_page(
     *,
     page_no: int,
     page_size: int = DEFAULT_PAGE_SIZE,
+    rate_limiter: TokenBucket | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> dict[str, Any]:
     params = {
         "name": "ssq",
@@ -164,10 +431,13 @@ def _fetch_page(
     response = None
     last_error = None
     for attempt in range(MAX_RETRIES):
+        _check_cancelled(cancel_event)
         for headers in (
             _headers(referer=OFFICIAL_PAGE_URL),
             _headers(),
         ):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
             try:
                 response = session.get(
                     OFFICIAL_API_URL,
@@ -189,8 +459,9 @@ def _fetch_page(
         if response is not None and response.status_code == 200:
             break
 
-        _warm_up_official_page(session)
-        time.sleep(0.8 * (attempt + 1))
+        _check_cancelled(cancel_event)
+        _warm_up_official_page(session, rate_limiter)
+        _backoff(0.8 * (attempt + 1), cancel_event)
     else:
         raise FetchError(f"抓取双色球数据失败: {last_error}") from last_error
 
@@ -204,14 +475,77 @@ def _fetch_page(
     return payload
 
 
+def probe_latest_issue() -> str:
+    """Return the newest official issue with one single-row request and no retries.
+
+    Goes through the official breaker: raises CircuitOpenError while it is
+    open, and doubles as the half-open probe once the cool-down has passed.
+    """
+    OFFICIAL_BREAKER.before_request()
+    try:
+        latest_issue = _request_latest_issue()
+    except FetchError as exc:
+        OFFICIAL_BREAKER.record_failure(str(exc))
+        raise
+    OFFICIAL_BREAKER.record_success()
+    return latest_issue
+
+
+def _admit_official_request() -> None:
+    """Raise CircuitOpenError unless the official source may be used now.
+
+    In the half-open state a single-row request decides whether the source is
+    back before a page walk pays for its retry ladder again.
+    """
+    if OFFICIAL_BREAKER.before_request() != "half_open":
+        return
+    try:
+        _request_latest_issue()
+    except FetchError as exc:
+        OFFICIAL_BREAKER.record_failure(f"半开探测失败: {exc}")
+        raise CircuitOpenError(f"官方接口半开探测失败: {exc}") from exc
+    OFFICIAL_BREAKER.record_success()
+
+
+def _request_latest_issue() -> str:
+    _, rate_limiter = _official_fetch_settings()
+    rate_limiter.acquire()
+    try:
+        response = _create_session().get(
+            OFFICIAL_API_URL,
+            params={
+                "name": "ssq",
+                "pageNo": 1,
+                "pageSize": 1,
+                "systemType": "PC",
+            },
+            headers=_headers(referer=OFFICIAL_PAGE_URL),
+            timeout=REQUEST_TIMEOUT,
+        )
+    except requests.RequestException as exc:
+        raise FetchError(f"探测最新期号失败: {exc}") from exc
+    if response.status_code != 200:
+        raise FetchError(f"探测最新期号失败，官方接口返回状态码 {response.status_code}")
+    try:
+        payload = response.json()
+    except ValueError as exc:
+        raise FetchError("探测最新期号失败，官方接口返回了非 JSON 数据") from exc
+    result = payload.get("result") if payload.get("state") == 0 else None
+    if not result:
+        raise FetchError(f"探测最新期号失败: {payload.get('message', '未知错误')}")
+    return str(result[0].get("code", "")).strip()
+
+
 def _fetch_fallback_page(
     session: requests.Session,
     *,
     page_no: int,
     page_size: int = FALLBACK_PAGE_SIZE,
+    cancel_event: threading.Event | None = None,
 ) -> dict[str, Any]:
     last_error = None
     for attempt in range(MAX_RETRIES):
+        _check_cancelled(cancel_event)
         response = session.get(
             FALLBACK_API_URL,
             params={
@@ -241,7 +575,7 @@ def _fetch_fallback_page(
         last_error = FetchError(f"备用接口返回异常: {info}")
         if "请求过于频繁" not in info:
             break
-        time.sleep(1.2 * (attempt + 1))
+        _backoff(1.2 * (attempt + 1), cancel_event)
 
     assert last_error is not None
     raise last_error
@@ -251,11 +585,13 @@ def _fetch_fallback_page_with_new_session(
     *,
     page_no: int,
     page_size: int,
+    cancel_event: threading.Event | None = None,
 ) -> dict[str, Any]:
     return _fetch_fallback_page(
         _create_session(),
         page_no=page_no,
         page_size=page_size,
+        cancel_event=cancel_event,
     )
 
 
@@ -288,32 +624,101 @@ def _build_history_payload(
     }
 
 
-def _fetch_history_from_official(stop_issue: str | None = None) -> dict[str, Any]:
-    session = _create_session()
+def _iter_official_pages(
+    session: requests.Session,
+    *,
+    first_page: int,
+    total_pages: int,
+    concurrency: int,
+    rate_limiter: TokenBucket,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield pages first_page..total_pages in order while up to `concurrency` are in flight."""
+    if first_page > total_pages:
+        return
+    with ThreadPoolExecutor(max_workers=min(concurrency, total_pages - first_page + 1)) as executor:
+        pending: dict[int, Future] = {}
+        next_page = first_page
+        try:
+            for page_no in range(first_page, total_pages + 1):
+                # Keep a sliding window of requests ahead of the page being consumed,
+                # so an incremental sync that stops early wastes at most one window.
+                while next_page <= total_pages and len(pending) < concurrency:
+                    pending[next_page] = executor.submit(
+                        _fetch_page,
+                        session,
+                        page_no=next_page,
+                        rate_limiter=rate_limiter,
+                        cancel_event=cancel_event,
+                    )
+                    next_page += 1
+                # _fetch_page already retries each page with backoff; once that
+                # is exhausted the error ends the walk instead of a second ladder.
+                yield pending.pop(page_no).result()
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+
+def _iter_official_history_pages(
+    start_page: int = 1,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield parsed official pages, newest first, starting at ``start_page``."""
+    concurrency, rate_limiter = _official_fetch_settings()
+    session = _create_session(pool_size=concurrency)
+    first_payload = _fetch_page(
+        session,
+        page_no=start_page,
+        rate_limiter=rate_limiter,
+        cancel_event=cancel_event,
+    )
+    total_pages = int(first_payload.get("pageNum", 0))
+    official_total = int(first_payload.get("total", 0))
+    pages = _iter_official_pages(
+        session,
+        first_page=start_page + 1,
+        total_pages=total_pages,
+        concurrency=concurrency,
+        rate_limiter=rate_limiter,
+        cancel_event=cancel_event,
+    )
+    try:
+        for page_no, payload in enumerate(chain((first_payload,), pages), start=start_page):
+            yield {
+                "page_no": page_no,
+                "total_pages": total_pages,
+                "official_total": official_total,
+                "draws": [_parse_draw(item) for item in payload.get("result", [])],
+            }
+    finally:
+        pages.close()
+
+
+def _fetch_history_from_official(
+    stop_issue: str | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, Any]:
     draws: list[dict[str, Any]] = []
-    total_pages: int | None = None
     total_draws: int | None = None
-    page_no = 1
     stop_issue_found = False
     latest_issue: str | None = None
 
-    while total_pages is None or page_no <= total_pages:
-        payload = _fetch_page(session, page_no=page_no)
-        total_pages = int(payload.get("pageNum", 0))
-        total_draws = int(payload.get("total", 0))
-        if latest_issue is None and payload.get("result"):
-            latest_issue = payload["result"][0].get("code", "").strip()
-
-        for item in payload.get("result", []):
-            parsed_draw = _parse_draw(item)
-            if stop_issue and parsed_draw["issue"] == stop_issue:
-                stop_issue_found = True
+    pages = _iter_official_history_pages(cancel_event=cancel_event)
+    try:
+        for page in pages:
+            total_draws = page["official_total"]
+            if latest_issue is None and page["draws"]:
+                latest_issue = page["draws"][0]["issue"]
+            for parsed_draw in page["draws"]:
+                if stop_issue and parsed_draw["issue"] == stop_issue:
+                    stop_issue_found = True
+                    break
+                draws.append(parsed_draw)
+            if stop_issue_found:
                 break
-            draws.append(parsed_draw)
-        if stop_issue_found:
-            break
-        page_no += 1
-        time.sleep(0.15)
+    finally:
+        pages.close()
 
     draws.sort(key=lambda item: item["issue"])
     return _build_history_payload(
@@ -330,7 +735,28 @@ def _fetch_history_from_official(stop_issue: str | None = None) -> dict[str, Any
     )
 
 
-def _fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any]:
+def stream_history_from_official(start_page: int = 1) -> Iterator[dict[str, Any]]:
+    """Yield official history page by page for ingestion as it arrives.
+
+    Each item carries ``page_no``, ``total_pages``, ``official_total`` and the
+    parsed ``draws`` of that page. Pages shift towards higher numbers when a new
+    draw is published, so resuming at a later page never skips a draw.
+    """
+    _admit_official_request()
+    try:
+        yield from _iter_official_history_pages(start_page)
+    except FetchCancelled:
+        raise
+    except FetchError as exc:
+        OFFICIAL_BREAKER.record_failure(str(exc))
+        raise
+    OFFICIAL_BREAKER.record_success()
+
+
+def _fetch_history_from_fallback(
+    stop_issue: str | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, Any]:
     session = _create_session()
     draws: list[dict[str, Any]] = []
     page_payloads: dict[int, dict[str, Any]] = {}
@@ -342,6 +768,7 @@ def _fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any
         session,
         page_no=1,
         page_size=FALLBACK_PAGE_SIZE,
+        cancel_event=cancel_event,
     )
     page_payloads[1] = first_page
     first_page_data = first_page.get("data", {}).get("data", {})
@@ -356,6 +783,7 @@ def _fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any
                     _fetch_fallback_page_with_new_session,
                     page_no=page_no,
                     page_size=FALLBACK_PAGE_SIZE,
+                    cancel_event=cancel_event,
                 ): page_no
                 for page_no in range(2, total_pages + 1)
             }
@@ -368,6 +796,7 @@ def _fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any
                 session,
                 page_no=page_no,
                 page_size=FALLBACK_PAGE_SIZE,
+                cancel_event=cancel_event,
             )
         payload = page_payloads[page_no]
         page_data = payload.get("data", {}).get("data", {})
@@ -398,18 +827,201 @@ def _fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any
     )
 
 
+def _encode_cache_header(
+    payload: dict[str, Any],
+    *,
+    draw_count: int,
+    latest_issue: str | None,
+    body_bytes: int,
+) -> bytes:
+    header = {"format": CACHE_FORMAT, "version": CACHE_VERSION}
+    header.update({field: payload.get(field) for field in CACHE_HEADER_FIELDS})
+    header.update(draw_count=draw_count, latest_issue=latest_issue, body_bytes=body_bytes)
+    encoded = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(encoded) >= CACHE_HEADER_BYTES:
+        raise ValueError("缓存文件头超出固定长度。")
+    return encoded.ljust(CACHE_HEADER_BYTES - 1, b" ") + b"\n"
+
+
+def _encode_cache_draws(draws: list[dict[str, Any]]) -> bytes:
+    return b"".join(
+        json.dumps(
+            {field: draw.get(field, "") for field in SNAPSHOT_DRAW_FIELDS},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        + b"\n"
+        for draw in draws
+    )
+
+
+def _parse_cache_header(block: bytes) -> dict[str, Any] | None:
+    try:
+        header = json.loads(block)
+    except ValueError:
+        return None
+    if (
+        not isinstance(header, dict)
+        or header.get("format") != CACHE_FORMAT
+        or header.get("version") != CACHE_VERSION
+    ):
+        return None
+    return header
+
+
+def read_cache_header(cache_path: Path = DEFAULT_CACHE_PATH) -> dict[str, Any] | None:
+    """Read only the fixed-size header; None for a missing, legacy or damaged cache."""
+    if not cache_path.exists():
+        return None
+    with cache_path.open("rb") as handle:
+        return _parse_cache_header(handle.read(CACHE_HEADER_BYTES))
+
+
 def load_cache(cache_path: Path = DEFAULT_CACHE_PATH) -> dict[str, Any] | None:
     if not cache_path.exists():
         return None
-    return json.loads(cache_path.read_text(encoding="utf-8"))
+    with cache_path.open("rb") as handle:
+        header = _parse_cache_header(handle.read(CACHE_HEADER_BYTES))
+        if header is None:
+            # Caches written before the header format were one indented JSON document.
+            handle.seek(0)
+            try:
+                return json.loads(handle.read())
+            except ValueError:
+                return None
+        # Bytes past body_bytes belong to an append that never committed its header.
+        body = handle.read(header["body_bytes"])
+    if len(body) != header["body_bytes"]:
+        return None
+    draws = [json.loads(line) for line in body.splitlines()]
+    if len(draws) != header["draw_count"]:
+        return None
+    payload = {field: header.get(field) for field in CACHE_HEADER_FIELDS}
+    payload.update(
+        draw_count=header["draw_count"],
+        latest_issue=header["latest_issue"],
+        draws=draws,
+    )
+    return payload
 
 
 def save_cache(payload: dict[str, Any], cache_path: Path = DEFAULT_CACHE_PATH) -> None:
-    _ensure_parent(cache_path)
-    cache_path.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2),
-        encoding="utf-8",
+    """Rewrite the whole cache through a temporary file and an atomic rename."""
+    draws = sorted(payload["draws"], key=lambda item: item["issue"])
+    body = _encode_cache_draws(draws)
+    header = _encode_cache_header(
+        payload,
+        draw_count=len(draws),
+        latest_issue=draws[-1]["issue"] if draws else None,
+        body_bytes=len(body),
     )
+    _ensure_parent(cache_path)
+    temporary_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    with temporary_path.open("wb") as handle:
+        handle.write(header)
+        handle.write(body)
+        handle.flush()
+        os.fsync(handle.fileno())
+    temporary_path.replace(cache_path)
+
+
+def append_cache(
+    draws: list[dict[str, Any]],
+    payload: dict[str, Any],
+    cache_path: Path = DEFAULT_CACHE_PATH,
+) -> bool:
+    """Append draws newer than the cached latest issue and refresh the header in place.
+
+    The new records are synced before the header that commits them is rewritten,
+    so an interrupted append leaves the previous cache intact. Returns False when
+    the file is not a current-format cache and has to be rewritten with save_cache.
+    """
+    if not cache_path.exists():
+        return False
+    with cache_path.open("r+b") as handle:
+        header = _parse_cache_header(handle.read(CACHE_HEADER_BYTES))
+        if header is None:
+            return False
+        latest_issue = header["latest_issue"]
+        new_draws = sorted(
+            (draw for draw in draws if latest_issue is None or draw["issue"] > latest_issue),
+            key=lambda item: item["issue"],
+        )
+        body = _encode_cache_draws(new_draws)
+        handle.seek(CACHE_HEADER_BYTES + header["body_bytes"])
+        handle.truncate()
+        handle.write(body)
+        handle.flush()
+        os.fsync(handle.fileno())
+        handle.seek(0)
+        handle.write(
+            _encode_cache_header(
+                payload,
+                draw_count=header["draw_count"] + len(new_draws),
+                latest_issue=new_draws[-1]["issue"] if new_draws else latest_issue,
+                body_bytes=header["body_bytes"] + len(body),
+            )
+        )
+        handle.flush()
+        os.fsync(handle.fileno())
+    return True
+
+
+def write_snapshot(
+    draws: list[dict[str, Any]],
+    path: Path,
+    *,
+    source: str,
+) -> dict[str, Any]:
+    """Write draws as gzip-compressed NDJSON: a header line, then one draw per line."""
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "exported_at": _now_iso(),
+        "source": source,
+        "draw_count": len(draws),
+        "latest_issue": draws[-1]["issue"] if draws else None,
+    }
+    _ensure_parent(path)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as handle:
+        handle.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for draw in draws:
+            record = {field: draw.get(field, "") for field in SNAPSHOT_DRAW_FIELDS}
+            handle.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    temporary_path.replace(path)
+    return header
+
+
+def read_snapshot(path: Path) -> dict[str, Any]:
+    """Read an exported NDJSON snapshot, or a history cache file such as the bundled one."""
+    with path.open("rb") as handle:
+        compressed = handle.read(2) == b"\x1f\x8b"
+    if not compressed:
+        payload = load_cache(path)
+        if not isinstance(payload, dict) or not isinstance(payload.get("draws"), list):
+            raise ValueError(f"不是有效的开奖数据快照: {path}")
+        draws = sorted(payload["draws"], key=lambda item: item["issue"])
+        return {
+            "header": {
+                "format": "history-cache",
+                "exported_at": payload.get("fetched_at"),
+                "source": payload.get("source_name", "cache"),
+                "draw_count": len(draws),
+                "latest_issue": draws[-1]["issue"] if draws else None,
+            },
+            "draws": draws,
+        }
+
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        header = json.loads(handle.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"不支持的快照格式: {path}")
+        draws = [json.loads(line) for line in handle if line.strip()]
+    if len(draws) != header.get("draw_count"):
+        raise ValueError(f"快照记录数与文件头不一致，文件可能已损坏: {path}")
+    draws.sort(key=lambda item: item["issue"])
+    return {"header": header, "draws": draws}
 
 
 def _cache_is_fresh(payload: dict[str, Any], max_age_hours: int) -> bool:
@@ -423,23 +1035,101 @@ def _cache_is_fresh(payload: dict[str, Any], max_age_hours: int) -> bool:
     return datetime.now() - fetched_dt <= timedelta(hours=max_age_hours)
 
 
+_HISTORY_FETCHERS = {
+    "official": _fetch_history_from_official,
+    "fallback": _fetch_history_from_fallback,
+}
+_HISTORY_SOURCE_LABELS = {"official": "官方接口", "fallback": "备用接口"}
+
+
 def fetch_history_from_official(stop_issue: str | None = None) -> dict[str, Any]:
-    errors = []
-    try:
-        return _fetch_history_from_official(stop_issue=stop_issue)
-    except Exception as exc:
-        errors.append(f"官方接口失败: {exc}")
+    """Fetch history from the official source, hedged with the fallback.
+
+    The fallback starts once the official fetch has been running for the hedge
+    threshold, or as soon as it fails. The first valid payload wins, and the
+    other fetch is cancelled at its next page or retry.
+    """
+    with _OFFICIAL_FETCH_LOCK:
+        hedge_after = float(_OFFICIAL_FETCH_SETTINGS["hedge_after_seconds"])
+    cancel_events = {name: threading.Event() for name in _HISTORY_FETCHERS}
+    executor = ThreadPoolExecutor(max_workers=len(_HISTORY_FETCHERS))
+    futures: dict[Future, str] = {}
+    started_sources: set[str] = set()
+    elapsed_seconds: dict[str, float] = {}
+    errors: list[str] = []
+    hedge_started_after: float | None = None
+    started = time.perf_counter()
+
+    breaker_note = ""
+
+    def start(name: str) -> None:
+        started_sources.add(name)
+        futures[executor.submit(_HISTORY_FETCHERS[name], stop_issue, cancel_events[name])] = name
 
     try:
-        payload = _fetch_history_from_fallback(stop_issue=stop_issue)
-        payload["source_warning"] = (
-            "官方接口当前不可用，本次已自动切换到备用数据源。"
-        )
-        payload["source_errors"] = errors
-        return payload
-    except Exception as exc:
-        errors.append(f"备用接口失败: {exc}")
-        raise FetchError("；".join(errors)) from exc
+        try:
+            _admit_official_request()
+            start("official")
+        except CircuitOpenError as exc:
+            breaker_note = str(exc)
+            errors.append(f"{_HISTORY_SOURCE_LABELS['official']}跳过: {exc}")
+            start("fallback")
+        while futures:
+            timeout = None
+            if hedge_after > 0 and "fallback" not in started_sources:
+                timeout = max(0.0, hedge_after - (time.perf_counter() - started))
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge_started_after = round(time.perf_counter() - started, 3)
+                start("fallback")
+                continue
+
+            for future in sorted(done, key=lambda item: futures[item] != "official"):
+                name = futures.pop(future)
+                elapsed_seconds[name] = round(time.perf_counter() - started, 3)
+                try:
+                    payload = future.result()
+                    if not payload.get("latest_issue"):
+                        raise FetchError("未返回任何开奖数据")
+                except Exception as exc:
+                    errors.append(f"{_HISTORY_SOURCE_LABELS[name]}失败: {exc}")
+                    if name == "official":
+                        OFFICIAL_BREAKER.record_failure(str(exc))
+                    if "fallback" not in started_sources:
+                        start("fallback")
+                    continue
+
+                if name == "official":
+                    OFFICIAL_BREAKER.record_success()
+                if name == "fallback":
+                    if breaker_note:
+                        payload["source_warning"] = f"{breaker_note}，本次直接使用备用数据源。"
+                    elif "official" in elapsed_seconds:
+                        payload["source_warning"] = "官方接口当前不可用，本次已自动切换到备用数据源。"
+                    else:
+                        payload["source_warning"] = (
+                            f"官方接口超过 {hedge_after:g} 秒未返回，本次采用了更快返回的备用数据源。"
+                        )
+                    payload["source_errors"] = errors
+                payload["fetch_timing"] = {
+                    "winner": name,
+                    "breaker_state": OFFICIAL_BREAKER.snapshot()["state"],
+                    "hedge_after_seconds": hedge_after,
+                    "hedge_started_after_seconds": hedge_started_after,
+                    "elapsed_seconds": elapsed_seconds,
+                }
+                return payload
+        raise FetchError("；".join(errors))
+    finally:
+        for event in cancel_events.values():
+            event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_history_from_fallback(stop_issue: str | None = None) -> dict[str, Any]:
+    payload = _fetch_history_from_fallback(stop_issue=stop_issue)
+    payload["source_warning"] = "官方接口当前不可用，本次已自动切换到备用数据源。"
+    return payload
 
 
 def get_history(
@@ -447,15 +1137,27 @@ def get_history(
     cache_path: Path = DEFAULT_CACHE_PATH,
     cache_max_age_hours: int = DEFAULT_CACHE_MAX_AGE_HOURS,
 ) -> dict[str, Any]:
-    cached = load_cache(cache_path)
-    if cached and not force_refresh and _cache_is_fresh(cached, cache_max_age_hours):
-        cached["cache_status"] = "fresh"
-        return cached
+    header = read_cache_header(cache_path)
+    if header and not force_refresh and _cache_is_fresh(header, cache_max_age_hours):
+        cached = load_cache(cache_path)
+        if cached:
+            cached["cache_status"] = "fresh"
+            return cached
 
+    cached = load_cache(cache_path)
+    cached_draws = cached.get("draws") if cached else None
+    stop_issue = cached_draws[-1]["issue"] if cached_draws else None
     try:
-        payload = fetch_history_from_official()
+        payload = fetch_history_from_official(stop_issue=stop_issue)
+        if stop_issue and payload["stop_issue_found"]:
+            new_draws = payload["draws"]
+            payload["draws"] = cached_draws + new_draws
+            payload["draw_count"] = len(payload["draws"])
+            if not append_cache(new_draws, payload, cache_path):
+                save_cache(payload, cache_path)
+        else:
+            save_cache(payload, cache_path)
         payload["cache_status"] = "refreshed"
-        save_cache(payload, cache_path)
         return payload
     except Exception as exc:
         if cached:
@@ -2,12 +2,46 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Callable, Iterable, Iterator
+
+from .analysis import red_mask, red_numbers_from_mask, ticket_summary
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "ssq.db"
+DEFAULT_PRAGMAS: dict[str, int | str] = {
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,
+}
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+SCHEMA_VERSION = 5
+PRIZE_LEVELS = ("一等奖", "二等奖", "三等奖", "四等奖", "五等奖", "六等奖")
+ROLLUP_ALL_PERIOD = "all"
+_ROLLUP_COUNTERS = (
+    "evaluated_count",
+    "winning_issue_count",
+    "ticket_count",
+    "winning_ticket_count",
+    *(f"prize_{rank}_count" for rank in range(1, len(PRIZE_LEVELS) + 1)),
+)
+_ROLLUP_COLUMN_DEFINITIONS = ",\n                ".join(
+    f"{column} INTEGER NOT NULL DEFAULT 0" for column in _ROLLUP_COUNTERS
+)
+DRAW_NUMERIC_COLUMNS = (
+    ("red_mask", "INTEGER NOT NULL DEFAULT 0"),
+    ("blue", "INTEGER NOT NULL DEFAULT 0"),
+)
+DRAW_INDEXES = (("idx_draws_draw_date", "draws(draw_date)"),)
+DRAW_FETCH_BATCH_SIZE = 500
+
+_PRAGMAS = dict(DEFAULT_PRAGMAS)
+_PRAGMA_GENERATION = 0
+_PRAGMA_LOCK = threading.Lock()
+_LOCAL = threading.local()
 
 
 def _now_iso() -> str:
@@ -18,15 +52,109 @@ def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-@contextmanager
-def get_connection(db_path: Path = DEFAULT_DB_PATH) -> Iterator[sqlite3.Connection]:
+def configure_pragmas(**pragmas: int | str) -> dict[str, int | str]:
+    """Override connection PRAGMAs; pooled connections reopen with the new values."""
+    global _PRAGMA_GENERATION
+    normalized: dict[str, int | str] = {}
+    for name, value in pragmas.items():
+        if name not in DEFAULT_PRAGMAS:
+            raise ValueError(f"不支持的 SQLite PRAGMA: {name}")
+        if name == "synchronous":
+            mode = str(value).upper()
+            if mode not in SYNCHRONOUS_MODES:
+                raise ValueError(f"synchronous 只能是 {'/'.join(SYNCHRONOUS_MODES)}")
+            normalized[name] = mode
+        else:
+            normalized[name] = int(value)
+    with _PRAGMA_LOCK:
+        _PRAGMAS.update(normalized)
+        _PRAGMA_GENERATION += 1
+        return dict(_PRAGMAS)
+
+
+def _open_connection(db_path: Path) -> sqlite3.Connection:
     _ensure_parent(db_path)
     connection = sqlite3.connect(db_path)
     connection.row_factory = sqlite3.Row
+    with _PRAGMA_LOCK:
+        pragmas = dict(_PRAGMAS)
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name}={value}")
+    return connection
+
+
+def _thread_pool() -> dict[str, Any]:
+    pool = getattr(_LOCAL, "pool", None)
+    if pool is None:
+        pool = _LOCAL.pool = {"connections": {}, "read_depth": {}}
+    return pool
+
+
+def _pooled_connection(db_path: Path) -> tuple[str, sqlite3.Connection]:
+    # Each thread keeps one connection per database file, so HTTP handler
+    # threads and the sync/backfill workers never share a connection.
+    pool = _thread_pool()
+    key = str(db_path.resolve())
+    entry = pool["connections"].get(key)
+    if entry is not None:
+        generation, connection = entry
+        if generation == _PRAGMA_GENERATION or pool["read_depth"].get(key):
+            return key, connection
+        connection.close()
+    connection = _open_connection(db_path)
+    pool["connections"][key] = (_PRAGMA_GENERATION, connection)
+    return key, connection
+
+
+def close_thread_connections() -> None:
+    """Close every pooled connection owned by the calling thread."""
+    pool = _thread_pool()
+    for _, connection in pool["connections"].values():
+        connection.close()
+    pool["connections"].clear()
+    pool["read_depth"].clear()
+
+
+@contextmanager
+def get_connection(db_path: Path = DEFAULT_DB_PATH) -> Iterator[sqlite3.Connection]:
+    key, connection = _pooled_connection(db_path)
+    in_read_transaction = bool(_thread_pool()["read_depth"].get(key))
     try:
         yield connection
     finally:
-        connection.close()
+        # A reused connection must not carry an unfinished write into the next
+        # caller; closing the connection used to discard it implicitly.
+        if connection.in_transaction and not in_read_transaction:
+            connection.rollback()
+
+
+@contextmanager
+def read_transaction(db_path: Path = DEFAULT_DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Run the enclosed reads on this thread's connection against one snapshot.
+
+    Functions in this module called inside the block share the snapshot. Writes
+    must happen outside of it, because their commit would end the snapshot.
+    """
+    key, connection = _pooled_connection(db_path)
+    read_depth = _thread_pool()["read_depth"]
+    if read_depth.get(key):
+        read_depth[key] += 1
+        try:
+            yield connection
+        finally:
+            read_depth[key] -= 1
+        return
+
+    connection.execute("BEGIN")
+    # The WAL snapshot is taken at the first read, so pin it right away.
+    connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    read_depth[key] = 1
+    try:
+        yield connection
+    finally:
+        read_depth[key] = 0
+        if connection.in_transaction:
+            connection.rollback()
 
 
 def initialize_database(db_path: Path = DEFAULT_DB_PATH) -> None:
@@ -46,6 +174,8 @@ def initialize_database(db_path: Path = DEFAULT_DB_PATH) -> None:
                 poolmoney TEXT NOT NULL,
                 content TEXT NOT NULL,
                 details_link TEXT NOT NULL,
+                red_mask INTEGER NOT NULL DEFAULT 0,
+                blue INTEGER NOT NULL DEFAULT 0,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
             )
@@ -81,7 +211,6 @@ def initialize_database(db_path: Path = DEFAULT_DB_PATH) -> None:
                 draw_count INTEGER NOT NULL,
                 top_red_numbers_json TEXT NOT NULL,
                 top_blue_numbers_json TEXT NOT NULL,
-                tickets_json TEXT NOT NULL,
                 summary_json TEXT NOT NULL
             )
             """
@@ -102,18 +231,103 @@ def initialize_database(db_path: Path = DEFAULT_DB_PATH) -> None:
                 winning_ticket_rate REAL NOT NULL,
                 highest_prize_level TEXT,
                 prize_breakdown_json TEXT NOT NULL,
-                ticket_results_json TEXT NOT NULL,
                 model_version TEXT NOT NULL,
                 FOREIGN KEY(snapshot_id) REFERENCES prediction_snapshots(id)
             )
             """
         )
         connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_draws_draw_date ON draws(draw_date)"
+            f"""
+            CREATE TABLE IF NOT EXISTS prediction_performance_rollup (
+                model_version TEXT NOT NULL,
+                period TEXT NOT NULL,
+                {_ROLLUP_COLUMN_DEFINITIONS},
+                best_prize_rank INTEGER,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (model_version, period)
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS prediction_tickets (
+                snapshot_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                red_mask INTEGER NOT NULL,
+                blue INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (snapshot_id, rank),
+                FOREIGN KEY(snapshot_id) REFERENCES prediction_snapshots(id)
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ticket_results (
+                evaluation_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                red_match INTEGER NOT NULL,
+                blue_match INTEGER NOT NULL,
+                prize_level TEXT,
+                PRIMARY KEY (evaluation_id, rank),
+                FOREIGN KEY(evaluation_id) REFERENCES prediction_evaluations(id)
+            )
+            """
+        )
+        _migrate_schema(connection)
+        for name, definition in DRAW_INDEXES:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_prediction_tickets_numbers ON prediction_tickets(red_mask, blue)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_results_rank_prize ON ticket_results(rank, prize_level)"
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_checkpoints (
+                source TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                last_completed_page INTEGER NOT NULL,
+                total_pages INTEGER,
+                official_total INTEGER,
+                fetched_count INTEGER NOT NULL,
+                completed_at TEXT
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS circuit_breakers (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                failure_count INTEGER NOT NULL,
+                opened_at TEXT,
+                next_probe_at TEXT,
+                last_error TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS circuit_breaker_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                occurred_at TEXT NOT NULL,
+                from_state TEXT NOT NULL,
+                to_state TEXT NOT NULL,
+                reason TEXT NOT NULL
+            )
+            """
         )
         connection.execute(
             "CREATE INDEX IF NOT EXISTS idx_sync_runs_finished_at ON sync_runs(finished_at DESC)"
         )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_circuit_breaker_events_name ON circuit_breaker_events(name, id DESC)"
+        )
         connection.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_prediction_snapshots_generated_at
@@ -129,8 +343,242 @@ def initialize_database(db_path: Path = DEFAULT_DB_PATH) -> None:
         connection.commit()
 
 
+def _draw_numeric_record(red_numbers: Iterable[str], blue_number: str) -> tuple[int, int]:
+    return red_mask(red_numbers), int(blue_number)
+
+
+def _migrate_schema(connection: sqlite3.Connection) -> None:
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    if version < 2:
+        # Version 2 adds integer copies of the draw numbers next to the original
+        # TEXT columns, filled in place from the existing rows.
+        existing_columns = {
+            row["name"] for row in connection.execute("PRAGMA table_info(draws)")
+        }
+        for name, declaration in DRAW_NUMERIC_COLUMNS:
+            if name not in existing_columns:
+                connection.execute(f"ALTER TABLE draws ADD COLUMN {name} {declaration}")
+        rows = connection.execute(
+            "SELECT issue, red_numbers, blue_number FROM draws"
+        ).fetchall()
+        connection.executemany(
+            "UPDATE draws SET red_mask = ?, blue = ? WHERE issue = ?",
+            [
+                (
+                    *_draw_numeric_record(
+                        row["red_numbers"].split(","), row["blue_number"]
+                    ),
+                    row["issue"],
+                )
+                for row in rows
+            ],
+        )
+    if version < 3:
+        # Version 3 adds the performance rollup; seed it from the evaluations
+        # that were saved before it existed.
+        rebuild_prediction_performance_rollup(connection)
+    if version < 4:
+        _migrate_ticket_json(connection)
+    if version < 5:
+        _drop_unused_draw_columns(connection)
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    connection.commit()
+
+
+def _table_columns(connection: sqlite3.Connection, table: str) -> set[str]:
+    return {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+
+
+def _drop_unused_draw_columns(connection: sqlite3.Connection) -> None:
+    # Version 5 drops the numeric amount columns and the number indexes that
+    # nothing read; the draws stream reads red_mask/blue straight from the rows.
+    for name in ("idx_draws_issue_numbers", "idx_draws_blue"):
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+    existing_columns = _table_columns(connection, "draws")
+    for name in ("sales_amount", "poolmoney_amount"):
+        if name in existing_columns:
+            connection.execute(f"ALTER TABLE draws DROP COLUMN {name}")
+
+
+def _migrate_ticket_json(connection: sqlite3.Connection) -> None:
+    # Version 4 moves the ticket lists out of the JSON blobs into
+    # prediction_tickets / ticket_results and drops the blob columns.
+    if "tickets_json" in _table_columns(connection, "prediction_snapshots"):
+        rows = connection.execute(
+            "SELECT id, tickets_json FROM prediction_snapshots"
+        ).fetchall()
+        _replace_tickets(
+            connection,
+            {row["id"]: json.loads(row["tickets_json"]) for row in rows},
+        )
+        connection.execute("ALTER TABLE prediction_snapshots DROP COLUMN tickets_json")
+    if "ticket_results_json" in _table_columns(connection, "prediction_evaluations"):
+        rows = connection.execute(
+            "SELECT id, ticket_results_json FROM prediction_evaluations"
+        ).fetchall()
+        _replace_ticket_results(
+            connection,
+            {row["id"]: json.loads(row["ticket_results_json"]) for row in rows},
+        )
+        connection.execute(
+            "ALTER TABLE prediction_evaluations DROP COLUMN ticket_results_json"
+        )
+
+
+def _chunks(values: list[Any], size: int = 500) -> Iterator[list[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _replace_tickets(
+    connection: sqlite3.Connection,
+    tickets_by_snapshot: dict[int, list[dict[str, Any]]],
+) -> None:
+    connection.executemany(
+        "DELETE FROM prediction_tickets WHERE snapshot_id = ?",
+        [(snapshot_id,) for snapshot_id in tickets_by_snapshot],
+    )
+    connection.executemany(
+        """
+        INSERT INTO prediction_tickets (snapshot_id, rank, red_mask, blue, score)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                snapshot_id,
+                ticket["rank"],
+                red_mask(ticket["red_numbers"]),
+                int(ticket["blue_number"]),
+                ticket["score"],
+            )
+            for snapshot_id, tickets in tickets_by_snapshot.items()
+            for ticket in tickets
+        ],
+    )
+
+
+def _replace_ticket_results(
+    connection: sqlite3.Connection,
+    results_by_evaluation: dict[int, list[dict[str, Any]]],
+) -> None:
+    connection.executemany(
+        "DELETE FROM ticket_results WHERE evaluation_id = ?",
+        [(evaluation_id,) for evaluation_id in results_by_evaluation],
+    )
+    connection.executemany(
+        """
+        INSERT INTO ticket_results (evaluation_id, rank, red_match, blue_match, prize_level)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                evaluation_id,
+                result["rank"],
+                result["red_match_count"],
+                1 if result["blue_match"] else 0,
+                result["prize_level"],
+            )
+            for evaluation_id, results in results_by_evaluation.items()
+            for result in results
+        ],
+    )
+
+
+def _ticket_from_row(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "rank": row["rank"],
+        "red_numbers": red_numbers_from_mask(row["red_mask"]),
+        "blue_number": f"{row['blue']:02d}",
+        "score": row["score"],
+        "summary": ticket_summary(row["red_mask"]),
+    }
+
+
+def _load_tickets(
+    connection: sqlite3.Connection,
+    snapshot_ids: list[int],
+) -> dict[int, list[dict[str, Any]]]:
+    tickets: dict[int, list[dict[str, Any]]] = {
+        snapshot_id: [] for snapshot_id in snapshot_ids
+    }
+    for chunk in _chunks(snapshot_ids):
+        for row in connection.execute(
+            f"""
+            SELECT snapshot_id, rank, red_mask, blue, score
+            FROM prediction_tickets
+            WHERE snapshot_id IN ({",".join("?" for _ in chunk)})
+            ORDER BY snapshot_id, rank
+            """,
+            chunk,
+        ):
+            tickets[row["snapshot_id"]].append(_ticket_from_row(row))
+    return tickets
+
+
+def _load_ticket_results(
+    connection: sqlite3.Connection,
+    evaluation_ids: list[int],
+) -> dict[int, list[dict[str, Any]]]:
+    results: dict[int, list[dict[str, Any]]] = {
+        evaluation_id: [] for evaluation_id in evaluation_ids
+    }
+    for chunk in _chunks(evaluation_ids):
+        for row in connection.execute(
+            f"""
+            SELECT
+                r.evaluation_id,
+                r.rank,
+                r.red_match,
+                r.blue_match,
+                r.prize_level,
+                t.red_mask,
+                t.blue,
+                t.score
+            FROM ticket_results r
+            INNER JOIN prediction_evaluations e
+                ON e.id = r.evaluation_id
+            INNER JOIN prediction_tickets t
+                ON t.snapshot_id = e.snapshot_id AND t.rank = r.rank
+            WHERE r.evaluation_id IN ({",".join("?" for _ in chunk)})
+            ORDER BY r.evaluation_id, r.rank
+            """,
+            chunk,
+        ):
+            results[row["evaluation_id"]].append(
+                {
+                    **_ticket_from_row(row),
+                    "red_match_count": row["red_match"],
+                    "blue_match": bool(row["blue_match"]),
+                    "prize_level": row["prize_level"],
+                    "is_winner": row["prize_level"] is not None,
+                }
+            )
+    return results
+
+
+DRAW_UPSERT_COLUMNS = (
+    "issue",
+    "draw_date",
+    "weekday",
+    "red_numbers",
+    "blue_number",
+    "red_display",
+    "blue_display",
+    "sales",
+    "poolmoney",
+    "content",
+    "details_link",
+    "red_mask",
+    "blue",
+)
+
+
 def _draw_record(draw: dict[str, Any]) -> tuple[Any, ...]:
     return (
+        draw["issue"],
         draw["date"],
         draw["weekday"],
         ",".join(draw["red_numbers"]),
@@ -141,6 +589,7 @@ def _draw_record(draw: dict[str, Any]) -> tuple[Any, ...]:
         draw.get("poolmoney", ""),
         draw.get("content", ""),
         draw.get("details_link", ""),
+        *_draw_numeric_record(draw["red_numbers"], draw["blue_number"]),
     )
 
 
@@ -148,110 +597,124 @@ def upsert_draws(
     draws: list[dict[str, Any]],
     db_path: Path = DEFAULT_DB_PATH,
 ) -> dict[str, int]:
+    """Insert new draws and update changed ones in one set-based transaction.
+
+    Incoming rows are staged in a temp table so the inserted/updated counts come
+    from a set diff against ``draws`` instead of a per-row SELECT and write.
+    """
     if not draws:
         return {"inserted_count": 0, "updated_count": 0}
 
-    issues = [draw["issue"] for draw in draws]
-    placeholders = ",".join("?" for _ in issues)
-    inserted_count = 0
-    updated_count = 0
-    now = _now_iso()
+    columns = ", ".join(DRAW_UPSERT_COLUMNS)
+    data_columns = DRAW_UPSERT_COLUMNS[1:]
 
-    with get_connection(db_path) as connection:
-        existing = {
-            row["issue"]: row
-            for row in connection.execute(
-                f"""
-                SELECT
-                    issue,
-                    draw_date,
-                    weekday,
-                    red_numbers,
-                    blue_number,
-                    red_display,
-                    blue_display,
-                    sales,
-                    poolmoney,
-                    content,
-                    details_link
-                FROM draws
-                WHERE issue IN ({placeholders})
-                """,
-                issues,
-            )
-        }
+    def differs(current: str, incoming: str) -> str:
+        return " OR ".join(
+            f"{current}.{column} IS NOT {incoming}.{column}" for column in data_columns
+        )
 
-        for draw in draws:
-            current_record = _draw_record(draw)
-            row = existing.get(draw["issue"])
-            if row is None:
-                connection.execute(
-                    """
-                    INSERT INTO draws (
-                        issue,
-                        draw_date,
-                        weekday,
-                        red_numbers,
-                        blue_number,
-                        red_display,
-                        blue_display,
-                        sales,
-                        poolmoney,
-                        content,
-                        details_link,
-                        created_at,
-                        updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (draw["issue"], *current_record, now, now),
-                )
-                inserted_count += 1
-                continue
-
-            previous_record = (
-                row["draw_date"],
-                row["weekday"],
-                row["red_numbers"],
-                row["blue_number"],
-                row["red_display"],
-                row["blue_display"],
-                row["sales"],
-                row["poolmoney"],
-                row["content"],
-                row["details_link"],
-            )
-            if previous_record == current_record:
-                continue
+    now = _now_iso()
 
-            connection.execute(
-                """
-                UPDATE draws
-                SET
-                    draw_date = ?,
-                    weekday = ?,
-                    red_numbers = ?,
-                    blue_number = ?,
-                    red_display = ?,
-                    blue_display = ?,
-                    sales = ?,
-                    poolmoney = ?,
-                    content = ?,
-                    details_link = ?,
-                    updated_at = ?
-                WHERE issue = ?
-                """,
-                (*current_record, now, draw["issue"]),
+    with get_connection(db_path) as connection:
+        connection.execute(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS draw_staging (
+                issue TEXT PRIMARY KEY,
+                {", ".join(data_columns)}
             )
-            updated_count += 1
-
+            """
+        )
+        connection.execute("DELETE FROM draw_staging")
+        # Later duplicates of an issue win, as the last write would.
+        connection.executemany(
+            f"""
+            INSERT OR REPLACE INTO draw_staging ({columns})
+            VALUES ({", ".join("?" for _ in DRAW_UPSERT_COLUMNS)})
+            """,
+            (_draw_record(draw) for draw in draws),
+        )
+        counts = connection.execute(
+            f"""
+            SELECT
+                SUM(d.issue IS NULL) AS inserted_count,
+                SUM(d.issue IS NOT NULL AND ({differs("d", "s")})) AS updated_count
+            FROM draw_staging s
+            LEFT JOIN draws d
+                ON d.issue = s.issue
+            """
+        ).fetchone()
+        connection.execute(
+            f"""
+            INSERT INTO draws ({columns}, created_at, updated_at)
+            SELECT {columns}, :now, :now
+            FROM draw_staging
+            WHERE true
+            ON CONFLICT(issue) DO UPDATE SET
+                {", ".join(f"{column} = excluded.{column}" for column in data_columns)},
+                updated_at = excluded.updated_at
+            WHERE {differs("draws", "excluded")}
+            """,
+            {"now": now},
+        )
+        connection.execute("DELETE FROM draw_staging")
         connection.commit()
 
     return {
-        "inserted_count": inserted_count,
-        "updated_count": updated_count,
+        "inserted_count": int(counts["inserted_count"] or 0),
+        "updated_count": int(counts["updated_count"] or 0),
     }
 
 
+def bulk_load_draws(
+    draws: list[dict[str, Any]],
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, int]:
+    """Load draws into an empty ``draws`` table in one transaction.
+
+    The secondary indexes are dropped for the load and built once at the end.
+    If the table already has rows, this is the same as ``upsert_draws``.
+    """
+    if not draws:
+        return {"inserted_count": 0, "updated_count": 0}
+
+    with get_connection(db_path) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("SELECT 1 FROM draws LIMIT 1").fetchone() is not None:
+                connection.rollback()
+                inserted_count = None
+            else:
+                inserted_count = _load_into_empty_draws(connection, draws)
+                connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+    if inserted_count is None:
+        return upsert_draws(draws, db_path=db_path)
+    return {"inserted_count": inserted_count, "updated_count": 0}
+
+
+def _load_into_empty_draws(
+    connection: sqlite3.Connection,
+    draws: list[dict[str, Any]],
+) -> int:
+    columns = ", ".join(DRAW_UPSERT_COLUMNS)
+    now = _now_iso()
+    for name, _ in DRAW_INDEXES:
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+    # Later duplicates of an issue win, as they do in upsert_draws.
+    connection.executemany(
+        f"""
+        INSERT OR REPLACE INTO draws ({columns}, created_at, updated_at)
+        VALUES ({", ".join("?" for _ in DRAW_UPSERT_COLUMNS)}, ?, ?)
+        """,
+        ((*_draw_record(draw), now, now) for draw in draws),
+    )
+    for name, definition in DRAW_INDEXES:
+        connection.execute(f"CREATE INDEX {name} ON {definition}")
+    return int(connection.execute("SELECT COUNT(*) FROM draws").fetchone()[0])
+
+
 def get_draw_count(db_path: Path = DEFAULT_DB_PATH) -> int:
     with get_connection(db_path) as connection:
         row = connection.execute("SELECT COUNT(*) AS count FROM draws").fetchone()
@@ -271,44 +734,160 @@ def get_latest_draw(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any] | None:
     return dict(row) if row else None
 
 
+def get_data_version(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
+    with get_connection(db_path) as connection:
+        row = connection.execute(
+            """
+            SELECT
+                (SELECT MAX(issue) FROM draws) AS latest_issue,
+                (SELECT MAX(id) FROM sync_runs) AS latest_sync_run_id,
+                (SELECT MAX(id) FROM prediction_evaluations) AS latest_evaluation_id
+            """
+        ).fetchone()
+    return dict(row)
+
+
 def get_all_draws(db_path: Path = DEFAULT_DB_PATH) -> list[dict[str, Any]]:
+    columns = tuple(DRAW_PAGE_COLUMNS)
+    draws = []
+    for row in iter_draws(columns=columns, db_path=db_path):
+        draw = dict(zip(columns, row))
+        draw["red_numbers"] = list(draw["red_numbers"])
+        draws.append(draw)
+    return draws
+
+
+DRAW_PAGE_COLUMNS = {
+    "issue": "issue",
+    "date": "draw_date",
+    "weekday": "weekday",
+    "red_numbers": "red_numbers",
+    "blue_number": "blue_number",
+    "red_display": "red_display",
+    "blue_display": "blue_display",
+    "sales": "sales",
+    "poolmoney": "poolmoney",
+    "content": "content",
+    "details_link": "details_link",
+}
+
+
+# iter_draws reads the numbers from their integer columns instead of the TEXT copies.
+DRAW_STREAM_COLUMNS = {"red_numbers": "red_mask", "blue_number": "blue"}
+_DRAW_STREAM_DECODERS: dict[str, Callable[[int], Any]] = {
+    "red_numbers": lambda mask: tuple(red_numbers_from_mask(mask)),
+    "blue_number": lambda blue: f"{blue:02d}",
+}
+
+
+def get_draws_fingerprint(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
+    """Row count and latest issue; cheap to compare on every read.
+
+    Rewrites of existing rows leave both unchanged, so writers that report an
+    ``updated_count`` invalidate the caches built on it explicitly.
+    """
     with get_connection(db_path) as connection:
-        rows = connection.execute(
+        row = connection.execute(
             """
             SELECT
-                issue,
-                draw_date,
-                weekday,
-                red_numbers,
-                blue_number,
-                red_display,
-                blue_display,
-                sales,
-                poolmoney,
-                content,
-                details_link
+                (SELECT COUNT(*) FROM draws) AS draw_count,
+                (SELECT MAX(issue) FROM draws) AS latest_issue
+            """
+        ).fetchone()
+    return dict(row)
+
+
+def iter_draws(
+    *,
+    columns: tuple[str, ...] = ("issue", "date", "red_numbers", "blue_number"),
+    since_issue: str | None = None,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> Iterator[tuple[Any, ...]]:
+    """Stream draws oldest first as tuples holding only ``columns``.
+
+    Only the projected columns are read, and rows are fetched in batches from
+    the cursor, so long ``content`` strings never load unless asked for.
+    ``since_issue`` keeps the draws strictly newer than that issue. The numbers
+    are decoded from the integer ``red_mask``/``blue`` columns, so
+    ``red_numbers`` comes back as an ascending tuple.
+    """
+    unknown = [column for column in columns if column not in DRAW_PAGE_COLUMNS]
+    if unknown:
+        raise ValueError(f"未知的字段: {', '.join(unknown)}")
+    select_list = ", ".join(
+        DRAW_STREAM_COLUMNS.get(column, DRAW_PAGE_COLUMNS[column]) for column in columns
+    )
+    decoders = [
+        (index, _DRAW_STREAM_DECODERS[column])
+        for index, column in enumerate(columns)
+        if column in _DRAW_STREAM_DECODERS
+    ]
+    where_clause = "WHERE issue > ?" if since_issue else ""
+    with get_connection(db_path) as connection:
+        cursor = connection.execute(
+            f"""
+            SELECT {select_list}
             FROM draws
+            {where_clause}
             ORDER BY issue ASC
-            """
+            """,
+            (since_issue,) if since_issue else (),
+        )
+        cursor.row_factory = None
+        try:
+            while rows := cursor.fetchmany(DRAW_FETCH_BATCH_SIZE):
+                if not decoders:
+                    yield from rows
+                    continue
+                for row in rows:
+                    values = list(row)
+                    for index, decode in decoders:
+                        values[index] = decode(values[index])
+                    yield tuple(values)
+        finally:
+            cursor.close()
+
+
+def get_draws_page(
+    *,
+    before: str | None = None,
+    limit: int = 50,
+    columns: tuple[str, ...] = tuple(DRAW_PAGE_COLUMNS),
+    keyword: str = "",
+    db_path: Path = DEFAULT_DB_PATH,
+) -> list[dict[str, Any]]:
+    """Return draws newest first, strictly older than ``before`` (keyset pagination on issue)."""
+    select_list = ", ".join(
+        f"{DRAW_PAGE_COLUMNS[column]} AS {column}" for column in columns
+    )
+    conditions = []
+    params: list[Any] = []
+    if before:
+        conditions.append("issue < ?")
+        params.append(before)
+    if keyword:
+        conditions.append(
+            "instr(issue || ' ' || draw_date || ' ' || red_display || ' ' || blue_display, ?) > 0"
+        )
+        params.append(keyword)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    with get_connection(db_path) as connection:
+        rows = connection.execute(
+            f"""
+            SELECT {select_list}
+            FROM draws
+            {where_clause}
+            ORDER BY issue DESC
+            LIMIT ?
+            """,
+            params,
         ).fetchall()
 
-    draws = []
-    for row in rows:
-        draws.append(
-            {
-                "issue": row["issue"],
-                "date": row["draw_date"],
-                "weekday": row["weekday"],
-                "red_numbers": row["red_numbers"].split(","),
-                "blue_number": row["blue_number"],
-                "red_display": row["red_display"],
-                "blue_display": row["blue_display"],
-                "sales": row["sales"],
-                "poolmoney": row["poolmoney"],
-                "content": row["content"],
-                "details_link": row["details_link"],
-            }
-        )
+    draws = [dict(row) for row in rows]
+    if "red_numbers" in columns:
+        for draw in draws:
+            draw["red_numbers"] = draw["red_numbers"].split(",")
     return draws
 
 
@@ -382,6 +961,167 @@ def get_latest_sync_run(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any] | Non
     return dict(row) if row else None
 
 
+def get_sync_checkpoint(
+    source: str,
+    *,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, Any] | None:
+    with get_connection(db_path) as connection:
+        row = connection.execute(
+            """
+            SELECT
+                source,
+                started_at,
+                updated_at,
+                last_completed_page,
+                total_pages,
+                official_total,
+                fetched_count,
+                completed_at
+            FROM sync_checkpoints
+            WHERE source = ?
+            """,
+            (source,),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def save_sync_checkpoint(
+    checkpoint: dict[str, Any],
+    *,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> None:
+    with get_connection(db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO sync_checkpoints (
+                source,
+                started_at,
+                updated_at,
+                last_completed_page,
+                total_pages,
+                official_total,
+                fetched_count,
+                completed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                started_at = excluded.started_at,
+                updated_at = excluded.updated_at,
+                last_completed_page = excluded.last_completed_page,
+                total_pages = excluded.total_pages,
+                official_total = excluded.official_total,
+                fetched_count = excluded.fetched_count,
+                completed_at = excluded.completed_at
+            """,
+            (
+                checkpoint["source"],
+                checkpoint["started_at"],
+                checkpoint["updated_at"],
+                checkpoint["last_completed_page"],
+                checkpoint["total_pages"],
+                checkpoint["official_total"],
+                checkpoint["fetched_count"],
+                checkpoint["completed_at"],
+            ),
+        )
+        connection.commit()
+
+
+def get_circuit_breaker(
+    name: str,
+    *,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, Any] | None:
+    with get_connection(db_path) as connection:
+        row = connection.execute(
+            """
+            SELECT name, state, failure_count, opened_at, next_probe_at, last_error, updated_at
+            FROM circuit_breakers
+            WHERE name = ?
+            """,
+            (name,),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def save_circuit_breaker(
+    breaker: dict[str, Any],
+    *,
+    transition: dict[str, Any] | None = None,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> None:
+    with get_connection(db_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO circuit_breakers (
+                name,
+                state,
+                failure_count,
+                opened_at,
+                next_probe_at,
+                last_error,
+                updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                state = excluded.state,
+                failure_count = excluded.failure_count,
+                opened_at = excluded.opened_at,
+                next_probe_at = excluded.next_probe_at,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+            """,
+            (
+                breaker["name"],
+                breaker["state"],
+                breaker["failure_count"],
+                breaker["opened_at"],
+                breaker["next_probe_at"],
+                breaker["last_error"],
+                breaker["updated_at"],
+            ),
+        )
+        if transition is not None:
+            connection.execute(
+                """
+                INSERT INTO circuit_breaker_events (
+                    name,
+                    occurred_at,
+                    from_state,
+                    to_state,
+                    reason
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    transition["name"],
+                    transition["occurred_at"],
+                    transition["from_state"],
+                    transition["to_state"],
+                    transition["reason"],
+                ),
+            )
+        connection.commit()
+
+
+def get_circuit_breaker_events(
+    name: str,
+    *,
+    limit: int = 10,
+    db_path: Path = DEFAULT_DB_PATH,
+) -> list[dict[str, Any]]:
+    with get_connection(db_path) as connection:
+        rows = connection.execute(
+            """
+            SELECT occurred_at, from_state, to_state, reason
+            FROM circuit_breaker_events
+            WHERE name = ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (name, limit),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
 def get_prediction_snapshot_count(db_path: Path = DEFAULT_DB_PATH) -> int:
     with get_connection(db_path) as connection:
         row = connection.execute(
@@ -424,9 +1164,8 @@ def save_prediction_snapshots_bulk(
                 draw_count,
                 top_red_numbers_json,
                 top_blue_numbers_json,
-                tickets_json,
                 summary_json
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(base_issue) DO UPDATE SET
                 base_date = excluded.base_date,
                 target_issue = excluded.target_issue,
@@ -436,7 +1175,6 @@ def save_prediction_snapshots_bulk(
                 draw_count = excluded.draw_count,
                 top_red_numbers_json = excluded.top_red_numbers_json,
                 top_blue_numbers_json = excluded.top_blue_numbers_json,
-                tickets_json = excluded.tickets_json,
                 summary_json = excluded.summary_json
             """,
             [
@@ -450,12 +1188,24 @@ def save_prediction_snapshots_bulk(
                     snapshot["draw_count"],
                     json.dumps(snapshot["top_red_numbers"], ensure_ascii=False),
                     json.dumps(snapshot["top_blue_numbers"], ensure_ascii=False),
-                    json.dumps(snapshot["tickets"], ensure_ascii=False),
                     json.dumps(snapshot["summary"], ensure_ascii=False),
                 )
                 for snapshot in snapshots
             ],
         )
+        tickets_by_issue = {snapshot["base_issue"]: snapshot["tickets"] for snapshot in snapshots}
+        tickets_by_snapshot = {}
+        for chunk in _chunks(list(tickets_by_issue)):
+            for row in connection.execute(
+                f"""
+                SELECT id, base_issue
+                FROM prediction_snapshots
+                WHERE base_issue IN ({",".join("?" for _ in chunk)})
+                """,
+                chunk,
+            ):
+                tickets_by_snapshot[row["id"]] = tickets_by_issue[row["base_issue"]]
+        _replace_tickets(connection, tickets_by_snapshot)
         connection.commit()
 
 
@@ -477,14 +1227,14 @@ def get_prediction_snapshot(
                 draw_count,
                 top_red_numbers_json,
                 top_blue_numbers_json,
-                tickets_json,
                 summary_json
             FROM prediction_snapshots
             WHERE base_issue = ?
             """,
             (base_issue,),
         ).fetchone()
-    return _deserialize_prediction_row(row)
+        tickets = _load_tickets(connection, [row["id"]]) if row else {}
+    return _deserialize_prediction_row(row, tickets)
 
 
 def get_latest_prediction_snapshot(
@@ -504,14 +1254,14 @@ def get_latest_prediction_snapshot(
                 draw_count,
                 top_red_numbers_json,
                 top_blue_numbers_json,
-                tickets_json,
                 summary_json
             FROM prediction_snapshots
             ORDER BY base_issue DESC, generated_at DESC, id DESC
             LIMIT 1
             """
         ).fetchone()
-    return _deserialize_prediction_row(row)
+        tickets = _load_tickets(connection, [row["id"]]) if row else {}
+    return _deserialize_prediction_row(row, tickets)
 
 
 def get_prediction_snapshot_index(
@@ -546,13 +1296,184 @@ def save_prediction_evaluation(
     save_prediction_evaluations_bulk([evaluation], db_path=db_path)
 
 
+def _rollup_periods(target_date: str) -> tuple[str, str]:
+    return ROLLUP_ALL_PERIOD, target_date[:4]
+
+
+def _rollup_counters(
+    ticket_count: int,
+    winning_ticket_count: int,
+    prize_breakdown: dict[str, int],
+) -> list[int]:
+    return [
+        1,
+        1 if winning_ticket_count > 0 else 0,
+        ticket_count,
+        winning_ticket_count,
+        *(int(prize_breakdown.get(prize_name, 0)) for prize_name in PRIZE_LEVELS),
+    ]
+
+
+def _prize_rank(prize_level: str | None) -> int | None:
+    return PRIZE_LEVELS.index(prize_level) + 1 if prize_level else None
+
+
+def _upsert_rollup_rows(
+    connection: sqlite3.Connection,
+    deltas: dict[tuple[str, str], list[int]],
+    best_ranks: dict[tuple[str, str], int | None],
+) -> None:
+    counter_columns = ", ".join(_ROLLUP_COUNTERS)
+    placeholders = ", ".join("?" for _ in _ROLLUP_COUNTERS)
+    increments = ",\n                ".join(
+        f"{column} = {column} + excluded.{column}" for column in _ROLLUP_COUNTERS
+    )
+    now = _now_iso()
+    connection.executemany(
+        f"""
+        INSERT INTO prediction_performance_rollup (
+            model_version, period, {counter_columns}, best_prize_rank, updated_at
+        ) VALUES (?, ?, {placeholders}, ?, ?)
+        ON CONFLICT(model_version, period) DO UPDATE SET
+            {increments},
+            best_prize_rank = CASE
+                WHEN excluded.best_prize_rank IS NULL THEN best_prize_rank
+                WHEN best_prize_rank IS NULL THEN excluded.best_prize_rank
+                ELSE MIN(best_prize_rank, excluded.best_prize_rank)
+            END,
+            updated_at = excluded.updated_at
+        """,
+        [
+            (*key, *counters, best_ranks.get(key), now)
+            for key, counters in deltas.items()
+        ],
+    )
+
+
+def _refresh_rollup_best_ranks(
+    connection: sqlite3.Connection,
+    keys: Iterable[tuple[str, str]],
+) -> None:
+    # A best prize cannot be "subtracted", so rows whose replaced evaluations
+    # held a prize get their best rank recomputed from the evaluations.
+    rank_case = " ".join(
+        f"WHEN '{prize_name}' THEN {rank}"
+        for rank, prize_name in enumerate(PRIZE_LEVELS, start=1)
+    )
+    for model_version, period in keys:
+        period_filter = "" if period == ROLLUP_ALL_PERIOD else "AND substr(target_date, 1, 4) = ?"
+        params = [model_version] if period == ROLLUP_ALL_PERIOD else [model_version, period]
+        best_rank = connection.execute(
+            f"""
+            SELECT MIN(CASE highest_prize_level {rank_case} END)
+            FROM prediction_evaluations
+            WHERE model_version = ? {period_filter}
+            """,
+            params,
+        ).fetchone()[0]
+        connection.execute(
+            """
+            UPDATE prediction_performance_rollup
+            SET best_prize_rank = ?
+            WHERE model_version = ? AND period = ?
+            """,
+            (best_rank, model_version, period),
+        )
+
+
+def rebuild_prediction_performance_rollup(connection: sqlite3.Connection) -> None:
+    """Recompute every rollup row from ``prediction_evaluations`` (no commit)."""
+    deltas: dict[tuple[str, str], list[int]] = {}
+    best_ranks: dict[tuple[str, str], int | None] = {}
+    for row in connection.execute(
+        """
+        SELECT
+            model_version,
+            target_date,
+            ticket_count,
+            winning_ticket_count,
+            highest_prize_level,
+            prize_breakdown_json
+        FROM prediction_evaluations
+        """
+    ):
+        counters = _rollup_counters(
+            int(row["ticket_count"]),
+            int(row["winning_ticket_count"]),
+            json.loads(row["prize_breakdown_json"]),
+        )
+        rank = _prize_rank(row["highest_prize_level"])
+        for period in _rollup_periods(row["target_date"]):
+            key = (row["model_version"], period)
+            totals = deltas.setdefault(key, [0] * len(_ROLLUP_COUNTERS))
+            for index, value in enumerate(counters):
+                totals[index] += value
+            if rank is not None and (best_ranks.get(key) is None or rank < best_ranks[key]):
+                best_ranks[key] = rank
+    connection.execute("DELETE FROM prediction_performance_rollup")
+    _upsert_rollup_rows(connection, deltas, best_ranks)
+
+
 def save_prediction_evaluations_bulk(
     evaluations: list[dict[str, Any]],
     db_path: Path = DEFAULT_DB_PATH,
 ) -> None:
     if not evaluations:
         return
+    # The last evaluation of a snapshot wins, exactly as ON CONFLICT would apply it.
+    evaluations = list(
+        {evaluation["snapshot_id"]: evaluation for evaluation in evaluations}.values()
+    )
     with get_connection(db_path) as connection:
+        deltas: dict[tuple[str, str], list[int]] = {}
+        best_ranks: dict[tuple[str, str], int | None] = {}
+        stale_best_keys: set[tuple[str, str]] = set()
+
+        def add_delta(key: tuple[str, str], counters: list[int], sign: int) -> None:
+            totals = deltas.setdefault(key, [0] * len(_ROLLUP_COUNTERS))
+            for index, value in enumerate(counters):
+                totals[index] += sign * value
+
+        snapshot_ids = [evaluation["snapshot_id"] for evaluation in evaluations]
+        for chunk in _chunks(snapshot_ids):
+            for row in connection.execute(
+                f"""
+                SELECT
+                    model_version,
+                    target_date,
+                    ticket_count,
+                    winning_ticket_count,
+                    highest_prize_level,
+                    prize_breakdown_json
+                FROM prediction_evaluations
+                WHERE snapshot_id IN ({",".join("?" for _ in chunk)})
+                """,
+                chunk,
+            ):
+                counters = _rollup_counters(
+                    int(row["ticket_count"]),
+                    int(row["winning_ticket_count"]),
+                    json.loads(row["prize_breakdown_json"]),
+                )
+                for period in _rollup_periods(row["target_date"]):
+                    key = (row["model_version"], period)
+                    add_delta(key, counters, -1)
+                    if row["highest_prize_level"]:
+                        stale_best_keys.add(key)
+
+        for evaluation in evaluations:
+            counters = _rollup_counters(
+                int(evaluation["ticket_count"]),
+                int(evaluation["winning_ticket_count"]),
+                evaluation["prize_breakdown"],
+            )
+            rank = _prize_rank(evaluation["highest_prize_level"])
+            for period in _rollup_periods(evaluation["target_date"]):
+                key = (evaluation["model_version"], period)
+                add_delta(key, counters, 1)
+                if rank is not None and (best_ranks.get(key) is None or rank < best_ranks[key]):
+                    best_ranks[key] = rank
+
         connection.executemany(
             """
             INSERT INTO prediction_evaluations (
@@ -568,9 +1489,8 @@ def save_prediction_evaluations_bulk(
                 winning_ticket_rate,
                 highest_prize_level,
                 prize_breakdown_json,
-                ticket_results_json,
                 model_version
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(snapshot_id) DO UPDATE SET
                 base_issue = excluded.base_issue,
                 target_issue = excluded.target_issue,
@@ -583,7 +1503,6 @@ def save_prediction_evaluations_bulk(
                 winning_ticket_rate = excluded.winning_ticket_rate,
                 highest_prize_level = excluded.highest_prize_level,
                 prize_breakdown_json = excluded.prize_breakdown_json,
-                ticket_results_json = excluded.ticket_results_json,
                 model_version = excluded.model_version
             """,
             [
@@ -600,12 +1519,30 @@ def save_prediction_evaluations_bulk(
                     evaluation["winning_ticket_rate"],
                     evaluation["highest_prize_level"],
                     json.dumps(evaluation["prize_breakdown"], ensure_ascii=False),
-                    json.dumps(evaluation["ticket_results"], ensure_ascii=False),
                     evaluation["model_version"],
                 )
                 for evaluation in evaluations
             ],
         )
+        results_by_snapshot = {
+            evaluation["snapshot_id"]: evaluation["ticket_results"] for evaluation in evaluations
+        }
+        results_by_evaluation = {}
+        for chunk in _chunks(list(results_by_snapshot)):
+            for row in connection.execute(
+                f"""
+                SELECT id, snapshot_id
+                FROM prediction_evaluations
+                WHERE snapshot_id IN ({",".join("?" for _ in chunk)})
+                """,
+                chunk,
+            ):
+                results_by_evaluation[row["id"]] = results_by_snapshot[row["snapshot_id"]]
+        _replace_ticket_results(connection, results_by_evaluation)
+        # The rollup changes in the same transaction as the evaluations it summarizes.
+        _upsert_rollup_rows(connection, deltas, best_ranks)
+        if stale_best_keys:
+            _refresh_rollup_best_ranks(connection, stale_best_keys)
         connection.commit()
 
 
@@ -630,14 +1567,14 @@ def get_prediction_evaluation(
                 winning_ticket_rate,
                 highest_prize_level,
                 prize_breakdown_json,
-                ticket_results_json,
                 model_version
             FROM prediction_evaluations
             WHERE base_issue = ?
             """,
             (base_issue,),
         ).fetchone()
-    return _deserialize_evaluation_row(row)
+        ticket_results = _load_ticket_results(connection, [row["id"]]) if row else {}
+    return _deserialize_evaluation_row(row, ticket_results)
 
 
 def get_prediction_evaluation_index(
@@ -680,7 +1617,6 @@ def get_snapshots_ready_for_evaluation(
                 s.draw_count,
                 s.top_red_numbers_json,
                 s.top_blue_numbers_json,
-                s.tickets_json,
                 s.summary_json,
                 d.draw_date AS target_date,
                 d.red_numbers AS target_red_numbers,
@@ -694,9 +1630,10 @@ def get_snapshots_ready_for_evaluation(
             ORDER BY s.base_issue ASC
             """
         ).fetchall()
+        tickets = _load_tickets(connection, [row["id"] for row in rows])
     ready = []
     for row in rows:
-        snapshot = _deserialize_prediction_row(row)
+        snapshot = _deserialize_prediction_row(row, tickets)
         snapshot["target_date"] = row["target_date"]
         snapshot["target_red_numbers"] = row["target_red_numbers"].split(",")
         snapshot["target_blue_number"] = row["target_blue_number"]
@@ -725,7 +1662,6 @@ def get_recent_prediction_evaluations(
                 winning_ticket_rate,
                 highest_prize_level,
                 prize_breakdown_json,
-                ticket_results_json,
                 model_version
             FROM prediction_evaluations
             ORDER BY target_issue DESC
@@ -733,70 +1669,18 @@ def get_recent_prediction_evaluations(
             """,
             (limit,),
         ).fetchall()
-    return [_deserialize_evaluation_row(row) for row in rows]
+        ticket_results = _load_ticket_results(connection, [row["id"] for row in rows])
+    return [_deserialize_evaluation_row(row, ticket_results) for row in rows]
 
 
-def get_prediction_performance_summary(
-    db_path: Path = DEFAULT_DB_PATH,
-) -> dict[str, Any]:
-    snapshots_total = get_prediction_snapshot_count(db_path=db_path)
-    evaluated_total = get_prediction_evaluation_count(db_path=db_path)
-    recent = get_recent_prediction_evaluations(limit=12, db_path=db_path)
-
-    with get_connection(db_path) as connection:
-        rows = connection.execute(
-            """
-            SELECT
-                winning_ticket_count,
-                ticket_count,
-                highest_prize_level,
-                prize_breakdown_json
-            FROM prediction_evaluations
-            """
-        ).fetchall()
-
-    total_tickets = 0
-    winning_tickets = 0
-    winning_issues = 0
-    prize_breakdown_total = {
-        "一等奖": 0,
-        "二等奖": 0,
-        "三等奖": 0,
-        "四等奖": 0,
-        "五等奖": 0,
-        "六等奖": 0,
-    }
-    best_rank = None
-    best_prize = None
-    prize_rank = {
-        "一等奖": 1,
-        "二等奖": 2,
-        "三等奖": 3,
-        "四等奖": 4,
-        "五等奖": 5,
-        "六等奖": 6,
-    }
-
-    for row in rows:
-        total_tickets += int(row["ticket_count"])
-        winning_tickets += int(row["winning_ticket_count"])
-        if int(row["winning_ticket_count"]) > 0:
-            winning_issues += 1
-        if row["highest_prize_level"]:
-            current_rank = prize_rank[row["highest_prize_level"]]
-            if best_rank is None or current_rank < best_rank:
-                best_rank = current_rank
-                best_prize = row["highest_prize_level"]
-        breakdown = json.loads(row["prize_breakdown_json"])
-        for prize_name, count in breakdown.items():
-            prize_breakdown_total[prize_name] = prize_breakdown_total.get(prize_name, 0) + int(
-                count
-            )
-
+def _performance_totals(row: sqlite3.Row | None) -> dict[str, Any]:
+    evaluated_total = int(row["evaluated_count"] or 0) if row else 0
+    winning_issues = int(row["winning_issue_count"] or 0) if row else 0
+    total_tickets = int(row["ticket_count"] or 0) if row else 0
+    winning_tickets = int(row["winning_ticket_count"] or 0) if row else 0
+    best_rank = row["best_prize_rank"] if row else None
     return {
-        "snapshot_total": snapshots_total,
         "evaluated_total": evaluated_total,
-        "pending_total": max(0, snapshots_total - evaluated_total),
         "issue_winning_total": winning_issues,
         "issue_win_rate_percent": round(
             winning_issues / evaluated_total * 100, 2
@@ -810,13 +1694,52 @@ def get_prediction_performance_summary(
         )
         if total_tickets
         else 0.0,
-        "best_prize_level": best_prize,
-        "prize_breakdown_total": prize_breakdown_total,
+        "best_prize_level": PRIZE_LEVELS[best_rank - 1] if best_rank else None,
+        "prize_breakdown_total": {
+            prize_name: int(row[f"prize_{rank}_count"] or 0) if row else 0
+            for rank, prize_name in enumerate(PRIZE_LEVELS, start=1)
+        },
+    }
+
+
+def get_prediction_performance_summary(
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, Any]:
+    snapshots_total = get_prediction_snapshot_count(db_path=db_path)
+    recent = get_recent_prediction_evaluations(limit=12, db_path=db_path)
+
+    sums = ", ".join(f"SUM({column}) AS {column}" for column in _ROLLUP_COUNTERS)
+    with get_connection(db_path) as connection:
+        rows = connection.execute(
+            f"""
+            SELECT period, {sums}, MIN(best_prize_rank) AS best_prize_rank
+            FROM prediction_performance_rollup
+            GROUP BY period
+            ORDER BY period DESC
+            """
+        ).fetchall()
+
+    by_period = {row["period"]: row for row in rows}
+    summary = _performance_totals(by_period.get(ROLLUP_ALL_PERIOD))
+    evaluated_total = summary["evaluated_total"]
+    return {
+        "snapshot_total": snapshots_total,
+        "evaluated_total": evaluated_total,
+        "pending_total": max(0, snapshots_total - evaluated_total),
+        **{key: value for key, value in summary.items() if key != "evaluated_total"},
         "recent_evaluations": recent,
+        "yearly_breakdown": [
+            {"year": row["period"], **_performance_totals(row)}
+            for row in rows
+            if row["period"] != ROLLUP_ALL_PERIOD and row["evaluated_count"]
+        ],
     }
 
 
-def _deserialize_prediction_row(row: sqlite3.Row | None) -> dict[str, Any] | None:
+def _deserialize_prediction_row(
+    row: sqlite3.Row | None,
+    tickets: dict[int, list[dict[str, Any]]],
+) -> dict[str, Any] | None:
     if row is None:
         return None
     return {
@@ -830,12 +1753,15 @@ def _deserialize_prediction_row(row: sqlite3.Row | None) -> dict[str, Any] | Non
         "draw_count": row["draw_count"],
         "top_red_numbers": json.loads(row["top_red_numbers_json"]),
         "top_blue_numbers": json.loads(row["top_blue_numbers_json"]),
-        "tickets": json.loads(row["tickets_json"]),
+        "tickets": tickets.get(row["id"], []),
         "summary": json.loads(row["summary_json"]),
     }
 
 
-def _deserialize_evaluation_row(row: sqlite3.Row | None) -> dict[str, Any] | None:
+def _deserialize_evaluation_row(
+    row: sqlite3.Row | None,
+    ticket_results: dict[int, list[dict[str, Any]]],
+) -> dict[str, Any] | None:
     if row is None:
         return None
     return {
@@ -852,6 +1778,6 @@ def _deserialize_evaluation_row(row: sqlite3.Row | None) -> dict[str, Any] | Non
         "winning_ticket_rate": row["winning_ticket_rate"],
         "highest_prize_level": row["highest_prize_level"],
         "prize_breakdown": json.loads(row["prize_breakdown_json"]),
-        "ticket_results": json.loads(row["ticket_results_json"]),
+        "ticket_results": ticket_results.get(row["id"], []),
         "model_version": row["model_version"],
     }
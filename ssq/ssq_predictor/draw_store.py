@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+from .db import DEFAULT_DB_PATH, get_draws_fingerprint, iter_draws, read_transaction
+
+DRAW_RECORD_FIELDS = (
+    "issue",
+    "date",
+    "weekday",
+    "red_numbers",
+    "blue_number",
+    "red_display",
+    "blue_display",
+)
+
+
+class DrawRecord:
+    """The fields analysis reads from one draw, indexable like a draw dict.
+
+    Records are shared between threads and must be treated as read-only.
+    """
+
+    __slots__ = DRAW_RECORD_FIELDS
+
+    def __init__(
+        self,
+        issue: str,
+        date: str,
+        weekday: str,
+        red_numbers: tuple[str, ...],
+        blue_number: str,
+        red_display: str,
+        blue_display: str,
+    ) -> None:
+        self.issue = issue
+        self.date = date
+        self.weekday = weekday
+        self.red_numbers = red_numbers
+        self.blue_number = blue_number
+        self.red_display = red_display
+        self.blue_display = blue_display
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {field: getattr(self, field) for field in DRAW_RECORD_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"DrawRecord({self.issue} {self.red_display}+{self.blue_display})"
+
+
+class DrawStore:
+    """Process-wide, per-database list of DrawRecord, oldest issue first.
+
+    Every read compares a cheap fingerprint of the ``draws`` table with the one
+    the list was built from. Draws appended after the latest cached issue are
+    read on their own and joined to a new list, so callers holding the previous
+    list keep a consistent view; any other change reloads everything. Writers
+    that change existing rows call ``invalidate``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+
+    def draws(self, db_path: Path = DEFAULT_DB_PATH) -> list[DrawRecord]:
+        key = str(db_path.resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            with read_transaction(db_path):
+                fingerprint = get_draws_fingerprint(db_path)
+                if entry is not None and entry["fingerprint"] == fingerprint:
+                    return entry["records"]
+                records = self._load(entry, fingerprint, db_path)
+            self._entries[key] = {"fingerprint": fingerprint, "records": records}
+            return records
+
+    def invalidate(self, db_path: Path | None = None) -> None:
+        with self._lock:
+            if db_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(db_path.resolve()), None)
+
+    def _load(
+        self,
+        entry: dict[str, Any] | None,
+        fingerprint: dict[str, Any],
+        db_path: Path,
+    ) -> list[DrawRecord]:
+        if entry is not None and entry["records"]:
+            records = entry["records"]
+            appended = [
+                DrawRecord(*row)
+                for row in iter_draws(
+                    columns=DRAW_RECORD_FIELDS,
+                    since_issue=records[-1].issue,
+                    db_path=db_path,
+                )
+            ]
+            if len(records) + len(appended) == fingerprint["draw_count"]:
+                return [*records, *appended]
+        # First load, or rows were inserted before the latest issue or deleted.
+        return [
+            DrawRecord(*row)
+            for row in iter_draws(columns=DRAW_RECORD_FIELDS, db_path=db_path)
+        ]
+
+
+DRAW_STORE = DrawStore()
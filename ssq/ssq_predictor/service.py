@@ -1,18 +1,42 @@
 from __future__ import annotations
 
+import copy
+import math
+import multiprocessing
 import re
 import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, time as dt_time, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from . import data_source
-from .analysis import MIN_BACKTEST_DRAWS, build_prediction_artifacts, build_report_from_draws
+from .analysis import (
+    BLUE_NUMBERS,
+    MIN_BACKTEST_DRAWS,
+    RED_NUMBERS,
+    REPORT_SECTIONS,
+    DrawScoreIndex,
+    ReportSections,
+    RollingNumberStats,
+    build_prediction_artifacts,
+    build_report_from_draws,
+    encode_draw,
+    iter_prediction_artifacts,
+)
 from .db import (
     DEFAULT_DB_PATH,
+    DRAW_PAGE_COLUMNS,
+    PRIZE_LEVELS,
+    bulk_load_draws,
     get_all_draws,
+    get_circuit_breaker,
+    get_circuit_breaker_events,
+    get_data_version,
     get_draw_count,
+    get_draws_fingerprint,
+    get_draws_page,
     get_latest_draw,
     get_prediction_evaluation_index,
     get_prediction_performance_summary,
@@ -21,14 +45,18 @@ from .db import (
     get_prediction_snapshot,
     get_prediction_snapshot_index,
     get_snapshots_ready_for_evaluation,
+    get_sync_checkpoint,
     initialize_database,
+    read_transaction,
     record_sync_run,
-    save_prediction_evaluation,
+    save_circuit_breaker,
     save_prediction_evaluations_bulk,
     save_prediction_snapshot,
     save_prediction_snapshots_bulk,
+    save_sync_checkpoint,
     upsert_draws,
 )
+from .draw_store import DRAW_STORE
 
 MODEL_VERSION = "frequency-omission-zscore-v2"
 SCHEDULE_WEEKDAYS = (1, 3, 6)
@@ -38,27 +66,120 @@ SCHEDULE_MINUTE = 50
 RETRY_HOUR = 0
 RETRY_MINUTE = 30
 SCHEDULE_DESCRIPTION = "每周二、四、日 21:50 自动同步，失败则次日 00:30 重试一次"
+DRAW_NIGHT_POLL_START = "21:20"
+DRAW_NIGHT_POLL_INTERVAL_SECONDS = 60
+DRAW_NIGHT_POLL_MAX_INTERVAL_SECONDS = 600
+DRAW_NIGHT_POLL_BACKOFF = 1.5
+EVALUATION_BATCH_SIZE = 500
+FULL_SYNC_CHECKPOINT_SOURCE = "official"
+BUNDLED_SNAPSHOT_PATH = data_source.DEFAULT_CACHE_PATH
+DRAW_PAGE_DEFAULT_LIMIT = 50
+DRAW_PAGE_MAX_LIMIT = 500
 SYNC_LOCK = threading.Lock()
 BACKFILL_LOCK = threading.Lock()
 _RUNTIME_OPTIONS: dict[str, Any] = {
     "auto_sync_enabled": False,
     "schedule_description": SCHEDULE_DESCRIPTION,
+    "backfill_workers": 1,
+    "background_backfill": False,
+    "draw_night_polling": {
+        "enabled": False,
+        "start": DRAW_NIGHT_POLL_START,
+        "interval_seconds": DRAW_NIGHT_POLL_INTERVAL_SECONDS,
+        "max_interval_seconds": DRAW_NIGHT_POLL_MAX_INTERVAL_SECONDS,
+    },
 }
-PRIZE_LEVEL_ORDER = ("一等奖", "二等奖", "三等奖", "四等奖", "五等奖", "六等奖")
-BACKFILL_BATCH_LIMIT = 80
+PRIZE_LEVEL_ORDER = PRIZE_LEVELS
 BACKFILL_TIME_BUDGET_SECONDS = 8.0
+BACKFILL_CHUNKS_PER_WORKER = 4
+BACKFILL_DRAW_FIELDS = ("issue", "date", "weekday", "red_numbers", "blue_number")
+BACKFILL_WAKE_EVENT = threading.Event()
+_REPORT_GENERATION_LOCK = threading.Lock()
+_REPORT_GENERATION = 0
+_REPORT_SECTIONS_LOCK = threading.Lock()
+_REPORT_SECTIONS_MEMO: dict[str, Any] = {"version": None, "sections": None}
+_BACKFILL_STATUS_LOCK = threading.Lock()
+_BACKFILL_STATUS: dict[str, Any] = {
+    "state": "idle",
+    "expected_snapshot_total": 0,
+    "expected_evaluation_total": 0,
+    "snapshot_done": 0,
+    "evaluation_done": 0,
+    "snapshot_created": 0,
+    "snapshot_updated": 0,
+    "evaluation_created": 0,
+    "evaluation_updated": 0,
+    "processed_total": 0,
+    "running_seconds": 0.0,
+    "batch_count": 0,
+    "started_at": None,
+    "updated_at": None,
+    "completed_at": None,
+    "last_error": "",
+    "pending_evaluation_meta": {"evaluated_count": 0, "winning_issue_count": 0},
+}
+_BREAKER_BIND_LOCK = threading.Lock()
+_BREAKER_BINDING: dict[str, str | None] = {"db_path": None}
+_AUTO_SYNC_STATUS_LOCK = threading.Lock()
+_AUTO_SYNC_STATUS: dict[str, Any] = {
+    "state": "idle",
+    "next_event_type": None,
+    "next_event_at": None,
+    "poll_started_at": None,
+    "poll_deadline_at": None,
+    "base_issue": None,
+    "probe_count": 0,
+    "last_probe_at": None,
+    "last_probe_issue": None,
+    "last_probe_error": "",
+    "poll_interval_seconds": None,
+    "next_probe_at": None,
+    "new_issue_detected_at": None,
+    "last_outcome": "",
+    "updated_at": None,
+}
 
 
 def _now_iso() -> str:
     return datetime.now().isoformat(timespec="seconds")
 
 
+def _parse_clock(value: str) -> dt_time:
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})", value.strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"时间需为 HH:MM 格式: {value}")
+    return dt_time(hour=int(match.group(1)), minute=int(match.group(2)))
+
+
 def configure_runtime(
     *,
     auto_sync_enabled: bool,
+    backfill_workers: int = 1,
+    background_backfill: bool = False,
+    draw_night_polling: bool = False,
+    poll_start: str = DRAW_NIGHT_POLL_START,
+    poll_interval_seconds: int = DRAW_NIGHT_POLL_INTERVAL_SECONDS,
 ) -> None:
+    start = _parse_clock(poll_start)
+    if poll_interval_seconds < 1:
+        raise ValueError("轮询间隔必须大于等于 1 秒")
     _RUNTIME_OPTIONS["auto_sync_enabled"] = auto_sync_enabled
-    _RUNTIME_OPTIONS["schedule_description"] = SCHEDULE_DESCRIPTION
+    _RUNTIME_OPTIONS["backfill_workers"] = max(1, backfill_workers)
+    _RUNTIME_OPTIONS["background_backfill"] = background_backfill
+    _RUNTIME_OPTIONS["draw_night_polling"] = {
+        "enabled": draw_night_polling,
+        "start": start.strftime("%H:%M"),
+        "interval_seconds": poll_interval_seconds,
+        "max_interval_seconds": max(poll_interval_seconds, DRAW_NIGHT_POLL_MAX_INTERVAL_SECONDS),
+    }
+    _RUNTIME_OPTIONS["schedule_description"] = (
+        f"每周{'、'.join(SCHEDULE_WEEKDAY_LABELS)} {start.strftime('%H:%M')} 起探测最新期号，"
+        f"初始间隔 {poll_interval_seconds} 秒并逐次退避至最长 "
+        f"{_RUNTIME_OPTIONS['draw_night_polling']['max_interval_seconds']} 秒，"
+        f"新一期出现即同步，截至次日 {get_retry_sync_time_label()} 仍未出现则补拉一次"
+        if draw_night_polling
+        else SCHEDULE_DESCRIPTION
+    )
 
 
 def get_runtime_options() -> dict[str, Any]:
@@ -66,19 +187,97 @@ def get_runtime_options() -> dict[str, Any]:
 
 
 def get_schedule_description() -> str:
-    return SCHEDULE_DESCRIPTION
+    return _RUNTIME_OPTIONS["schedule_description"]
+
+
+def update_auto_sync_status(**changes: Any) -> None:
+    with _AUTO_SYNC_STATUS_LOCK:
+        _AUTO_SYNC_STATUS.update(changes)
+        _AUTO_SYNC_STATUS["updated_at"] = _now_iso()
+    invalidate_report_cache()
+
+
+def bind_official_breaker(db_path: Path = DEFAULT_DB_PATH) -> None:
+    """Restore the official-source breaker from ``db_path`` and persist its changes there."""
+    resolved = str(db_path.resolve())
+    with _BREAKER_BIND_LOCK:
+        if _BREAKER_BINDING["db_path"] == resolved:
+            return
+        initialize_database(db_path)
+
+        def persist(state: dict[str, Any], transition: dict[str, Any] | None) -> None:
+            save_circuit_breaker(state, transition=transition, db_path=db_path)
+            if transition is not None:
+                invalidate_report_cache()
+
+        breaker = data_source.OFFICIAL_BREAKER
+        breaker.bind(get_circuit_breaker(breaker.name, db_path=db_path), persist)
+        _BREAKER_BINDING["db_path"] = resolved
+
+
+def get_official_breaker_status(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
+    breaker = data_source.OFFICIAL_BREAKER
+    return {
+        **breaker.snapshot(),
+        "failure_threshold": breaker.failure_threshold,
+        "open_seconds": breaker.open_seconds,
+        "history": get_circuit_breaker_events(breaker.name, db_path=db_path),
+    }
+
+
+def probe_official_latest_issue(db_path: Path = DEFAULT_DB_PATH) -> str:
+    bind_official_breaker(db_path)
+    return data_source.probe_latest_issue()
+
+
+def get_auto_sync_status() -> dict[str, Any]:
+    polling = _RUNTIME_OPTIONS["draw_night_polling"]
+    with _AUTO_SYNC_STATUS_LOCK:
+        status = dict(_AUTO_SYNC_STATUS)
+    return {
+        "mode": "adaptive" if polling["enabled"] else "fixed",
+        "poll_start": polling["start"],
+        "poll_base_interval_seconds": polling["interval_seconds"],
+        "poll_max_interval_seconds": polling["max_interval_seconds"],
+        **status,
+    }
+
+
+def invalidate_report_cache() -> None:
+    global _REPORT_GENERATION
+    with _REPORT_GENERATION_LOCK:
+        _REPORT_GENERATION += 1
+
+
+def get_report_version(db_path: Path = DEFAULT_DB_PATH) -> tuple[Any, ...]:
+    """Return a key that changes whenever ``build_report_data`` could change."""
+    initialize_database(db_path)
+    data_version = get_data_version(db_path)
+    with _REPORT_GENERATION_LOCK:
+        generation = _REPORT_GENERATION
+    return (
+        data_version["latest_issue"],
+        MODEL_VERSION,
+        data_version["latest_sync_run_id"],
+        data_version["latest_evaluation_id"],
+        generation,
+        get_next_regular_sync_at(),
+    )
 
 
 def get_next_regular_sync_at(now: datetime | None = None) -> str:
     current = now or datetime.now()
+    polling = _RUNTIME_OPTIONS["draw_night_polling"]
+    regular_time = (
+        _parse_clock(polling["start"])
+        if polling["enabled"]
+        else dt_time(hour=SCHEDULE_HOUR, minute=SCHEDULE_MINUTE)
+    )
     for offset in range(0, 8):
         candidate_date = current.date() + timedelta(days=offset)
         if candidate_date.weekday() not in SCHEDULE_WEEKDAYS:
             continue
-        candidate_dt = datetime.combine(
-            candidate_date,
-            dt_time(hour=SCHEDULE_HOUR, minute=SCHEDULE_MINUTE),
-        )
+        candidate_dt = datetime.combine(candidate_date, regular_time)
         if candidate_dt > current:
             return candidate_dt.isoformat(timespec="seconds")
     raise RuntimeError("无法计算下一次双色球定时同步时间。")
@@ -99,7 +298,13 @@ def _infer_next_issue(issue: str) -> str | None:
 
 
 def _build_prediction_snapshot_from_draws(draws: list[dict[str, Any]]) -> dict[str, Any]:
-    artifacts = build_prediction_artifacts(draws)
+    return _build_prediction_snapshot(build_prediction_artifacts(draws), len(draws))
+
+
+def _build_prediction_snapshot(
+    artifacts: dict[str, Any],
+    draw_count: int,
+) -> dict[str, Any]:
     latest_issue = artifacts["latest_issue_analysis"]
     prediction = artifacts["prediction"]
     return {
@@ -109,7 +314,7 @@ def _build_prediction_snapshot_from_draws(draws: list[dict[str, Any]]) -> dict[s
         "target_label": "下一期开奖",
         "generated_at": _now_iso(),
         "model_version": MODEL_VERSION,
-        "draw_count": len(draws),
+        "draw_count": draw_count,
         "top_red_numbers": [item["number"] for item in prediction["top_red_numbers"]],
         "top_blue_numbers": [item["number"] for item in prediction["top_blue_numbers"]],
         "tickets": prediction["tickets"],
@@ -142,19 +347,29 @@ def _determine_prize_level(red_matches: int, blue_match: int) -> str | None:
     return None
 
 
+# Prize for every (red matches, blue match) pair, indexed by ``red * 2 + blue``.
+PRIZE_LOOKUP = tuple(
+    _determine_prize_level(red_matches, blue_match)
+    for red_matches in range(7)
+    for blue_match in (0, 1)
+)
+
+
 def _evaluate_prediction_snapshot(
     snapshot: dict[str, Any],
     target_draw: dict[str, Any],
 ) -> dict[str, Any]:
     actual_red_numbers = target_draw["red_numbers"]
     actual_blue_number = target_draw["blue_number"]
+    actual_mask, actual_blue = encode_draw(target_draw)
     prize_breakdown = {prize_name: 0 for prize_name in PRIZE_LEVEL_ORDER}
     ticket_results = []
 
     for ticket in snapshot["tickets"]:
-        red_matches = len(set(ticket["red_numbers"]) & set(actual_red_numbers))
-        blue_match = 1 if ticket["blue_number"] == actual_blue_number else 0
-        prize_level = _determine_prize_level(red_matches, blue_match)
+        ticket_mask, ticket_blue = encode_draw(ticket)
+        red_matches = (ticket_mask & actual_mask).bit_count()
+        blue_match = 1 if ticket_blue == actual_blue else 0
+        prize_level = PRIZE_LOOKUP[red_matches * 2 + blue_match]
         if prize_level:
             prize_breakdown[prize_level] += 1
         ticket_results.append(
@@ -213,6 +428,7 @@ def _rebuild_prediction_if_needed(
 
     snapshot = _build_prediction_snapshot_from_draws(draws)
     save_prediction_snapshot(snapshot, db_path=db_path)
+    invalidate_report_cache()
     return get_prediction_snapshot(latest_issue, db_path=db_path)
 
 
@@ -220,18 +436,26 @@ def _evaluate_pending_predictions(db_path: Path = DEFAULT_DB_PATH) -> dict[str,
     ready_snapshots = get_snapshots_ready_for_evaluation(db_path=db_path)
     evaluated_count = 0
     winning_issue_count = 0
-    for snapshot in ready_snapshots:
-        target_draw = {
-            "issue": snapshot["target_issue"],
-            "date": snapshot["target_date"],
-            "red_numbers": snapshot["target_red_numbers"],
-            "blue_number": snapshot["target_blue_number"],
-        }
-        evaluation = _evaluate_prediction_snapshot(snapshot, target_draw)
-        save_prediction_evaluation(evaluation, db_path=db_path)
-        evaluated_count += 1
-        if evaluation["winning_ticket_count"] > 0:
-            winning_issue_count += 1
+    for start in range(0, len(ready_snapshots), EVALUATION_BATCH_SIZE):
+        evaluations = [
+            _evaluate_prediction_snapshot(
+                snapshot,
+                {
+                    "issue": snapshot["target_issue"],
+                    "date": snapshot["target_date"],
+                    "red_numbers": snapshot["target_red_numbers"],
+                    "blue_number": snapshot["target_blue_number"],
+                },
+            )
+            for snapshot in ready_snapshots[start : start + EVALUATION_BATCH_SIZE]
+        ]
+        save_prediction_evaluations_bulk(evaluations, db_path=db_path)
+        evaluated_count += len(evaluations)
+        winning_issue_count += sum(
+            1 for evaluation in evaluations if evaluation["winning_ticket_count"] > 0
+        )
+    if evaluated_count:
+        invalidate_report_cache()
     return {
         "evaluated_count": evaluated_count,
         "winning_issue_count": winning_issue_count,
@@ -246,6 +470,161 @@ def _expected_prediction_counts(draw_count: int) -> tuple[int, int]:
     return snapshot_total, evaluation_total
 
 
+def _update_backfill_status(**changes: Any) -> None:
+    with _BACKFILL_STATUS_LOCK:
+        _BACKFILL_STATUS.update(changes)
+        _BACKFILL_STATUS["updated_at"] = _now_iso()
+
+
+def _add_backfill_progress(**increments: float) -> None:
+    with _BACKFILL_STATUS_LOCK:
+        for key, value in increments.items():
+            _BACKFILL_STATUS[key] += value
+        _BACKFILL_STATUS["updated_at"] = _now_iso()
+
+
+def get_backfill_status() -> dict[str, Any]:
+    with _BACKFILL_STATUS_LOCK:
+        status = dict(_BACKFILL_STATUS)
+    remaining = max(
+        status["expected_snapshot_total"] - status["snapshot_done"],
+        status["expected_evaluation_total"] - status["evaluation_done"],
+        0,
+    )
+    throughput = (
+        status["processed_total"] / status["running_seconds"]
+        if status["running_seconds"] > 0
+        else 0.0
+    )
+    return {
+        **status,
+        "background_enabled": _RUNTIME_OPTIONS["background_backfill"],
+        "completed": status["state"] == "completed",
+        "remaining_total": remaining,
+        "throughput_per_second": round(throughput, 2),
+        "running_seconds": round(status["running_seconds"], 2),
+        "eta_seconds": round(remaining / throughput, 1) if remaining and throughput else None,
+    }
+
+
+def request_backfill() -> None:
+    BACKFILL_WAKE_EVENT.set()
+
+
+def wait_for_backfill_request(timeout: float) -> bool:
+    requested = BACKFILL_WAKE_EVENT.wait(timeout)
+    BACKFILL_WAKE_EVENT.clear()
+    return requested
+
+
+def _iter_backfill_payloads(
+    draws: list[dict[str, Any]],
+    base_indexes: list[int],
+    evaluate_issues: set[str],
+    *,
+    first_index: int = 0,
+    rolling: tuple[RollingNumberStats, RollingNumberStats] | None = None,
+    score_index: DrawScoreIndex | None = None,
+) -> Iterator[tuple[dict[str, Any], dict[str, Any] | None]]:
+    # One forward pass over the history builds every missing snapshot with
+    # rolling statistics instead of recomputing each prefix from scratch.
+    # ``draws`` may be the history from ``first_index`` on; see iter_prediction_artifacts.
+    for base_index, artifacts in iter_prediction_artifacts(
+        draws,
+        base_indexes,
+        first_index=first_index,
+        rolling=rolling,
+        score_index=score_index,
+    ):
+        snapshot_payload = _build_prediction_snapshot(artifacts, base_index + 1)
+        evaluation_payload = None
+        if snapshot_payload["base_issue"] in evaluate_issues:
+            evaluation_payload = _evaluate_prediction_snapshot(
+                {**snapshot_payload, "id": None},
+                draws[base_index + 1 - first_index],
+            )
+        yield snapshot_payload, evaluation_payload
+
+
+def _compute_backfill_chunk(
+    draws: list[dict[str, Any]],
+    base_indexes: list[int],
+    evaluate_issues: set[str],
+    first_index: int,
+    rolling: tuple[RollingNumberStats, RollingNumberStats],
+    score_index: DrawScoreIndex,
+) -> list[tuple[dict[str, Any], dict[str, Any] | None]]:
+    return list(
+        _iter_backfill_payloads(
+            draws,
+            base_indexes,
+            evaluate_issues,
+            first_index=first_index,
+            rolling=rolling,
+            score_index=score_index,
+        )
+    )
+
+
+def _backfill_process_context() -> multiprocessing.context.BaseContext:
+    # The pool is created while HTTP and sync threads are running; forking
+    # would copy any lock they hold. Fresh interpreters only get plain data.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _iter_parallel_backfill_chunks(
+    draws: list[dict[str, Any]],
+    base_indexes: list[int],
+    evaluate_issues: set[str],
+    *,
+    workers: int,
+) -> Iterator[list[tuple[dict[str, Any], dict[str, Any] | None]]]:
+    analysis_draws = [
+        {field: draw[field] for field in BACKFILL_DRAW_FIELDS} for draw in draws
+    ]
+    chunk_count = min(len(base_indexes), workers * BACKFILL_CHUNKS_PER_WORKER)
+    chunk_size = math.ceil(len(base_indexes) / chunk_count)
+    # The rolling statistics are advanced once here; each chunk starts from a
+    # copy seeded at its first base index and only receives its own draws.
+    rolling = (
+        RollingNumberStats(RED_NUMBERS, is_red=True),
+        RollingNumberStats(BLUE_NUMBERS, is_red=False),
+    )
+    score_index = DrawScoreIndex(analysis_draws)
+    pushed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_backfill_process_context(),
+    ) as executor:
+        futures = []
+        for offset in range(0, len(base_indexes), chunk_size):
+            chunk = base_indexes[offset : offset + chunk_size]
+            first_index = chunk[0]
+            for draw in analysis_draws[pushed:first_index]:
+                for accumulator in rolling:
+                    accumulator.push(draw)
+            pushed = first_index
+            futures.append(
+                executor.submit(
+                    _compute_backfill_chunk,
+                    analysis_draws[first_index : chunk[-1] + 2],
+                    chunk,
+                    {
+                        draws[base_index]["issue"]
+                        for base_index in chunk
+                        if draws[base_index]["issue"] in evaluate_issues
+                    },
+                    first_index,
+                    copy.deepcopy(rolling),
+                    score_index.head(chunk[-1] + 1),
+                )
+            )
+        for future in as_completed(futures):
+            yield future.result()
+
+
 def _backfill_prediction_history(
     draws: list[dict[str, Any]],
     *,
@@ -299,25 +678,28 @@ def _backfill_prediction_history(
                 "completed": True,
             }
 
-        snapshot_created = 0
-        snapshot_updated = 0
-        evaluation_created = 0
-        evaluation_updated = 0
-        snapshot_payloads: list[dict[str, Any]] = []
-        evaluation_inputs: list[dict[str, Any]] = []
+        _update_backfill_status(
+            state="running",
+            expected_snapshot_total=expected_snapshot_total,
+            expected_evaluation_total=expected_evaluation_total,
+            snapshot_done=matching_snapshot_total,
+            evaluation_done=matching_evaluation_total,
+        )
+        counts = {
+            "snapshot_created": 0,
+            "snapshot_updated": 0,
+            "evaluation_created": 0,
+            "evaluation_updated": 0,
+        }
+        evaluation_only_inputs: list[dict[str, Any]] = []
+        pending_snapshot_indexes: list[int] = []
+        evaluate_issues: set[str] = set()
         start_index = MIN_BACKTEST_DRAWS - 1
         batch_started_at = time.perf_counter()
         completed = True
         processed_missing_count = 0
 
-        for base_index in range(len(draws) - 2, start_index - 1, -1):
-            if processed_missing_count >= BACKFILL_BATCH_LIMIT:
-                completed = False
-                break
-            if time.perf_counter() - batch_started_at >= BACKFILL_TIME_BUDGET_SECONDS:
-                completed = False
-                break
-
+        for base_index in range(start_index, len(draws) - 1):
             base_issue = draws[base_index]["issue"]
             snapshot_meta = snapshot_index.get(base_issue)
             needs_snapshot = (
@@ -328,83 +710,301 @@ def _backfill_prediction_history(
             needs_evaluation = (
                 evaluation_meta is None or evaluation_meta["model_version"] != MODEL_VERSION
             )
-            if not needs_snapshot and not needs_evaluation:
-                continue
-
-            processed_missing_count += 1
-            base_draws = draws[: base_index + 1]
-            snapshot_payload = None
+            if needs_evaluation:
+                evaluate_issues.add(base_issue)
             if needs_snapshot:
-                snapshot_payload = _build_prediction_snapshot_from_draws(base_draws)
-                snapshot_payloads.append(snapshot_payload)
-                if snapshot_meta is None:
-                    snapshot_created += 1
-                else:
-                    snapshot_updated += 1
-
-            if not needs_evaluation:
-                continue
+                pending_snapshot_indexes.append(base_index)
+            elif needs_evaluation:
+                evaluation_only_inputs.append(
+                    {
+                        "base_issue": base_issue,
+                        "target_draw": draws[base_index + 1],
+                    }
+                )
 
-            evaluation_inputs.append(
-                {
-                    "base_issue": base_issue,
-                    "target_draw": draws[base_index + 1],
-                    "snapshot_payload": snapshot_payload,
-                }
+        def write_batch(
+            batch: list[tuple[dict[str, Any], dict[str, Any] | None]],
+        ) -> None:
+            nonlocal processed_missing_count
+            if not batch:
+                return
+            save_prediction_snapshots_bulk(
+                [snapshot_payload for snapshot_payload, _ in batch],
+                db_path=db_path,
             )
-            if evaluation_meta is None:
-                evaluation_created += 1
-            else:
-                evaluation_updated += 1
+            saved_index = get_prediction_snapshot_index(db_path=db_path)
+            evaluation_payloads = []
+            for snapshot_payload, evaluation_payload in batch:
+                base_issue = snapshot_payload["base_issue"]
+                processed_missing_count += 1
+                if base_issue in snapshot_index:
+                    counts["snapshot_updated"] += 1
+                else:
+                    counts["snapshot_created"] += 1
+                if evaluation_payload is None or base_issue not in saved_index:
+                    continue
+                evaluation_payloads.append(
+                    {
+                        **evaluation_payload,
+                        "snapshot_id": saved_index[base_issue]["id"],
+                    }
+                )
+                if base_issue in evaluation_index:
+                    counts["evaluation_updated"] += 1
+                else:
+                    counts["evaluation_created"] += 1
+            save_prediction_evaluations_bulk(evaluation_payloads, db_path=db_path)
+            _add_backfill_progress(
+                snapshot_done=len(batch),
+                evaluation_done=len(evaluation_payloads),
+            )
+            invalidate_report_cache()
 
-        if snapshot_payloads:
-            save_prediction_snapshots_bulk(snapshot_payloads, db_path=db_path)
-            snapshot_index = get_prediction_snapshot_index(db_path=db_path)
+        workers = _RUNTIME_OPTIONS["backfill_workers"]
+        if workers > 1 and len(pending_snapshot_indexes) > workers:
+            # Workers compute snapshots and evaluations; this thread stays the
+            # only writer and saves each chunk as soon as it comes back.
+            for chunk_payloads in _iter_parallel_backfill_chunks(
+                draws,
+                pending_snapshot_indexes,
+                evaluate_issues,
+                workers=workers,
+            ):
+                write_batch(chunk_payloads)
+        else:
+            batch = []
+            for payloads in _iter_backfill_payloads(
+                draws,
+                pending_snapshot_indexes,
+                evaluate_issues,
+            ):
+                batch.append(payloads)
+                if time.perf_counter() - batch_started_at >= BACKFILL_TIME_BUDGET_SECONDS:
+                    completed = False
+                    break
+            write_batch(batch)
 
         evaluation_payloads = []
-        for item in evaluation_inputs:
-            base_issue = item["base_issue"]
-            snapshot_payload = item["snapshot_payload"]
-            snapshot_meta = snapshot_index.get(base_issue)
-            if snapshot_meta is None:
+        for item in evaluation_only_inputs:
+            snapshot = get_prediction_snapshot(item["base_issue"], db_path=db_path)
+            if snapshot is None:
                 continue
-            if snapshot_payload is None:
-                snapshot = get_prediction_snapshot(base_issue, db_path=db_path)
-            else:
-                snapshot = {
-                    **snapshot_payload,
-                    "id": snapshot_meta["id"],
-                }
             evaluation_payloads.append(
                 _evaluate_prediction_snapshot(snapshot, item["target_draw"])
             )
+            processed_missing_count += 1
+            if item["base_issue"] in evaluation_index:
+                counts["evaluation_updated"] += 1
+            else:
+                counts["evaluation_created"] += 1
 
         if evaluation_payloads:
             save_prediction_evaluations_bulk(evaluation_payloads, db_path=db_path)
+            _add_backfill_progress(evaluation_done=len(evaluation_payloads))
+            invalidate_report_cache()
 
         return {
             "expected_snapshot_total": expected_snapshot_total,
             "expected_evaluation_total": expected_evaluation_total,
-            "snapshot_created": snapshot_created,
-            "snapshot_updated": snapshot_updated,
-            "evaluation_created": evaluation_created,
-            "evaluation_updated": evaluation_updated,
+            **counts,
             "completed": completed,
-            "batch_limit": BACKFILL_BATCH_LIMIT,
             "processed_missing_count": processed_missing_count,
+            "workers": workers,
         }
 
 
-def _fetch_for_sync(
+def run_backfill_batch(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
+    """Evaluate ready snapshots and backfill one batch of history for the worker."""
+    started = time.perf_counter()
+    if get_backfill_status()["started_at"] is None:
+        _update_backfill_status(started_at=_now_iso())
+    try:
+        initialize_database(db_path)
+        draws = DRAW_STORE.draws(db_path)
+        pending_evaluation_meta = _evaluate_pending_predictions(db_path=db_path)
+        result = _backfill_prediction_history(draws, db_path=db_path)
+    except Exception as exc:
+        _update_backfill_status(state="failed", last_error=str(exc))
+        invalidate_report_cache()
+        raise
+    finally:
+        _add_backfill_progress(running_seconds=time.perf_counter() - started)
+
+    processed = result.get("processed_missing_count", 0)
+    previous_state = get_backfill_status()["state"]
+    _add_backfill_progress(
+        processed_total=processed,
+        batch_count=1,
+        snapshot_created=result["snapshot_created"],
+        snapshot_updated=result["snapshot_updated"],
+        evaluation_created=result["evaluation_created"],
+        evaluation_updated=result["evaluation_updated"],
+    )
+    if result["completed"]:
+        _update_backfill_status(
+            state="completed",
+            expected_snapshot_total=result["expected_snapshot_total"],
+            expected_evaluation_total=result["expected_evaluation_total"],
+            snapshot_done=result["expected_snapshot_total"],
+            evaluation_done=result["expected_evaluation_total"],
+            completed_at=_now_iso(),
+            last_error="",
+            pending_evaluation_meta=pending_evaluation_meta,
+        )
+    else:
+        _update_backfill_status(
+            state="running",
+            last_error="",
+            pending_evaluation_meta=pending_evaluation_meta,
+        )
+    if processed or get_backfill_status()["state"] != previous_state:
+        invalidate_report_cache()
+    return {**result, "pending_evaluation_meta": pending_evaluation_meta}
+
+
+def _stream_full_sync(db_path: Path) -> dict[str, Any]:
+    """Upsert official history page by page, resuming an unfinished checkpoint."""
+    checkpoint = get_sync_checkpoint(FULL_SYNC_CHECKPOINT_SOURCE, db_path=db_path)
+    resumed_from_page = None
+    if checkpoint is not None and checkpoint["completed_at"] is None:
+        resumed_from_page = checkpoint["last_completed_page"] + 1
+    else:
+        checkpoint = {
+            "source": FULL_SYNC_CHECKPOINT_SOURCE,
+            "started_at": _now_iso(),
+            "updated_at": _now_iso(),
+            "last_completed_page": 0,
+            "total_pages": None,
+            "official_total": None,
+            "fetched_count": 0,
+            "completed_at": None,
+        }
+        save_sync_checkpoint(checkpoint, db_path=db_path)
+
+    totals = {"fetched_count": 0, "inserted_count": 0, "updated_count": 0}
+    try:
+        for page in data_source.stream_history_from_official(
+            start_page=checkpoint["last_completed_page"] + 1
+        ):
+            upsert_result = upsert_draws(page["draws"], db_path=db_path)
+            totals["fetched_count"] += len(page["draws"])
+            totals["inserted_count"] += upsert_result["inserted_count"]
+            totals["updated_count"] += upsert_result["updated_count"]
+            checkpoint.update(
+                updated_at=_now_iso(),
+                last_completed_page=page["page_no"],
+                total_pages=page["total_pages"],
+                official_total=page["official_total"],
+                fetched_count=checkpoint["fetched_count"] + len(page["draws"]),
+            )
+            save_sync_checkpoint(checkpoint, db_path=db_path)
+    except Exception as exc:
+        raise data_source.FetchError(
+            f"官方分页同步在第 {checkpoint['last_completed_page'] + 1} 页中断"
+            f"（已写入 {checkpoint['last_completed_page']}/{checkpoint['total_pages'] or '?'} 页）: {exc}"
+        ) from exc
+    finally:
+        if totals["inserted_count"] or totals["updated_count"]:
+            invalidate_report_cache()
+
+    checkpoint.update(updated_at=_now_iso(), completed_at=_now_iso())
+    save_sync_checkpoint(checkpoint, db_path=db_path)
+    return {
+        **totals,
+        "total_pages": checkpoint["total_pages"],
+        "resumed_from_page": resumed_from_page,
+    }
+
+
+def _complete_full_sync_checkpoint(payload: dict[str, Any], db_path: Path) -> None:
+    checkpoint = get_sync_checkpoint(FULL_SYNC_CHECKPOINT_SOURCE, db_path=db_path)
+    if checkpoint is not None and checkpoint["completed_at"] is None:
+        checkpoint.update(
+            updated_at=_now_iso(),
+            completed_at=_now_iso(),
+            official_total=payload.get("official_total"),
+        )
+        save_sync_checkpoint(checkpoint, db_path=db_path)
+
+
+def _sync_draws(
     *,
     force_full_refresh: bool,
     current_latest_issue: str | None,
-) -> tuple[str, dict[str, Any]]:
-    if force_full_refresh or not current_latest_issue:
-        return "full", data_source.fetch_history_from_official()
-    return "incremental", data_source.fetch_history_from_official(
-        stop_issue=current_latest_issue
+    db_path: Path,
+) -> dict[str, Any]:
+    if not force_full_refresh and current_latest_issue:
+        payload = data_source.fetch_history_from_official(stop_issue=current_latest_issue)
+        return {
+            "sync_mode": "incremental",
+            "payload": payload,
+            "fetched_count": len(payload["draws"]),
+            **upsert_draws(payload["draws"], db_path=db_path),
+            "note": _describe_fetch_timing(payload),
+        }
+
+    try:
+        streamed = _stream_full_sync(db_path)
+    except Exception as exc:
+        stream_error = str(exc)
+    else:
+        resumed = streamed["resumed_from_page"]
+        return {
+            "sync_mode": "full_resume" if resumed else "full",
+            "payload": {"source_name": "official", "source_warning": ""},
+            "fetched_count": streamed["fetched_count"],
+            "inserted_count": streamed["inserted_count"],
+            "updated_count": streamed["updated_count"],
+            "note": (
+                f"（官方接口逐页写入，共 {streamed['total_pages']} 页"
+                + (f"，从第 {resumed} 页续传" if resumed else "")
+                + "）"
+            ),
+        }
+
+    # The pages written so far stay in the database and the checkpoint; the
+    # fallback source only needs a handful of large pages for the rest.
+    try:
+        payload = data_source.fetch_history_from_fallback()
+    except Exception as exc:
+        raise data_source.FetchError(f"{stream_error}；备用接口失败: {exc}") from exc
+    upsert_result = upsert_draws(payload["draws"], db_path=db_path)
+    _complete_full_sync_checkpoint(payload, db_path)
+    return {
+        "sync_mode": "full",
+        "payload": payload,
+        "fetched_count": len(payload["draws"]),
+        **upsert_result,
+        "note": f"（{stream_error}）",
+    }
+
+
+def _describe_fetch_timing(payload: dict[str, Any]) -> str:
+    timing = payload.get("fetch_timing")
+    if not timing:
+        return ""
+    labels = {"official": "官方接口", "fallback": "备用接口"}
+    parts = []
+    if timing["hedge_started_after_seconds"] is not None:
+        parts.append(
+            f"官方接口 {timing['hedge_started_after_seconds']:.1f}s 未返回，已并行请求备用接口"
+        )
+    parts.extend(
+        f"{labels.get(name, name)}用时 {seconds:.1f}s"
+        for name, seconds in timing["elapsed_seconds"].items()
     )
+    parts.append(f"采用 {payload.get('source_name', timing['winner'])}")
+    return f"（{'，'.join(parts)}）"
+
+
+def _probe_latest_issue(current_latest_issue: str) -> tuple[str | None, str]:
+    try:
+        latest_issue = data_source.probe_latest_issue()
+    except Exception as exc:
+        return None, f"{exc}，改为直接增量同步。"
+    if latest_issue == current_latest_issue:
+        return latest_issue, f"探测到官方最新期号 {latest_issue}，与本地一致，跳过增量同步。"
+    return latest_issue, f"探测到官方最新期号 {latest_issue}（本地 {current_latest_issue}）。"
 
 
 def sync_history(
@@ -415,19 +1015,63 @@ def sync_history(
 ) -> dict[str, Any]:
     with SYNC_LOCK:
         initialize_database(db_path)
+        bind_official_breaker(db_path)
         started_at = _now_iso()
         existing_count = get_draw_count(db_path)
         latest_before = get_latest_draw(db_path)
         latest_before_issue = latest_before["issue"] if latest_before else None
 
+        probe_note = ""
+        if not force_full_refresh and latest_before_issue:
+            # One pageSize=1 request decides whether the incremental fetch is needed.
+            probe_issue, probe_note = _probe_latest_issue(latest_before_issue)
+            if probe_issue == latest_before_issue:
+                record_sync_run(
+                    started_at=started_at,
+                    finished_at=_now_iso(),
+                    trigger_type=trigger_type,
+                    sync_mode="probe",
+                    status="success",
+                    fetched_count=0,
+                    inserted_count=0,
+                    updated_count=0,
+                    latest_issue=latest_before_issue,
+                    message=probe_note,
+                    db_path=db_path,
+                )
+                invalidate_report_cache()
+                return {
+                    "status": "synced",
+                    "warning": "",
+                    "sync_mode": "probe",
+                    "fetched_count": 0,
+                    "inserted_count": 0,
+                    "updated_count": 0,
+                    "has_new_issue": False,
+                    "evaluated_prediction_count": 0,
+                    "latest_issue": latest_before_issue,
+                    "latest_prediction": get_latest_prediction_snapshot(db_path=db_path),
+                    "source_name": "official",
+                }
+
         try:
-            sync_mode, payload = _fetch_for_sync(
+            synced = _sync_draws(
                 force_full_refresh=force_full_refresh,
                 current_latest_issue=latest_before_issue,
+                db_path=db_path,
             )
+            sync_mode = synced["sync_mode"]
+            payload = synced["payload"]
             source_name = payload.get("source_name", "official")
             source_warning = payload.get("source_warning", "")
-            upsert_result = upsert_draws(payload["draws"], db_path=db_path)
+            upsert_result = {
+                "inserted_count": synced["inserted_count"],
+                "updated_count": synced["updated_count"],
+            }
+            if synced["updated_count"]:
+                # Appended draws change the fingerprint; corrected ones do not.
+                _invalidate_draws(db_path)
+            invalidate_report_cache()
             latest_after = get_latest_draw(db_path)
             finished_at = _now_iso()
             record_sync_run(
@@ -436,11 +1080,12 @@ def sync_history(
                 trigger_type=trigger_type,
                 sync_mode=sync_mode,
                 status="success",
-                fetched_count=len(payload["draws"]),
+                fetched_count=synced["fetched_count"],
                 inserted_count=upsert_result["inserted_count"],
                 updated_count=upsert_result["updated_count"],
                 latest_issue=latest_after["issue"] if latest_after else None,
-                message=(
+                message=probe_note
+                + (
                     (
                         "同步完成。"
                         if source_name == "official"
@@ -452,11 +1097,12 @@ def sync_history(
                         if source_name == "official"
                         else f"未发现新开奖数据，本次使用备用数据源 {source_name}。"
                     )
-                ),
+                )
+                + synced["note"],
                 db_path=db_path,
             )
 
-            draws = get_all_draws(db_path=db_path)
+            draws = DRAW_STORE.draws(db_path)
             snapshot = _rebuild_prediction_if_needed(
                 draws,
                 force=(
@@ -467,11 +1113,12 @@ def sync_history(
                 db_path=db_path,
             )
             evaluation_meta = _evaluate_pending_predictions(db_path=db_path)
+            request_backfill()
             return {
                 "status": "synced",
                 "warning": source_warning,
                 "sync_mode": sync_mode,
-                "fetched_count": len(payload["draws"]),
+                "fetched_count": synced["fetched_count"],
                 "inserted_count": upsert_result["inserted_count"],
                 "updated_count": upsert_result["updated_count"],
                 "has_new_issue": upsert_result["inserted_count"] > 0,
@@ -493,9 +1140,10 @@ def sync_history(
                 inserted_count=0,
                 updated_count=0,
                 latest_issue=latest_before_issue,
-                message=str(exc),
+                message=probe_note + str(exc),
                 db_path=db_path,
             )
+            invalidate_report_cache()
             if existing_count > 0:
                 return {
                     "status": "stale_db",
@@ -515,19 +1163,86 @@ def sync_history(
             raise
 
 
+def export_snapshot(path: Path, *, db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
+    initialize_database(db_path)
+    return data_source.write_snapshot(
+        get_all_draws(db_path=db_path),
+        path,
+        source=str(db_path.resolve()),
+    )
+
+
+def import_snapshot(
+    path: Path,
+    *,
+    trigger_type: str = "import",
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, Any]:
+    """Load a dataset snapshot; an empty database takes the bulk-load path."""
+    started_at = _now_iso()
+    snapshot = data_source.read_snapshot(path)
+    initialize_database(db_path)
+    with SYNC_LOCK:
+        result = bulk_load_draws(snapshot["draws"], db_path=db_path)
+        if result["updated_count"]:
+            _invalidate_draws(db_path)
+        latest_draw = get_latest_draw(db_path)
+        record_sync_run(
+            started_at=started_at,
+            finished_at=_now_iso(),
+            trigger_type=trigger_type,
+            sync_mode="snapshot",
+            status="success",
+            fetched_count=len(snapshot["draws"]),
+            inserted_count=result["inserted_count"],
+            updated_count=result["updated_count"],
+            latest_issue=latest_draw["issue"] if latest_draw else None,
+            message=(
+                f"从快照 {path.name} 导入 {len(snapshot['draws'])} 期"
+                f"（快照生成于 {snapshot['header'].get('exported_at') or '--'}）。"
+            ),
+            db_path=db_path,
+        )
+    invalidate_report_cache()
+    request_backfill()
+    return {
+        **result,
+        "header": snapshot["header"],
+        "latest_issue": latest_draw["issue"] if latest_draw else None,
+    }
+
+
+def _bootstrap_from_bundled_snapshot(db_path: Path) -> bool:
+    if not BUNDLED_SNAPSHOT_PATH.exists():
+        return False
+    try:
+        result = import_snapshot(
+            BUNDLED_SNAPSHOT_PATH,
+            trigger_type="bootstrap",
+            db_path=db_path,
+        )
+    except (OSError, ValueError, KeyError):
+        # A damaged bundle is not fatal; the full network sync still works.
+        return False
+    return result["inserted_count"] > 0
+
+
 def ensure_data_available(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
     initialize_database(db_path)
     if get_draw_count(db_path) == 0:
+        # The bundled history covers most draws; only the tail after it needs
+        # the network, and a failed tail sync still leaves a usable database.
         return sync_history(
-            force_full_refresh=True,
+            force_full_refresh=not _bootstrap_from_bundled_snapshot(db_path),
             trigger_type="bootstrap",
             db_path=db_path,
         )
     latest_draw = get_latest_draw(db_path)
     if latest_draw:
-        draws = get_all_draws(db_path=db_path)
+        draws = DRAW_STORE.draws(db_path)
         _rebuild_prediction_if_needed(draws, db_path=db_path)
-        _evaluate_pending_predictions(db_path=db_path)
+        if not _RUNTIME_OPTIONS["background_backfill"]:
+            _evaluate_pending_predictions(db_path=db_path)
     return {
         "status": "database",
         "warning": "",
@@ -542,10 +1257,46 @@ def ensure_data_available(db_path: Path = DEFAULT_DB_PATH) -> dict[str, Any]:
     }
 
 
+def _invalidate_draws(db_path: Path) -> None:
+    """Drop the cached draws and sections after existing rows were rewritten."""
+    DRAW_STORE.invalidate(db_path)
+    with _REPORT_SECTIONS_LOCK:
+        _REPORT_SECTIONS_MEMO["version"] = None
+        _REPORT_SECTIONS_MEMO["sections"] = None
+
+
+def _get_report_sections(db_path: Path) -> ReportSections:
+    # Sections only depend on the draws, so they are memoized on the draw count
+    # and latest issue; corrected rows go through _invalidate_draws.
+    fingerprint = get_draws_fingerprint(db_path)
+    version = (
+        str(db_path.resolve()),
+        fingerprint["draw_count"],
+        fingerprint["latest_issue"],
+        MODEL_VERSION,
+    )
+    with _REPORT_SECTIONS_LOCK:
+        if _REPORT_SECTIONS_MEMO["version"] == version:
+            return _REPORT_SECTIONS_MEMO["sections"]
+
+    draws = DRAW_STORE.draws(db_path)
+    if not draws:
+        raise RuntimeError("数据库中暂无双色球数据。")
+    report_sections = ReportSections(
+        draws,
+        load_rows=lambda: get_all_draws(db_path=db_path),
+    )
+    with _REPORT_SECTIONS_LOCK:
+        _REPORT_SECTIONS_MEMO["version"] = version
+        _REPORT_SECTIONS_MEMO["sections"] = report_sections
+    return report_sections
+
+
 def build_report_data(
     *,
     force_refresh: bool = False,
     db_path: Path = DEFAULT_DB_PATH,
+    sections: Iterable[str] = REPORT_SECTIONS,
 ) -> dict[str, Any]:
     sync_meta = (
         sync_history(
@@ -557,43 +1308,103 @@ def build_report_data(
         else ensure_data_available(db_path=db_path)
     )
 
-    draws = get_all_draws(db_path=db_path)
-    if not draws:
-        raise RuntimeError("数据库中暂无双色球数据。")
+    report_sections = _get_report_sections(db_path)
+    draws = report_sections.draws
 
     latest_prediction = _rebuild_prediction_if_needed(draws, db_path=db_path)
-    pending_evaluation_meta = _evaluate_pending_predictions(db_path=db_path)
-    history_backfill = _backfill_prediction_history(draws, db_path=db_path)
-    latest_sync = get_latest_sync_run(db_path=db_path)
-    latest_prediction = get_latest_prediction_snapshot(db_path=db_path) or latest_prediction
-    prediction_performance = get_prediction_performance_summary(db_path=db_path)
+    if _RUNTIME_OPTIONS["background_backfill"]:
+        # The background worker owns evaluation and backfill; the report only
+        # shows what has been materialized so far.
+        history_backfill = get_backfill_status()
+        pending_evaluation_meta = history_backfill["pending_evaluation_meta"]
+    else:
+        pending_evaluation_meta = _evaluate_pending_predictions(db_path=db_path)
+        history_backfill = _backfill_prediction_history(draws, db_path=db_path)
 
-    report = build_report_from_draws(
-        draws,
-        generated_at=_now_iso(),
-        data_status=sync_meta["status"],
-        data_warning=sync_meta.get("warning", ""),
-        sources={
-            "official_page_url": data_source.OFFICIAL_PAGE_URL,
-            "official_api_url": data_source.OFFICIAL_API_URL,
-            "fallback_page_url": data_source.FALLBACK_SOURCE_PAGE_URL,
-            "fallback_api_url": data_source.FALLBACK_API_URL,
-        },
-        database={
-            "path": str(db_path.resolve()),
-            "draw_count": len(draws),
-        },
-        automation={
-            "auto_sync_enabled": _RUNTIME_OPTIONS["auto_sync_enabled"],
-            "schedule_description": _RUNTIME_OPTIONS["schedule_description"],
-            "next_regular_sync_at": get_next_regular_sync_at(),
-            "retry_time_label": get_retry_sync_time_label(),
-            "last_sync": latest_sync,
-            "latest_prediction": latest_prediction,
-            "prediction_performance": prediction_performance,
-            "history_backfill": history_backfill,
-            "pending_evaluation_meta": pending_evaluation_meta,
-        },
-        latest_prediction_snapshot=latest_prediction,
-    )
+    bind_official_breaker(db_path)
+    # Everything shown in the report is read from one snapshot, so a sync
+    # committing halfway through cannot mix old draws with new evaluations.
+    with read_transaction(db_path):
+        report_sections = _get_report_sections(db_path)
+        draws = report_sections.draws
+        latest_sync = get_latest_sync_run(db_path=db_path)
+        latest_prediction = get_latest_prediction_snapshot(db_path=db_path) or latest_prediction
+        prediction_performance = get_prediction_performance_summary(db_path=db_path)
+
+        report = build_report_from_draws(
+            draws,
+            generated_at=_now_iso(),
+            data_status=sync_meta["status"],
+            data_warning=sync_meta.get("warning", ""),
+            sources={
+                "official_page_url": data_source.OFFICIAL_PAGE_URL,
+                "official_api_url": data_source.OFFICIAL_API_URL,
+                "fallback_page_url": data_source.FALLBACK_SOURCE_PAGE_URL,
+                "fallback_api_url": data_source.FALLBACK_API_URL,
+            },
+            database={
+                "path": str(db_path.resolve()),
+                "draw_count": len(draws),
+                "latest_issue": draws[-1]["issue"],
+            },
+            automation={
+                "auto_sync_enabled": _RUNTIME_OPTIONS["auto_sync_enabled"],
+                "schedule_description": _RUNTIME_OPTIONS["schedule_description"],
+                "next_regular_sync_at": get_next_regular_sync_at(),
+                "retry_time_label": get_retry_sync_time_label(),
+                "draw_night_polling": get_auto_sync_status(),
+                "official_breaker": get_official_breaker_status(db_path),
+                "last_sync": latest_sync,
+                "latest_prediction": latest_prediction,
+                "prediction_performance": prediction_performance,
+                "history_backfill": history_backfill,
+                "pending_evaluation_meta": pending_evaluation_meta,
+            },
+            latest_prediction_snapshot=latest_prediction,
+            sections=sections,
+            report_sections=report_sections,
+        )
     return report
+
+
+def get_draw_history_page(
+    *,
+    before: str | None = None,
+    limit: int = DRAW_PAGE_DEFAULT_LIMIT,
+    columns: str | None = None,
+    keyword: str = "",
+    db_path: Path = DEFAULT_DB_PATH,
+) -> dict[str, Any]:
+    """One page of draw history, newest first, for ``/api/draws``."""
+    if before is not None and not before.isdigit():
+        raise ValueError(f"无效的期号: {before}")
+    if not 1 <= limit <= DRAW_PAGE_MAX_LIMIT:
+        raise ValueError(f"limit 需在 1 到 {DRAW_PAGE_MAX_LIMIT} 之间")
+    if columns is None:
+        selected = tuple(DRAW_PAGE_COLUMNS)
+    else:
+        names = [name.strip() for name in columns.split(",") if name.strip()]
+        unknown = [name for name in names if name not in DRAW_PAGE_COLUMNS]
+        if unknown:
+            raise ValueError(f"未知的字段: {', '.join(unknown)}")
+        # The issue is the pagination cursor, so it is always returned.
+        selected = tuple(dict.fromkeys(["issue", *names]))
+
+    initialize_database(db_path)
+    # One extra row tells whether another page exists without a COUNT query.
+    draws = get_draws_page(
+        before=before,
+        limit=limit + 1,
+        columns=selected,
+        keyword=keyword.strip(),
+        db_path=db_path,
+    )
+    has_more = len(draws) > limit
+    draws = draws[:limit]
+    return {
+        "draws": draws,
+        "columns": list(selected),
+        "limit": limit,
+        "has_more": has_more,
+        "next_before": draws[-1]["issue"] if has_more else None,
+    }
@@ -2,6 +2,7 @@ const statusText = document.getElementById("statusText");
 const refreshButton = document.getElementById("refreshButton");
 const warningBanner = document.getElementById("warningBanner");
 const historySearchInput = document.getElementById("historySearchInput");
+const historySentinel = document.getElementById("historySentinel");
 const pageTabs = Array.from(document.querySelectorAll(".page-tab"));
 const pageViews = Array.from(document.querySelectorAll(".page-view"));
 
@@ -26,7 +27,32 @@ const pageRoutes = {
 
 const routeToPage = new Map(Object.entries(pageRoutes).map(([page, route]) => [route, page]));
 
+const pageSections = {
+  dashboard: ["summary", "latest_issue_analysis"],
+  prediction: ["prediction"],
+  backtest: [],
+  stats: ["hot_cold", "stats"],
+  history: [],
+  notes: ["duplicates"],
+};
+
 let currentReport = null;
+let currentPage = "dashboard";
+const loadedSections = new Set();
+const pendingSections = new Set();
+
+const HISTORY_PAGE_SIZE = 50;
+const HISTORY_COLUMNS = "issue,date,red_display,blue_display";
+const historyState = {
+  draws: [],
+  nextBefore: null,
+  hasMore: true,
+  loading: false,
+  loaded: false,
+  keyword: "",
+  generation: 0,
+};
+let historySearchTimer = null;
 
 function setStatus(text) {
   statusText.textContent = text;
@@ -111,17 +137,19 @@ function showPage(pageName, shouldUpdateUrl = false) {
   }
 
   window.scrollTo({ top: 0, behavior: "smooth" });
+  currentPage = resolvedPage;
+  return resolvedPage;
 }
 
 function setupPageNav() {
   pageTabs.forEach((tab) => {
     tab.addEventListener("click", () => {
-      showPage(tab.dataset.page, true);
+      loadPageSections(showPage(tab.dataset.page, true));
     });
   });
 
   window.addEventListener("popstate", () => {
-    showPage(getPageFromLocation(), false);
+    loadPageSections(showPage(getPageFromLocation(), false));
   });
 
   const initialPage = getPageFromLocation();
@@ -337,6 +365,17 @@ function renderPrediction(report) {
   `;
 }
 
+function renderBackfillProgress(backfill) {
+  if (!backfill || !backfill.background_enabled || backfill.completed) {
+    return "";
+  }
+  const etaText =
+    backfill.eta_seconds === null || backfill.eta_seconds === undefined
+      ? "--"
+      : `${Math.ceil(backfill.eta_seconds)} 秒`;
+  return `后台回补进行中：快照 ${backfill.snapshot_done}/${backfill.expected_snapshot_total}，验票 ${backfill.evaluation_done}/${backfill.expected_evaluation_total}，预计剩余 ${etaText}。`;
+}
+
 function renderPerformance(report) {
   const performance = report.automation?.prediction_performance;
   const backfill = report.automation?.history_backfill;
@@ -358,6 +397,17 @@ function renderPerformance(report) {
     )
     .join("");
 
+  const yearlyRows = (performance.yearly_breakdown || [])
+    .map(
+      (year) => `
+        <span class="info-chip">
+          ${year.year} 年
+          <span class="chip-score">${year.evaluated_total} 期，期级 ${year.issue_win_rate_percent}%，票级 ${year.ticket_win_rate_percent}%，最佳 ${year.best_prize_level || "未中奖"}</span>
+        </span>
+      `,
+    )
+    .join("");
+
   document.getElementById("performancePanel").innerHTML = `
     <div class="prediction-list">
       <div class="performance-hero">
@@ -384,11 +434,20 @@ function renderPerformance(report) {
         <strong>奖级分布</strong>
         <div class="chip-row">${prizeBreakdown}</div>
       </div>
+      ${
+        yearlyRows
+          ? `<div class="prediction-block">
+        <strong>按年份表现</strong>
+        <div class="chip-row">${yearlyRows}</div>
+      </div>`
+          : ""
+      }
       <div class="prediction-block">
         <strong>历史回补状态</strong>
         <p class="mini-text">
           已生成预测快照 ${performance.snapshot_total} 条，已完成验票 ${performance.evaluated_total} 条，待开奖 ${performance.pending_total} 条。
           ${backfill ? `本次回补新增快照 ${backfill.snapshot_created} 条，新增验票 ${backfill.evaluation_created} 条。` : ""}
+          ${renderBackfillProgress(backfill)}
         </p>
       </div>
     </div>
@@ -560,8 +619,18 @@ function renderStatsTable(containerId, rows, blue = false) {
   document.getElementById(containerId).innerHTML = html;
 }
 
+function renderHistoryRow(draw) {
+  return `
+    <tr>
+      <td>${draw.issue}</td>
+      <td>${draw.date}</td>
+      <td>${draw.red_display}</td>
+      <td>${draw.blue_display}</td>
+    </tr>
+  `;
+}
+
 function renderHistoryTable(draws) {
-  const limited = draws.slice(0, 200);
   const html = `
     <div class="stats-table-wrapper">
       <table>
@@ -573,19 +642,8 @@ function renderHistoryTable(draws) {
             <th>蓝球</th>
           </tr>
         </thead>
-        <tbody>
-          ${limited
-            .map(
-              (draw) => `
-                <tr>
-                  <td>${draw.issue}</td>
-                  <td>${draw.date}</td>
-                  <td>${draw.red_display}</td>
-                  <td>${draw.blue_display}</td>
-                </tr>
-              `,
-            )
-            .join("")}
+        <tbody id="historyTableBody">
+          ${draws.map(renderHistoryRow).join("")}
         </tbody>
       </table>
     </div>
@@ -593,6 +651,168 @@ function renderHistoryTable(draws) {
   document.getElementById("historyTable").innerHTML = html;
 }
 
+function appendHistoryRows(draws) {
+  const body = document.getElementById("historyTableBody");
+  if (!body) {
+    renderHistoryTable(historyState.draws);
+    return;
+  }
+  body.insertAdjacentHTML("beforeend", draws.map(renderHistoryRow).join(""));
+}
+
+function renderHistorySentinel() {
+  if (!historySentinel) {
+    return;
+  }
+  if (historyState.loading) {
+    historySentinel.textContent = "正在加载更多开奖记录...";
+  } else if (historyState.hasMore) {
+    historySentinel.textContent = "继续下滑加载更多";
+  } else if (historyState.draws.length) {
+    historySentinel.textContent = `已加载全部 ${historyState.draws.length} 期`;
+  } else {
+    historySentinel.textContent = historyState.keyword ? "没有匹配的开奖记录" : "暂无开奖记录";
+  }
+}
+
+function resetHistory() {
+  historyState.generation += 1;
+  historyState.draws = [];
+  historyState.nextBefore = null;
+  historyState.hasMore = true;
+  historyState.loading = false;
+  historyState.loaded = true;
+  historyState.keyword = historySearchInput ? historySearchInput.value.trim() : "";
+  renderHistoryTable([]);
+  loadHistoryPage();
+}
+
+async function loadHistoryPage() {
+  if (historyState.loading || !historyState.hasMore) {
+    return;
+  }
+  const generation = historyState.generation;
+  const params = new URLSearchParams({ limit: String(HISTORY_PAGE_SIZE), columns: HISTORY_COLUMNS });
+  if (historyState.nextBefore) {
+    params.set("before", historyState.nextBefore);
+  }
+  if (historyState.keyword) {
+    params.set("q", historyState.keyword);
+  }
+  historyState.loading = true;
+  renderHistorySentinel();
+  try {
+    const response = await fetch(`/api/draws?${params}`, { cache: "no-store" });
+    const payload = await response.json();
+    if (!response.ok) {
+      throw new Error(payload.error || "请求失败");
+    }
+    if (generation !== historyState.generation) {
+      // A newer search or refresh started while this page was in flight.
+      return;
+    }
+    historyState.draws.push(...payload.draws);
+    historyState.nextBefore = payload.next_before;
+    historyState.hasMore = payload.has_more;
+    appendHistoryRows(payload.draws);
+  } catch (error) {
+    if (generation === historyState.generation) {
+      historyState.hasMore = false;
+      setStatus(`开奖记录加载失败：${error.message}`);
+    }
+  } finally {
+    if (generation === historyState.generation) {
+      historyState.loading = false;
+      renderHistorySentinel();
+      if (historyState.hasMore && isHistorySentinelVisible()) {
+        loadHistoryPage();
+      }
+    }
+  }
+}
+
+function isHistorySentinelVisible() {
+  if (!historySentinel || currentPage !== "history") {
+    return false;
+  }
+  const rect = historySentinel.getBoundingClientRect();
+  return rect.top < window.innerHeight + 200;
+}
+
+function setupHistoryScroll() {
+  if (!historySentinel) {
+    return;
+  }
+  if ("IntersectionObserver" in window) {
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting) && currentPage === "history") {
+          loadHistoryPage();
+        }
+      },
+      { rootMargin: "0px 0px 200px 0px" },
+    );
+    observer.observe(historySentinel);
+  } else {
+    window.addEventListener("scroll", () => {
+      if (isHistorySentinelVisible()) {
+        loadHistoryPage();
+      }
+    });
+  }
+}
+
+function formatPollingStatus(polling) {
+  if (!polling || polling.mode !== "adaptive") {
+    return "未开启，开奖日按固定时间同步一次。";
+  }
+  const stateLabels = {
+    idle: "空闲",
+    waiting: "等待下一次任务",
+    polling: "正在探测最新期号",
+    syncing: "已发现新一期，正在同步",
+  };
+  const parts = [
+    `${polling.poll_start} 起探测，初始间隔 ${polling.poll_base_interval_seconds} 秒、最长 ${polling.poll_max_interval_seconds} 秒，当前状态：${stateLabels[polling.state] || polling.state}`,
+  ];
+  if (polling.probe_count) {
+    parts.push(`本轮已探测 ${polling.probe_count} 次，最近一次 ${formatDateTimeText(polling.last_probe_at)} 得到期号 ${polling.last_probe_issue || "--"}`);
+  }
+  if (polling.next_probe_at) {
+    parts.push(`下次探测 ${formatDateTimeText(polling.next_probe_at)}`);
+  }
+  if (polling.last_probe_error) {
+    parts.push(`最近探测失败：${polling.last_probe_error}`);
+  }
+  if (polling.last_outcome) {
+    parts.push(polling.last_outcome);
+  }
+  return `${parts.join("；")}。`.replace(/。。$/, "。");
+}
+
+function formatBreakerStatus(breaker) {
+  if (!breaker) {
+    return "暂无状态。";
+  }
+  const stateLabels = { closed: "关闭（正常请求）", open: "打开（直接使用备用数据源）", half_open: "半开（等待探测结果）" };
+  const parts = [`当前${stateLabels[breaker.state] || breaker.state}，连续失败 ${breaker.failure_count} 次（${breaker.failure_threshold} 次触发熔断）`];
+  if (breaker.state === "open" && breaker.next_probe_at) {
+    parts.push(`${formatDateTimeText(breaker.next_probe_at)} 后探测恢复`);
+  }
+  if (breaker.last_error) {
+    parts.push(`最近错误：${breaker.last_error}`);
+  }
+  if (breaker.history?.length) {
+    parts.push(
+      `最近切换：${breaker.history
+        .slice(0, 5)
+        .map((event) => `${formatDateTimeText(event.occurred_at)} ${event.from_state}→${event.to_state}（${event.reason}）`)
+        .join("、")}`,
+    );
+  }
+  return `${parts.join("；")}。`;
+}
+
 function renderNotes(report) {
   const lastSync = report.automation?.last_sync;
   const performance = report.automation?.prediction_performance;
@@ -622,6 +842,8 @@ function renderNotes(report) {
     <ul>
       ${report.notes.map((note) => `<li>${note}</li>`).join("")}
       <li>自动同步：${report.automation.auto_sync_enabled ? `开启，${report.automation.schedule_description}。下一次计划同步时间：${formatDateTimeText(report.automation.next_regular_sync_at)}。` : "关闭。当前只会在手动刷新时同步。"} </li>
+      <li>开奖夜轮询：${formatPollingStatus(report.automation.draw_night_polling)}</li>
+      <li>官方接口熔断器：${formatBreakerStatus(report.automation.official_breaker)}</li>
       <li>最近一次同步：${lastSync ? `${formatDateTimeText(lastSync.finished_at)}，触发方式 ${lastSync.trigger_type}，模式 ${lastSync.sync_mode}，新增 ${lastSync.inserted_count} 条，更新 ${lastSync.updated_count} 条。` : "暂无同步记录。"}</li>
       <li>预测回测：${performance ? `已回测 ${performance.evaluated_total} 期，期级中奖率 ${performance.issue_win_rate_percent}%，票级中奖率 ${performance.ticket_win_rate_percent}%，最佳奖级 ${performance.best_prize_level || "未中奖"}。` : "暂无回测数据。"}</li>
       <li>完全重复检查：${exactDuplicates}</li>
@@ -632,44 +854,71 @@ function renderNotes(report) {
   `;
 }
 
-function applyHistoryFilter() {
-  if (!currentReport) {
-    return;
+function renderReport(report) {
+  if (report.summary) {
+    renderSummary(report);
   }
-  const keyword = historySearchInput.value.trim();
-  if (!keyword) {
-    renderHistoryTable(currentReport.draws);
-    return;
+  if (report.latest_issue_analysis) {
+    renderLatestAnalysis(report);
+  }
+  if (report.prediction) {
+    renderPrediction(report);
+  }
+  renderPerformance(report);
+  renderEvaluations(report);
+  if (report.hot_cold) {
+    renderHotCold(report);
+  }
+  if (report.red_stats && report.blue_stats) {
+    renderStatsTable("redStatsTable", [...report.red_stats].sort((a, b) => b.total_hits - a.total_hits));
+    renderStatsTable("blueStatsTable", [...report.blue_stats].sort((a, b) => b.total_hits - a.total_hits), true);
+  }
+  if (report.duplicates) {
+    renderNotes(report);
   }
-  const filtered = currentReport.draws.filter((draw) => {
-    const searchBase = `${draw.issue} ${draw.date} ${draw.red_display} ${draw.blue_display}`;
-    return searchBase.includes(keyword);
-  });
-  renderHistoryTable(filtered);
 }
 
-async function loadReport(forceRefresh = false) {
+function loadPageSections(pageName) {
+  if (pageName === "history" && !historyState.loaded) {
+    resetHistory();
+  }
+  const missing = (pageSections[pageName] || []).filter(
+    (section) => !loadedSections.has(section) && !pendingSections.has(section),
+  );
+  if (missing.length) {
+    loadReport(false, missing);
+  }
+}
+
+async function loadReport(forceRefresh = false, sections = pageSections[currentPage] || []) {
   refreshButton.disabled = true;
   setStatus(forceRefresh ? "正在刷新官方数据..." : "正在加载数据...");
+  sections.forEach((section) => pendingSections.add(section));
+  const params = new URLSearchParams({ sections: sections.join(",") });
+  if (forceRefresh) {
+    params.set("refresh", "1");
+  }
   try {
-    const response = await fetch(`/api/report${forceRefresh ? "?refresh=1" : ""}`, {
-      cache: "no-store",
+    const response = await fetch(`/api/report?${params}`, {
+      cache: forceRefresh ? "no-store" : "no-cache",
     });
     const payload = await response.json();
     if (!response.ok) {
       throw new Error(payload.error || "请求失败");
     }
-    currentReport = payload;
-    renderSummary(payload);
-    renderLatestAnalysis(payload);
-    renderPrediction(payload);
-    renderPerformance(payload);
-    renderEvaluations(payload);
-    renderHotCold(payload);
-    renderStatsTable("redStatsTable", [...payload.red_stats].sort((a, b) => b.total_hits - a.total_hits));
-    renderStatsTable("blueStatsTable", [...payload.blue_stats].sort((a, b) => b.total_hits - a.total_hits), true);
-    renderHistoryTable(payload.draws);
-    renderNotes(payload);
+    if (forceRefresh || !currentReport || currentReport.database?.latest_issue !== payload.database?.latest_issue) {
+      // Sections loaded for other pages may describe older data; drop them so they reload on demand.
+      loadedSections.clear();
+      currentReport = {};
+      if (historyState.loaded && currentPage === "history") {
+        resetHistory();
+      } else {
+        historyState.loaded = false;
+      }
+    }
+    currentReport = { ...currentReport, ...payload };
+    (payload.sections || []).forEach((section) => loadedSections.add(section));
+    renderReport(currentReport);
 
     if (payload.cache_warning) {
       warningBanner.classList.remove("hidden");
@@ -696,6 +945,7 @@ async function loadReport(forceRefresh = false) {
     warningBanner.textContent = `加载失败：${error.message}`;
     setStatus("加载失败");
   } finally {
+    sections.forEach((section) => pendingSections.delete(section));
     refreshButton.disabled = false;
   }
 }
@@ -706,9 +956,12 @@ refreshButton.addEventListener("click", () => {
 
 if (historySearchInput) {
   historySearchInput.addEventListener("input", () => {
-    applyHistoryFilter();
+    window.clearTimeout(historySearchTimer);
+    historySearchTimer = window.setTimeout(resetHistory, 250);
   });
 }
 
 setupPageNav();
+setupHistoryScroll();
 loadReport(false);
+loadPageSections(currentPage);